@@ -0,0 +1,70 @@
+"""
+Time until a desktop switch is visible, comparing `VirtualDesktop.go()` with
+`FastSwitcher.go()`.
+
+A switch counts as visible once DWM reports the target desktop's top window
+as uncloaked and the previous desktop's top window as cloaked, so the shell's
+slide animation is included for `go()`.
+
+Needs at least two desktops with a window open on each.
+
+    $ python benchmarks/bench_fast_switch.py [iterations]
+"""
+import statistics
+import sys
+import time
+from ctypes import byref, c_int, sizeof, windll
+
+from pyvda import FastSwitcher, VirtualDesktop
+
+DWMWA_CLOAKED = 14
+TIMEOUT = 2.0
+# Let the shell settle between iterations
+SETTLE = 0.6
+
+
+def is_cloaked(hwnd):
+    cloaked = c_int()
+    windll.dwmapi.DwmGetWindowAttribute(hwnd, DWMWA_CLOAKED, byref(cloaked), sizeof(cloaked))
+    return bool(cloaked.value)
+
+
+def wait_visible(shown, hidden, start):
+    while time.perf_counter() - start < TIMEOUT:
+        if not is_cloaked(shown) and is_cloaked(hidden):
+            break
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(switch, desktops, tops, iterations):
+    timings = []
+    for i in range(iterations):
+        target = i % 2
+        start = time.perf_counter()
+        switch(desktops[target])
+        timings.append(wait_visible(tops[target], tops[1 - target], start))
+        time.sleep(SETTLE)
+    return timings
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    original = VirtualDesktop.current()
+    desktops = [VirtualDesktop(1), VirtualDesktop(2)]
+    tops = [d.apps_by_z_order(include_pinned=False)[0].hwnd for d in desktops]
+    switcher = FastSwitcher()
+    try:
+        for name, switch in (("go", VirtualDesktop.go), ("FastSwitcher.go", switcher.go)):
+            desktops[1].go()
+            time.sleep(SETTLE)
+            switcher.refresh()
+            timings = measure(switch, desktops, tops, iterations)
+            print(f"{name:>15}: median {statistics.median(timings):7.2f} ms, "
+                  f"mean {statistics.mean(timings):7.2f} ms, max {max(timings):7.2f} ms")
+    finally:
+        switcher.close()
+        original.go()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+End-to-end latency of switching desktop and focusing its top window, comparing
+`go()` followed by `apps_by_z_order()[0].set_focus()` with `go_and_focus()`.
+
+Needs at least two desktops with a window open on each.
+
+    $ python benchmarks/bench_go_and_focus.py [iterations]
+"""
+import statistics
+import sys
+import time
+
+from pyvda import VirtualDesktop
+
+# Let the switch animation finish between iterations so it isn't measured
+SETTLE = 0.6
+
+
+def go_then_focus(desktop):
+    desktop.go()
+    apps = desktop.apps_by_z_order()
+    if apps:
+        apps[0].set_focus()
+
+
+def go_and_focus(desktop):
+    desktop.go_and_focus()
+
+
+def measure(f, desktops, iterations):
+    timings = []
+    for i in range(iterations):
+        target = desktops[i % 2]
+        start = time.perf_counter()
+        f(target)
+        timings.append((time.perf_counter() - start) * 1000)
+        time.sleep(SETTLE)
+    return timings
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    original = VirtualDesktop.current()
+    desktops = [VirtualDesktop(1), VirtualDesktop(2)]
+    try:
+        for f in (go_then_focus, go_and_focus):
+            timings = measure(f, desktops, iterations)
+            print(f"{f.__name__:>15}: median {statistics.median(timings):7.2f} ms, "
+                  f"mean {statistics.mean(timings):7.2f} ms, max {max(timings):7.2f} ms")
+    finally:
+        original.go()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ Example
 
     from pyvda import AppView, get_apps_by_z_order, VirtualDesktop, get_virtual_desktops
 
-    number_of_active_desktops = len(get_virtual_desktops())
+    number_of_active_desktops = len(get_virtual_desktops(lazy=True))
     print(f"There are {number_of_active_desktops} active desktops")
 
     current_desktop = VirtualDesktop.current()
@@ -34,31 +34,122 @@ Example
     AppView.current().pin()
 """
 
-import os
-import platform
-
-
-def _check_release():
-    try:
-        release = int(platform.release())
-        return release >= 10
-    except ValueError:
-        return platform.release() == "10"
-
-def _check_version():
-    if platform.system() != "Windows" or not _check_release():
-        raise NotImplementedError(
-            "The virtual desktop feature is only available on Windows 10 and later."
-        )
-
-if not os.getenv("READTHEDOCS"):
-    _check_version()
+import importlib
+import pkgutil
+from typing import TYPE_CHECKING, Any, List
 
 from ._version import __version__
-from .pyvda import (
-    AppView,
-    VirtualDesktop,
-    get_apps_by_z_order,
-    get_virtual_desktops,
-    set_wallpaper_for_all_desktops,
-)
+
+# Public names and the module which defines each. They are imported on first
+# use, so that parts of pyvda which don't talk to the shell, like
+# `StateReader`, can be used without initialising COM, and so that a
+# `trace.replay` can set the build's features before the interfaces are declared.
+_EXPORTS = {
+    "AppView": "pyvda",
+    "DesktopList": "pyvda",
+    "DesktopWindows": "pyvda",
+    "VirtualDesktop": "pyvda",
+    "apply_wallpapers": "pyvda",
+    "desktop_names": "pyvda",
+    "desktop_window_counts": "pyvda",
+    "get_apps_by_z_order": "pyvda",
+    "get_virtual_desktops": "pyvda",
+    "invalidate_view": "pyvda",
+    "pinned_app_ids": "pyvda",
+    "pinned_hwnds": "pyvda",
+    "pinned_views": "pyvda",
+    "set_view_cache_size": "pyvda",
+    "set_wallpaper_for_all_desktops": "pyvda",
+    "view_cache_info": "pyvda",
+    "windows_by_desktop": "pyvda",
+    "MRUTracker": "mru",
+    "SwitchScheduler": "scheduler",
+    "DesktopSpec": "plan",
+    "Plan": "plan",
+    "WindowSpec": "plan",
+    "Snapshot": "snapshot",
+    "take_snapshot": "snapshot",
+    "Arena": "arena",
+    "Rule": "rules",
+    "RulesEngine": "rules",
+    "DesktopHistory": "history",
+    "last_active_desktop": "history",
+    "StatePublisher": "shared",
+    "StateReader": "shared",
+    "WindowEntry": "search",
+    "WindowIndex": "search",
+    "Rect": "geometry",
+    "WindowBatch": "geometry",
+    "WindowGeometry": "geometry",
+    "apply_layout": "geometry",
+    "read_geometry": "geometry",
+    "capture_z_order": "zorder",
+    "restore_z_order": "zorder",
+    "OwnershipGroup": "ownership",
+    "get_ownership_groups": "ownership",
+    "FastSwitcher": "fastswitch",
+    "CachedState": "state_cache",
+    "StateCache": "state_cache",
+    "cached_state": "state_cache",
+    "WarmState": "startup",
+    "warmup": "startup",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .pyvda import (
+        AppView,
+        DesktopList,
+        DesktopWindows,
+        VirtualDesktop,
+        apply_wallpapers,
+        desktop_names,
+        desktop_window_counts,
+        get_apps_by_z_order,
+        get_virtual_desktops,
+        invalidate_view,
+        pinned_app_ids,
+        pinned_hwnds,
+        pinned_views,
+        set_view_cache_size,
+        set_wallpaper_for_all_desktops,
+        view_cache_info,
+        windows_by_desktop,
+    )
+    from .mru import MRUTracker
+    from .scheduler import SwitchScheduler
+    from .plan import DesktopSpec, Plan, WindowSpec
+    from .snapshot import Snapshot, take_snapshot
+    from .arena import Arena
+    from .rules import Rule, RulesEngine
+    from .history import DesktopHistory, last_active_desktop
+    from .shared import StatePublisher, StateReader
+    from .search import WindowEntry, WindowIndex
+    from .geometry import Rect, WindowBatch, WindowGeometry, apply_layout, read_geometry
+    from .zorder import capture_z_order, restore_z_order
+    from .ownership import OwnershipGroup, get_ownership_groups
+    from .fastswitch import FastSwitcher
+    from .state_cache import CachedState, StateCache, cached_state
+    from .startup import WarmState, warmup
+
+
+def _submodules() -> List[str]:
+    # Excludes `__main__`, which runs the command line interface when imported
+    return [m.name for m in pkgutil.iter_modules(__path__) if not m.name.startswith("__")]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        if name in _submodules():
+            # Submodules aren't imported up front either, but `pyvda.utils` etc. still work
+            return importlib.import_module(f".{name}", __name__)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS) | set(_submodules()))
@@ -0,0 +1,5 @@
+import sys
+
+from pyvda.cli import main
+
+sys.exit(main())
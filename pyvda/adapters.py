@@ -0,0 +1,215 @@
+"""
+Build specific adapters over `IVirtualDesktopManagerInternal`.
+
+The manager interface changes shape between Windows builds: some builds take
+an extra monitor `HWND` argument, some move `SetName` to a second interface,
+and names and wallpapers only exist on newer builds. Rather than checking the
+build on every call, one adapter is selected when a thread's managers are
+created, and its attributes are bound directly to the right methods.
+
+The adapter is also where pyvda acquires interface pointers from the
+managers, so every pointer it hands out is registered with the current
+thread's `pyvda.arena.Arena`, if there is one.
+
+Supporting a new interface GUID means adding it to `pyvda.const`,
+`pyvda.com_defns` and `pyvda.build`, then adding one adapter class here and
+appending it to `ADAPTERS`.
+"""
+from functools import partial
+from operator import methodcaller
+from typing import Any, Callable, List, Optional, Tuple, Type
+
+import pyvda.build as build
+import pyvda.const as const
+from pyvda.arena import track
+from pyvda.com_defns import IVirtualDesktop, IVirtualDesktop2
+
+
+def _unsupported(name: str, message: str):
+    def f(*args, **kwargs):
+        raise NotImplementedError(f"{name} {message}")
+    f.__name__ = name
+    return f
+
+
+def _tracked(f: Callable[..., Any]) -> Callable[..., Any]:
+    def tracked(*args, **kwargs):
+        return track(f(*args, **kwargs))
+    tracked.__name__ = getattr(f, "__name__", "tracked")
+    return tracked
+
+
+class DesktopManagerAdapter():
+    """Adapter for builds before 19041, and the base for all other adapters.
+
+    Attributes:
+        get_all_desktops: `() -> IObjectArray`
+        get_current_desktop: `() -> IVirtualDesktop`
+        find_desktop: `(GUID) -> IVirtualDesktop`
+        create_desktop: `() -> IVirtualDesktop`
+        switch_desktop: `(IVirtualDesktop) -> None`
+        switch_desktop_and_move_foreground_view: `(IVirtualDesktop) -> None`, or `None` where the build has no such method
+        get_last_active_desktop: `() -> IVirtualDesktop`, or `None` where the build has no such method
+        get_name: `(IVirtualDesktop) -> HSTRING`
+        get_all_names: `() -> List[Tuple[GUID, HSTRING]]`, in task view order
+        set_name: `(IVirtualDesktop, HSTRING) -> None`
+        get_wallpaper: `(IVirtualDesktop) -> HSTRING`
+        set_wallpaper: `(IVirtualDesktop, HSTRING) -> None`
+        set_wallpaper_for_all_desktops: `(HSTRING) -> None`
+        get_views_by_z_order: `() -> IObjectArray`, or `None` without a view collection
+        get_view_in_focus: `() -> IApplicationView`, or `None` without a view collection
+        get_view_for_hwnd: `(int) -> IApplicationView`, or `None` without a view collection
+    """
+    # The `pyvda.build` flag which must be set for this adapter to be selected.
+    flag: Optional[str] = None
+    guid = const.GUID_IVirtualDesktopManagerInternal_9000
+    # Operations which return a new interface pointer, which an active `Arena` releases
+    POINTER_OPERATIONS = (
+        "get_all_desktops", "get_current_desktop", "find_desktop", "create_desktop", "get_last_active_desktop",
+        "get_views_by_z_order", "get_view_in_focus", "get_view_for_hwnd",
+    )
+
+    def __init__(self, manager: Any, manager2: Optional[Any] = None, view_collection: Optional[Any] = None):
+        self.manager = manager
+        self.manager2 = manager2
+        self.view_collection = view_collection
+        self.bind()
+        for name in self.POINTER_OPERATIONS:
+            operation = getattr(self, name)
+            if operation is not None:
+                setattr(self, name, _tracked(operation))
+
+    def bind(self):
+        """Bind this adapter's operations to methods of `self.manager` and `self.view_collection`."""
+        m = self.manager
+        self.get_all_desktops = m.GetDesktops
+        self.get_current_desktop = m.GetCurrentDesktop
+        self.find_desktop = m.FindDesktop
+        self.create_desktop = m.CreateDesktopW
+        self.switch_desktop = m.SwitchDesktop
+        self.switch_desktop_and_move_foreground_view = None
+        self.get_last_active_desktop = None
+        self.get_name = _unsupported("name", "is not supported on < 19041 versions")
+        self.get_all_names = _unsupported("desktop_names", "is not supported on < 19041 versions")
+        self.set_name = _unsupported("rename", "is not supported on < 19041 versions")
+        if self.manager2 is not None:
+            self.set_name = self.manager2.SetName
+        self.get_wallpaper = _unsupported("get_wallpaper", "is only available on Windows 11")
+        self.set_wallpaper = _unsupported("set_wallpaper", "is only available on Windows 11")
+        self.set_wallpaper_for_all_desktops = _unsupported("set_wallpaper_for_all_desktops", "is only available on Windows 11")
+        views = self.view_collection
+        self.get_views_by_z_order = views.GetViewsByZOrder if views is not None else None
+        self.get_view_in_focus = views.GetViewInFocus if views is not None else None
+        self.get_view_for_hwnd = views.GetViewForHwnd if views is not None else None
+
+
+class Adapter19041(DesktopManagerAdapter):
+    """19041 shares the original manager GUID, but names are readable through `IVirtualDesktop2`."""
+    flag = "OVER_19041"
+
+    def bind(self):
+        super().bind()
+        self.get_name = self._name_from_desktop2
+        self.get_all_names = partial(self._all_names, IVirtualDesktop2)
+
+    def _name_from_desktop2(self, desktop: Any) -> Any:
+        desktop_id = desktop.GetID()
+        for vd in self.get_all_desktops().iter(IVirtualDesktop2):
+            if desktop_id == vd.GetID():
+                return vd.GetName()
+        raise Exception(f"Desktop with ID {desktop_id} not found")
+
+    def _all_names(self, cls: Any) -> List[Tuple[Any, Any]]:
+        return [(vd.GetID(), vd.GetName()) for vd in self.get_all_desktops().iter(cls)]
+
+
+class Adapter20231(Adapter19041):
+    """20231 added a monitor `HWND` to most methods. pyvda always passes 0."""
+    flag = "OVER_20231"
+    guid = const.GUID_IVirtualDesktopManagerInternal_20231
+
+    def bind(self):
+        super().bind()
+        m = self.manager
+        self.get_all_desktops = partial(m.GetDesktops, 0)
+        self.get_current_desktop = partial(m.GetCurrentDesktop, 0)
+        self.create_desktop = partial(m.CreateDesktopW, 0)
+        self.switch_desktop = partial(m.SwitchDesktop, 0)
+
+
+class Adapter21313(Adapter20231):
+    """21313 added names and wallpapers to `IVirtualDesktop` and the manager."""
+    flag = "OVER_21313"
+    guid = const.GUID_IVirtualDesktopManagerInternal_21313
+
+    def bind(self):
+        super().bind()
+        m = self.manager
+        self.get_name = methodcaller("GetName")
+        self.get_all_names = partial(self._all_names, IVirtualDesktop)
+        if self.manager2 is None:
+            self.set_name = m.SetName
+        self.get_wallpaper = methodcaller("GetWallpaperPath")
+        self.set_wallpaper = m.SetWallpaper
+        self.set_wallpaper_for_all_desktops = m.SetWallpaperForAllDesktops
+
+
+class Adapter22449(Adapter21313):
+    """22449 changed the vtable layout without changing the GUID."""
+    flag = "OVER_22449"
+
+
+class Adapter22621(Adapter22449):
+    """22621 dropped the monitor `HWND` arguments again."""
+    flag = "OVER_22621"
+    guid = const.GUID_IVirtualDesktopManagerInternal_22621
+
+    def bind(self):
+        super().bind()
+        m = self.manager
+        self.get_all_desktops = m.GetDesktops
+        self.get_current_desktop = m.GetCurrentDesktop
+        self.create_desktop = m.CreateDesktopW
+        self.switch_desktop = m.SwitchDesktop
+
+
+class Adapter22631(Adapter22621):
+    flag = "OVER_22631"
+    guid = const.GUID_IVirtualDesktopManagerInternal_22631
+
+    def bind(self):
+        super().bind()
+        self.get_last_active_desktop = self.manager.GetLastActiveDesktop
+
+
+class Adapter26100(Adapter22631):
+    flag = "OVER_26100"
+    guid = const.GUID_IVirtualDesktopManagerInternal_26100
+
+    def bind(self):
+        super().bind()
+        self.switch_desktop_and_move_foreground_view = self.manager.SwitchDesktopAndMoveForegroundView
+
+
+# Oldest first. `select_adapter` picks the newest adapter whose flag is set.
+ADAPTERS: List[Type[DesktopManagerAdapter]] = [
+    DesktopManagerAdapter,
+    Adapter19041,
+    Adapter20231,
+    Adapter21313,
+    Adapter22449,
+    Adapter22621,
+    Adapter22631,
+    Adapter26100,
+]
+
+
+def select_adapter() -> Type[DesktopManagerAdapter]:
+    """
+    Returns:
+        Type[DesktopManagerAdapter]: The adapter class matching the results of feature detection.
+    """
+    for adapter in reversed(ADAPTERS):
+        if adapter.flag is None or getattr(build, adapter.flag):
+            return adapter
+    raise AssertionError("DesktopManagerAdapter must always match")
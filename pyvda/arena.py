@@ -0,0 +1,193 @@
+"""
+Scoped release of COM interface pointers.
+
+comtypes releases a pointer when the Python object wrapping it is garbage
+collected. Pointers which end up in reference cycles, or which are kept
+alive by long lived objects, hold a reference in the shell until the
+collector gets to them. An `Arena` instead tracks every pointer handed out
+while it is active on the current thread, and releases them all when it
+exits. Pointers are tracked where pyvda acquires them: the operations of the
+managers' `pyvda.adapters.DesktopManagerAdapter`, such as the current
+desktop, the z-ordered view arrays and the focused view, and the items
+fetched from arrays with `IObjectArray.get_at`/`iter`:
+
+.. code:: python
+
+    with Arena():
+        for view in get_apps_by_z_order():
+            ...
+    # Every view from get_apps_by_z_order has been released here
+
+Objects created inside an arena must not be used after it exits, unless
+they were passed to `Arena.keep`. Released pointers are nulled in place, so
+code which caches pointers beyond the call that fetched them, such as
+`MRUTracker`, passes them to `untrack` first.
+"""
+import logging
+import sys
+import threading
+import traceback
+import weakref
+from ctypes import c_void_p
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class Outstanding(NamedTuple):
+    """A tracked pointer which was still in use when it was checked."""
+    interface: str
+    # Number of live `AppView`s and `VirtualDesktop`s holding the pointer
+    references: int
+    # Where the pointer was created, only recorded with `leak_check=True`
+    created: Optional[str]
+
+
+class _Tracked():
+    def __init__(self, ptr: Any, created: Optional[str]):
+        self.ptr = ptr
+        self.created = created
+        self.holders: List[weakref.ref] = []
+
+    def references(self) -> int:
+        return sum(1 for ref in self.holders if ref() is not None)
+
+
+def release(ptr: Any):
+    """Release a COM pointer now, and null it so that comtypes doesn't release it again."""
+    ptr = getattr(ptr, "__wrapped__", ptr)
+    if isinstance(ptr, c_void_p):
+        if ptr:
+            ptr.Release() # type: ignore
+            c_void_p.from_buffer(ptr).value = None
+    else:
+        ptr.Release()
+
+
+def _stack() -> List["Arena"]:
+    return getattr(_local, "stack", None) or []
+
+
+def track(ptr: Any) -> Any:
+    """Register `ptr` with the current thread's innermost arena, if there is one.
+
+    Returns:
+        The pointer, unchanged.
+    """
+    stack = _stack()
+    if stack:
+        stack[-1]._track(ptr)
+    return ptr
+
+
+def hold(ptr: Any, holder: Any):
+    """Record that `holder` uses `ptr`, so that `Arena.outstanding` reports the
+    pointer for as long as `holder` is alive. Untracked pointers are ignored.
+    """
+    key = id(getattr(ptr, "__wrapped__", ptr))
+    for arena in reversed(_stack()):
+        tracked = arena._entries.get(key)
+        if tracked:
+            tracked[-1].holders.append(weakref.ref(holder))
+            return
+
+
+def untrack(ptr: Any):
+    """Stop the current thread's arenas tracking `ptr`, so that it stays usable
+    after they exit. Caches which keep pointers call this, since the pointers
+    would otherwise be nulled under them.
+    """
+    key = id(getattr(ptr, "__wrapped__", ptr))
+    for arena in reversed(_stack()):
+        tracked = arena._entries.get(key)
+        if tracked:
+            # Like `hold`, the most recently handed out reference
+            tracked.pop()
+            if not tracked:
+                del arena._entries[key]
+            return
+
+
+class Arena():
+    def __init__(self, leak_check: bool = False):
+        """
+        Args:
+            leak_check (bool, optional): Record where each pointer was created, and log pointers which are still in use by an `AppView` or `VirtualDesktop` when the arena exits. Defaults to False.
+        """
+        self.leak_check = leak_check
+        # Keyed by id() of the pointer. The same object can be tracked more
+        # than once if it is handed out again, each time with a new reference.
+        self._entries: Dict[int, List[_Tracked]] = {}
+        self.released = 0
+
+    def _track(self, ptr: Any):
+        created = "".join(traceback.format_stack(sys._getframe(2), limit=8)) if self.leak_check else None
+        self._entries.setdefault(id(ptr), []).append(_Tracked(ptr, created))
+
+    def keep(self, *objects: Any):
+        """Stop tracking the pointers behind `objects`, so they remain usable after the arena exits.
+
+        Args:
+            objects: `AppView`s, `VirtualDesktop`s or interface pointers.
+        """
+        for obj in objects:
+            ptr = getattr(obj, "_view", None) or getattr(obj, "_virtual_desktop", None) or obj
+            self._entries.pop(id(getattr(ptr, "__wrapped__", ptr)), None)
+
+    def outstanding(self) -> List[Outstanding]:
+        """Tracked pointers which are still held by an `AppView` or
+        `VirtualDesktop` which is alive. Pointers held directly by other
+        objects aren't counted.
+
+        Returns:
+            List[Outstanding]: One entry per pointer in use.
+        """
+        result = []
+        for tracked in self._tracked():
+            refs = tracked.references()
+            if refs > 0:
+                interface = type(getattr(tracked.ptr, "__wrapped__", tracked.ptr)).__name__
+                result.append(Outstanding(interface, refs, tracked.created))
+        return result
+
+    def release(self) -> int:
+        """Release every tracked pointer.
+
+        Returns:
+            int: The number of pointers released.
+        """
+        if self.leak_check:
+            for leak in self.outstanding():
+                logger.warning(
+                    "%s still has %d reference(s) at arena exit, created at:\n%s",
+                    leak.interface, leak.references, leak.created,
+                )
+        entries = list(self._tracked())
+        self._entries = {}
+        for tracked in entries:
+            try:
+                release(tracked.ptr)
+            except Exception:
+                logger.exception("Failed to release %r", tracked.ptr)
+        self.released += len(entries)
+        return len(entries)
+
+    def _tracked(self) -> Iterator[_Tracked]:
+        for entries in self._entries.values():
+            yield from entries
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def __enter__(self) -> "Arena":
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.stack.remove(self)
+        self.release()
@@ -1,17 +1,19 @@
 import logging
 import os
+import platform
 import sys
 from ctypes import POINTER
-
-import _ctypes
-from comtypes import CLSCTX_LOCAL_SERVER, GUID, CoCreateInstance, IUnknown
+from typing import Mapping
 
 import pyvda.const as const
 from pyvda.com_base import IServiceProvider
+from pyvda.compat import CLSCTX_LOCAL_SERVER, GUID, COMError, CoCreateInstance, IUnknown
 
 logger = logging.getLogger(__name__)
 
 
+FLAGS = ("OVER_19041", "OVER_20231", "OVER_21313", "OVER_22449", "OVER_22621", "OVER_22631", "OVER_26100")
+
 OVER_19041 = False
 OVER_20231 = False
 OVER_21313 = False
@@ -20,6 +22,22 @@ OVER_22621 = False
 OVER_22631 = False
 OVER_26100 = False
 
+# Whether the flags have been detected or set with `set_flags`
+_detected = False
+
+def _check_release():
+    try:
+        release = int(platform.release())
+        return release >= 10
+    except ValueError:
+        return platform.release() == "10"
+
+def _check_version():
+    if platform.system() != "Windows" or not _check_release():
+        raise NotImplementedError(
+            "The virtual desktop feature is only available on Windows 10 and later."
+        )
+
 def try_create_manager(guid: GUID) -> bool:
     pServiceProvider = CoCreateInstance(
         const.CLSID_ImmersiveShell, IServiceProvider, CLSCTX_LOCAL_SERVER
@@ -32,7 +50,7 @@ def try_create_manager(guid: GUID) -> bool:
             guid,
             pObject,
         )
-    except _ctypes.COMError as e:
+    except COMError as e:
         logger.debug(f"Querying {guid}... {e.text}")
         return False
     logger.debug(f"Querying {guid}... Success!")
@@ -50,6 +68,7 @@ def do_feature_detection():
     if os.getenv("READTHEDOCS"):
         return
 
+    _check_version()
     logger.debug("Starting feature detection...")
     winver = sys.getwindowsversion()
     # The guid for 26100 seems to also be available on 22631, no the previous method of feature detection is not reliable.
@@ -119,4 +138,31 @@ def do_feature_detection():
 
     logger.debug("Feature detection complete. Windows version is under 19041")
 
-do_feature_detection()
+def detect():
+    """Detect the Windows build's features, unless that has already been done
+    or the flags were set with `set_flags`. Called before the interfaces are
+    declared, since their layouts depend on the build.
+    """
+    global _detected
+    if _detected:
+        return
+    do_feature_detection()
+    _detected = True
+
+def is_detected() -> bool:
+    """Whether the flags have been detected, or set with `set_flags`."""
+    return _detected
+
+def set_flags(flags: Mapping[str, bool], detected: bool = True):
+    """Use the given feature flags instead of detecting them, e.g. those of
+    the machine a `pyvda.trace` was recorded on.
+
+    Args:
+        flags (Mapping[str, bool]): Values for the `OVER_*` flags. Flags which are missing are left alone.
+        detected (bool, optional): Skip feature detection from now on. Defaults to True.
+    """
+    global _detected
+    for flag in FLAGS:
+        if flag in flags:
+            globals()[flag] = bool(flags[flag])
+    _detected = detected
@@ -0,0 +1,272 @@
+"""
+Command line interface, run as `pyvda` or `python -m pyvda`.
+
+Every command prints one line of JSON. Desktops are given by number
+(1-indexed), name or GUID, and windows by handle (decimal or 0x hex),
+defaulting to the foreground window.
+
+.. code:: shell
+
+    $ pyvda list
+    $ pyvda go 2 --focus
+    $ pyvda move Comms --hwnd 0x1F02A6
+    $ pyvda pin --app
+
+With `--batch`, commands are read from stdin as JSON lines, and each result
+is written to stdout as soon as it is ready, so that scripts can keep one
+process running instead of paying the start up cost for every command::
+
+    {"cmd": "go", "desktop": 2, "id": 1}
+    {"cmd": "query", "hwnd": 132774}
+
+Each result line is `{"ok": true, "result": ...}` or
+`{"ok": false, "error": ..., "type": ...}`, echoing the request's `id` if it
+had one.
+"""
+import argparse
+import json
+import sys
+from typing import IO, Any, Callable, Dict, List, Optional, Union
+
+from pyvda.compat import GUID
+from pyvda.pyvda import (
+    AppView,
+    VirtualDesktop,
+    get_virtual_desktops,
+    windows_by_desktop,
+)
+from pyvda.utils import wstr
+
+DesktopArg = Union[int, str]
+
+
+def _desktop(ref: Optional[DesktopArg]) -> VirtualDesktop:
+    """Resolve a desktop number, GUID or name. `None` is the current desktop."""
+    if ref is None:
+        return VirtualDesktop.current()
+    if isinstance(ref, int) or ref.isdigit():
+        return VirtualDesktop(int(ref))
+    if ref.startswith("{") and ref.endswith("}"):
+        return VirtualDesktop(desktop_id=GUID(ref))
+    return VirtualDesktop.by_name(ref)
+
+
+def _window(hwnd: Optional[Union[int, str]]) -> AppView:
+    if hwnd is None:
+        return AppView.current()
+    return AppView(hwnd=hwnd if isinstance(hwnd, int) else int(hwnd, 0))
+
+
+def _desktop_info(desktop: VirtualDesktop, number: int) -> Dict[str, Any]:
+    try:
+        name = desktop.name
+    except NotImplementedError:
+        name = None
+    return {"number": number, "id": str(desktop.id), "name": name}
+
+
+def _window_info(view: AppView, numbers: Dict[GUID, int]) -> Dict[str, Any]:
+    desktop_id = view.desktop_id
+    return {
+        "hwnd": view.hwnd,
+        "app_id": wstr(view.app_id),
+        "desktop": numbers.get(desktop_id),
+        "desktop_id": str(desktop_id),
+        "pinned": view.is_pinned(),
+        "app_pinned": bool(view.is_app_pinned()),
+    }
+
+
+def _numbers() -> Dict[GUID, int]:
+    return {d.id: i for i, d in enumerate(get_virtual_desktops(), 1)}
+
+
+def cmd_list(windows: bool = False, all: bool = False) -> Dict[str, Any]:
+    """List desktops, and optionally the windows on each."""
+    desktops = get_virtual_desktops()
+    current = VirtualDesktop.current().id
+    result: Dict[str, Any] = {
+        "desktops": [_desktop_info(d, i) for i, d in enumerate(desktops, 1)],
+        "current": next((i for i, d in enumerate(desktops, 1) if d.id == current), None),
+    }
+    if windows:
+        numbers = {d.id: i for i, d in enumerate(desktops, 1)}
+        groups = windows_by_desktop(switcher_windows=not all)
+        result["windows"] = [
+            _window_info(view, numbers)
+            for views in list(groups.desktops.values()) + [groups.pinned]
+            for view in views
+        ]
+    return result
+
+
+def cmd_query(hwnd: Optional[Union[int, str]] = None) -> Dict[str, Any]:
+    """Describe a window and the current desktop."""
+    numbers = _numbers()
+    current = VirtualDesktop.current()
+    return {
+        "window": _window_info(_window(hwnd), numbers),
+        "current": _desktop_info(current, numbers[current.id]),
+    }
+
+
+def cmd_go(desktop: DesktopArg, focus: bool = False) -> Dict[str, Any]:
+    """Switch to a desktop, optionally focusing its top window."""
+    target = _desktop(desktop)
+    if focus:
+        view = target.go_and_focus()
+        return {"id": str(target.id), "focused": view.hwnd if view is not None else None}
+    target.go()
+    return {"id": str(target.id)}
+
+
+def cmd_move(desktop: DesktopArg, hwnd: Optional[Union[int, str]] = None, follow: bool = False) -> Dict[str, Any]:
+    """Move a window to a desktop, optionally switching there too."""
+    view = _window(hwnd)
+    target = _desktop(desktop)
+    view.move(target)
+    if follow:
+        target.go()
+        view.set_focus()
+    return {"hwnd": view.hwnd, "id": str(target.id)}
+
+
+def cmd_pin(hwnd: Optional[Union[int, str]] = None, app: bool = False, off: bool = False) -> Dict[str, Any]:
+    """Pin or unpin a window, or all of its app's windows, to every desktop."""
+    view = _window(hwnd)
+    if app:
+        view.unpin_app() if off else view.pin_app()
+    else:
+        view.unpin() if off else view.pin()
+    return {"hwnd": view.hwnd, "pinned": not off, "app": app}
+
+
+def cmd_rename(name: str, desktop: Optional[DesktopArg] = None) -> Dict[str, Any]:
+    """Rename a desktop, by default the current one."""
+    target = _desktop(desktop)
+    target.rename(name)
+    return {"id": str(target.id), "name": name}
+
+
+def cmd_create(name: Optional[str] = None) -> Dict[str, Any]:
+    """Create a desktop."""
+    desktop = VirtualDesktop.create()
+    if name:
+        desktop.rename(name)
+    return {"id": str(desktop.id), "number": desktop.number}
+
+
+def cmd_remove(desktop: DesktopArg, fallback: Optional[DesktopArg] = None) -> Dict[str, Any]:
+    """Remove a desktop, moving its windows to the fallback desktop."""
+    target = _desktop(desktop)
+    target.remove(_desktop(fallback) if fallback is not None else None)
+    return {"id": str(target.id)}
+
+
+COMMANDS: Dict[str, Callable[..., Any]] = {
+    "list": cmd_list,
+    "query": cmd_query,
+    "go": cmd_go,
+    "move": cmd_move,
+    "pin": cmd_pin,
+    "rename": cmd_rename,
+    "create": cmd_create,
+    "remove": cmd_remove,
+}
+
+
+def _write(out: IO[str], obj: Any):
+    out.write(json.dumps(obj, default=str) + "\n")
+    out.flush()
+
+
+def _error(e: Exception) -> Dict[str, Any]:
+    return {"ok": False, "error": str(e), "type": type(e).__name__}
+
+
+def run_batch(lines: IO[str], out: IO[str]) -> int:
+    """Run JSON-lines commands from `lines`, writing one result line to `out` for each.
+
+    Returns:
+        int: The number of commands which failed.
+    """
+    failures = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        request: Dict[str, Any] = {}
+        try:
+            request = json.loads(line)
+            params = dict(request)
+            params.pop("id", None)
+            try:
+                func = COMMANDS[params.pop("cmd")]
+            except KeyError as e:
+                raise ValueError(f"Unknown or missing command {e}") from None
+            reply = {"ok": True, "result": func(**params)}
+        except Exception as e:
+            reply = _error(e)
+        if not reply["ok"]:
+            failures += 1
+        if isinstance(request, dict) and "id" in request:
+            reply["id"] = request["id"]
+        _write(out, reply)
+    return failures
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pyvda", description="Control Windows virtual desktops.")
+    parser.add_argument("--batch", action="store_true", help="read JSON-lines commands from stdin")
+    sub = parser.add_subparsers(dest="cmd")
+
+    p = sub.add_parser("list", help=cmd_list.__doc__)
+    p.add_argument("--windows", action="store_true", help="also list windows")
+    p.add_argument("--all", action="store_true", help="include windows not shown in alt-tab")
+
+    p = sub.add_parser("query", help=cmd_query.__doc__)
+    p.add_argument("--hwnd")
+
+    p = sub.add_parser("go", help=cmd_go.__doc__)
+    p.add_argument("desktop")
+    p.add_argument("--focus", action="store_true", help="focus the desktop's top window")
+
+    p = sub.add_parser("move", help=cmd_move.__doc__)
+    p.add_argument("desktop")
+    p.add_argument("--hwnd")
+    p.add_argument("--follow", action="store_true", help="switch to the desktop too")
+
+    p = sub.add_parser("pin", help=cmd_pin.__doc__)
+    p.add_argument("--hwnd")
+    p.add_argument("--app", action="store_true", help="pin the window's app")
+    p.add_argument("--off", action="store_true", help="unpin instead")
+
+    p = sub.add_parser("rename", help=cmd_rename.__doc__)
+    p.add_argument("name")
+    p.add_argument("--desktop")
+
+    p = sub.add_parser("create", help=cmd_create.__doc__)
+    p.add_argument("--name")
+
+    p = sub.add_parser("remove", help=cmd_remove.__doc__)
+    p.add_argument("desktop")
+    p.add_argument("--fallback")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = _parser()
+    args = vars(parser.parse_args(argv))
+    cmd = args.pop("cmd")
+    if args.pop("batch"):
+        if cmd is not None:
+            parser.error("--batch reads its commands from stdin and can't be combined with a command")
+        return 1 if run_batch(sys.stdin, sys.stdout) else 0
+    if cmd is None:
+        parser.print_help()
+        return 2
+    try:
+        _write(sys.stdout, {"ok": True, "result": COMMANDS[cmd](**args)})
+    except Exception as e:
+        _write(sys.stdout, _error(e))
+        return 1
+    return 0
@@ -1,8 +1,9 @@
-from ctypes import HRESULT, POINTER, c_ulonglong
-from ctypes.wintypes import LPVOID, UINT, WCHAR
+from ctypes import POINTER, c_ulonglong
+from ctypes.wintypes import DWORD, LPVOID, UINT, WCHAR
 from typing import Any, Iterator
 
-from comtypes import COMMETHOD, GUID, STDMETHOD, IUnknown
+from pyvda.arena import track
+from pyvda.compat import COMMETHOD, GUID, HRESULT, STDMETHOD, IUnknown
 
 PWSTR = POINTER(WCHAR)
 REFGUID = POINTER(GUID)
@@ -16,6 +17,17 @@ class IServiceProvider(IUnknown):
     ]
 
 
+class IGlobalInterfaceTable(IUnknown):
+    _iid_ = GUID("{00000146-0000-0000-C000-000000000046}")
+    _methods_ = [
+        COMMETHOD([], HRESULT, "RegisterInterfaceInGlobal",
+            (["in"], POINTER(IUnknown), "pUnk"), (["in"], REFIID, "riid"), (["out"], POINTER(DWORD), "pdwCookie")),
+        COMMETHOD([], HRESULT, "RevokeInterfaceFromGlobal", (["in"], DWORD, "dwCookie")),
+        COMMETHOD([], HRESULT, "GetInterfaceFromGlobal",
+            (["in"], DWORD, "dwCookie"), (["in"], REFIID, "riid"), (["out"], POINTER(POINTER(IUnknown)), "ppv")),
+    ]
+
+
 class IObjectArray(IUnknown):
     _iid_ = GUID("{92CA9DCD-5622-4BBA-A805-5E9F541BD8C9}")
     _methods_ = [
@@ -26,7 +38,7 @@ class IObjectArray(IUnknown):
     def get_at(self, i: int, cls: Any) -> Any:
         item = POINTER(cls)()
         self.GetAt(i, cls._iid_, item) # type: ignore
-        return item
+        return track(item)
 
     def iter(self, cls: Any) -> Iterator[Any]:
         for i in range(self.GetCount()): # type: ignore
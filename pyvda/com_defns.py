@@ -11,7 +11,7 @@ References:
 """
 import os
 import sys
-from ctypes import HRESULT, POINTER, c_ulonglong
+from ctypes import POINTER, c_ulonglong
 from ctypes.wintypes import (
     BOOL,
     DWORD,
@@ -25,13 +25,14 @@ from ctypes.wintypes import (
     ULONG,
 )
 
-from comtypes import COMMETHOD, GUID, STDMETHOD, IUnknown
-
 import pyvda.build as build
 import pyvda.const as const
 from pyvda.com_base import PWSTR, REFGUID, REFIID, IObjectArray
+from pyvda.compat import COMMETHOD, GUID, HRESULT, STDMETHOD, IUnknown
 from pyvda.winstring import HSTRING
 
+build.detect()
+
 CLSID_ImmersiveShell = GUID("{C2F03A33-21F5-47FA-B4BB-156362A2F239}")
 CLSID_VirtualDesktopManagerInternal = GUID("{C5E0CDCA-7B6E-41B2-9FC4-D93975CC467B}")
 CLSID_IVirtualDesktopManager = GUID("{AA509086-5CA9-4C25-8F95-589D3C07B48A}")
@@ -102,7 +103,7 @@ IApplicationView._methods_ = [
     STDMETHOD(HRESULT, "IsInHighZOrderBand", (POINTER(BOOL),)),
     STDMETHOD(HRESULT, "IsSplashScreenPresented", (POINTER(BOOL),)),
     STDMETHOD(HRESULT, "Flash", ()),
-    STDMETHOD(HRESULT, "GetRootSwitchableOwner", (POINTER(POINTER(IApplicationView)),)),
+    COMMETHOD([], HRESULT, "GetRootSwitchableOwner", (["out"], POINTER(POINTER(IApplicationView)), "ppOwner")),
     STDMETHOD(HRESULT, "EnumerateOwnershipTree", (POINTER(POINTER(IObjectArray)),)),
     STDMETHOD(HRESULT, "GetEnterpriseId", (POINTER(PWSTR),)),
     STDMETHOD(HRESULT, "IsMirrored", (POINTER(BOOL),)),
@@ -329,38 +330,6 @@ class IVirtualDesktopManagerInternal(IUnknown):
             COMMETHOD([], HRESULT, "FindDesktop", (["in"], POINTER(GUID), "pGuid"), (["out"], POINTER(POINTER(IVirtualDesktop)), "pDesktop")),
         ]
 
-    def get_all_desktops(self) -> IObjectArray:
-        if build.OVER_22621:
-            return self.GetDesktops() # type: ignore
-        elif build.OVER_20231:
-            return self.GetDesktops(0) # type: ignore
-        else:
-            return self.GetDesktops() # type: ignore
-
-    def get_current_desktop(self) -> IVirtualDesktop:
-        if build.OVER_22621:
-            return self.GetCurrentDesktop() # type: ignore
-        elif build.OVER_20231:
-            return self.GetCurrentDesktop(0) # type: ignore
-        else:
-            return self.GetCurrentDesktop() # type: ignore
-
-    def create_desktop(self) -> IVirtualDesktop:
-        if build.OVER_22621:
-            return self.CreateDesktopW() # type: ignore
-        elif build.OVER_20231:
-            return self.CreateDesktopW(0) # type: ignore
-        else:
-            return self.CreateDesktopW() # type: ignore
-
-    def switch_desktop(self, target: IVirtualDesktop) -> IVirtualDesktop:
-        if build.OVER_22621:
-            return self.SwitchDesktop(target) # type: ignore
-        elif build.OVER_20231:
-            return self.SwitchDesktop(0, target) # type: ignore
-        else:
-            return self.SwitchDesktop(target) # type: ignore
-
 
 GUID_IVirtualDesktopManagerInternal2 = GUID("{0F3A72B0-4566-487E-9A33-4ED302F6D6CE}")
 class IVirtualDesktopManagerInternal2(IUnknown):
@@ -0,0 +1,130 @@
+"""
+The names pyvda takes from comtypes and the Windows only parts of ctypes.
+
+On Windows these are the real thing. Elsewhere, stand-ins are defined which
+are enough to import pyvda, declare its interfaces and run it against a
+backend which doesn't call into Windows, such as `pyvda.trace.ReplayBackend`.
+Anything which does need Windows raises `OSError` when it is called.
+"""
+import ctypes
+import uuid
+from typing import Any
+
+try:
+    from _ctypes import COMError
+    from ctypes import HRESULT, WINFUNCTYPE, windll
+
+    from comtypes import (
+        CLSCTX_INPROC_SERVER,
+        CLSCTX_LOCAL_SERVER,
+        COMMETHOD,
+        GUID,
+        STDMETHOD,
+        CoCreateInstance,
+        CoInitializeEx,
+        IUnknown,
+    )
+    WINDOWS = True
+except ImportError:
+    WINDOWS = False
+
+    class COMError(Exception): # type: ignore
+        def __init__(self, hresult: int, text: Any, details: Any):
+            super().__init__(hresult, text, details)
+            self.hresult = hresult
+            self.text = text
+            self.details = details
+
+    class _Unavailable():
+        """Stands in for a DLL or a function in one."""
+
+        def __init__(self, name: str):
+            object.__setattr__(self, "_name", name)
+
+        def __getattr__(self, name: str) -> "_Unavailable":
+            if name.startswith("__"):
+                raise AttributeError(name)
+            return _Unavailable(f"{self._name}.{name}")
+
+        def __setattr__(self, name: str, value: Any):
+            # e.g. setting argtypes on a function
+            pass
+
+        def __call__(self, *args, **kwargs):
+            raise OSError(f"{self._name} is only available on Windows")
+
+        def LoadLibrary(self, name: str) -> "_Unavailable":
+            return _Unavailable(name)
+
+    windll = _Unavailable("windll") # type: ignore
+    HRESULT = ctypes.c_long # type: ignore
+
+    def WINFUNCTYPE(restype, *argtypes, **kwargs): # type: ignore
+        proto = ctypes.CFUNCTYPE(restype, *argtypes, **kwargs)
+
+        class Prototype(proto): # type: ignore
+            _flags_ = proto._flags_
+            _restype_ = proto._restype_
+            _argtypes_ = proto._argtypes_
+
+            def __new__(cls, *args):
+                # Functions looked up in a DLL, e.g. `WINFUNCTYPE(...)(("Name", windll.user32))`
+                if args and isinstance(args[0], tuple):
+                    return _Unavailable(args[0][0])
+                return proto.__new__(cls, *args)
+
+        return Prototype
+
+    class GUID(ctypes.Structure): # type: ignore
+        _fields_ = [
+            ("Data1", ctypes.c_ulong),
+            ("Data2", ctypes.c_ushort),
+            ("Data3", ctypes.c_ushort),
+            ("Data4", ctypes.c_ubyte * 8),
+        ]
+
+        def __init__(self, name: Any = None):
+            super().__init__()
+            if name is not None:
+                ctypes.memmove(ctypes.byref(self), uuid.UUID(name).bytes_le, 16)
+
+        def _uuid(self) -> uuid.UUID:
+            return uuid.UUID(bytes_le=ctypes.string_at(ctypes.byref(self), 16))
+
+        def __str__(self) -> str:
+            return "{%s}" % str(self._uuid()).upper()
+
+        def __repr__(self) -> str:
+            return f'GUID("{self}")'
+
+        def __bool__(self) -> bool:
+            return self._uuid().int != 0
+
+        def __eq__(self, other: Any) -> bool:
+            return isinstance(other, GUID) and self._uuid() == other._uuid()
+
+        def __hash__(self) -> int:
+            return hash(self._uuid())
+
+    CLSCTX_INPROC_SERVER = 0x1
+    CLSCTX_LOCAL_SERVER = 0x4
+
+    def COMMETHOD(idlflags, restype, name, *argspec): # type: ignore
+        return (restype, name, argspec, idlflags)
+
+    def STDMETHOD(restype, name, argtypes=()): # type: ignore
+        return (restype, name, argtypes)
+
+    class IUnknown(ctypes.c_void_p): # type: ignore
+        _iid_ = GUID("{00000000-0000-0000-C000-000000000046}")
+        _methods_ = [
+            STDMETHOD(HRESULT, "QueryInterface", ()),
+            STDMETHOD(ctypes.c_ulong, "AddRef"),
+            STDMETHOD(ctypes.c_ulong, "Release"),
+        ]
+
+    def CoCreateInstance(*args, **kwargs): # type: ignore
+        raise OSError("COM is only available on Windows")
+
+    def CoInitializeEx(*args, **kwargs): # type: ignore
+        raise OSError("COM is only available on Windows")
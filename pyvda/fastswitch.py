@@ -0,0 +1,134 @@
+"""
+Near-instant desktop switching by cloaking windows directly.
+
+`VirtualDesktop.go` plays the shell's slide animation. A `FastSwitcher`
+instead keeps a partition of windows by desktop, uncloaks the target
+desktop's windows and cloaks the previous desktop's windows itself, and only
+then tells the shell which desktop is current:
+
+.. code:: python
+
+    switcher = FastSwitcher()
+    switcher.go(VirtualDesktop(2))
+
+This is opt-in because it relies on `IApplicationView.SetCloak`, which is
+undocumented. Windows opened since the partition was built, or moved
+without pyvda, are left to the shell until `refresh` is called. Switches made
+without pyvda are picked up from the shell on the next `go`.
+"""
+from typing import Dict, List, Optional
+
+from pyvda.arena import untrack
+from pyvda.compat import GUID, COMError
+from pyvda.pyvda import (
+    AppView,
+    VirtualDesktop,
+    _desktop_listeners,
+    _notify,
+    managers,
+    windows_by_desktop,
+)
+
+# APPLICATION_VIEW_CLOAK_TYPE, the kind of cloak the shell uses for windows on other desktops
+AVCT_VIRTUAL_DESKTOP = 2
+CLOAKED = 2
+UNCLOAKED = 0
+
+
+class FastSwitcher():
+    def __init__(self, reconcile: bool = True):
+        """
+        Args:
+            reconcile (bool, optional): Switch the shell to the new desktop straight after the windows have been swapped, so that alt-tab, the taskbar and new windows agree with what is shown. If False, call `sync` later. Defaults to True.
+        """
+        self.reconcile = reconcile
+        # Desktop ID to the windows on it, not including pinned windows
+        self._partition: Optional[Dict[GUID, List[AppView]]] = None
+        # The desktop whose windows are currently shown
+        self._shown: Optional[GUID] = None
+        # The shell's current desktop as of the last switch this switcher knows about
+        self._synced: Optional[GUID] = None
+        self._desktops: Dict[GUID, VirtualDesktop] = {}
+        self._tracking = True
+        _desktop_listeners.append(self._on_desktop_event)
+
+    def close(self):
+        """Stop following switches made with `VirtualDesktop.go`."""
+        if self._tracking:
+            _desktop_listeners.remove(self._on_desktop_event)
+            self._tracking = False
+
+    def _on_desktop_event(self, event: str, desktop: VirtualDesktop):
+        if event == "switch":
+            self._shown = self._synced = desktop.id
+        elif event == "remove":
+            # Its windows have moved to the fallback desktop
+            self._partition = None
+            self._desktops.pop(desktop.id, None)
+        elif event == "move":
+            self._partition = None
+
+    def refresh(self):
+        """Rebuild the partition of windows by desktop, in one pass over the z-order."""
+        groups = windows_by_desktop(switcher_windows=False)
+        for views in groups.desktops.values():
+            for view in views:
+                # Held until the next refresh, so must outlive any arena
+                untrack(view._view)
+        self._partition = groups.desktops
+        self._shown = self._synced = managers.adapter.get_current_desktop().GetID() # type: ignore
+
+    def _set_cloak(self, desktop_id: Optional[GUID], cloak: int) -> int:
+        views = self._partition.get(desktop_id, []) # type: ignore
+        alive = []
+        for view in views:
+            try:
+                view._view.SetCloak(AVCT_VIRTUAL_DESKTOP, cloak) # type: ignore
+            except COMError:
+                # The window has closed
+                continue
+            alive.append(view)
+        if len(alive) != len(views):
+            self._partition[desktop_id] = alive # type: ignore
+        return len(alive)
+
+    def go(self, desktop: VirtualDesktop) -> int:
+        """Show a desktop's windows and hide the current desktop's windows.
+
+        Args:
+            desktop (VirtualDesktop): Desktop to switch to.
+
+        Returns:
+            int: The number of windows cloaked or uncloaked.
+        """
+        if self._partition is None:
+            self.refresh()
+        else:
+            current = managers.adapter.get_current_desktop().GetID() # type: ignore
+            if current != self._synced:
+                # The shell was switched without pyvda, e.g. from the keyboard, and showed that desktop's windows
+                self._shown = self._synced = current
+        target = desktop.id
+        untrack(desktop._virtual_desktop)
+        self._desktops[target] = desktop
+        if target == self._shown:
+            return 0
+        # Show the new windows before hiding the old ones, so the desktop never flashes empty
+        changed = self._set_cloak(target, UNCLOAKED)
+        changed += self._set_cloak(self._shown, CLOAKED)
+        self._shown = target
+        if self.reconcile:
+            self.sync()
+        return changed
+
+    def sync(self):
+        """Switch the shell to the desktop which is shown, if it hasn't been already."""
+        if self._shown is None:
+            return
+        if managers.adapter.get_current_desktop().GetID() == self._shown: # type: ignore
+            return
+        desktop = self._desktops.get(self._shown)
+        if desktop is None:
+            desktop = VirtualDesktop(desktop_id=self._shown)
+        managers.adapter.switch_desktop(desktop._virtual_desktop) # type: ignore
+        _notify("switch", desktop)
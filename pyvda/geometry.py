@@ -0,0 +1,230 @@
+"""
+Read and set the positions of many windows at once, for tiling layouts.
+
+`read_geometry` walks the z-order once and reads each window's visible
+frame straight from its `IApplicationView`. `apply_layout` then moves every
+window in a single `DeferWindowPos` batch, so the windows are repainted and
+composed once rather than once per window:
+
+.. code:: python
+
+    windows = read_geometry()
+    screen = Rect(0, 0, 2560, 1440)
+    width = screen.width // len(windows)
+    apply_layout({
+        w.hwnd: Rect(i * width, 0, (i + 1) * width, screen.bottom)
+        for i, w in enumerate(windows)
+    })
+
+"""
+import ctypes
+from ctypes import byref
+from ctypes.wintypes import BOOL, HANDLE, HWND, INT, RECT, UINT
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from pyvda.com_defns import IApplicationView
+from pyvda.compat import WINFUNCTYPE, windll
+from pyvda.pyvda import VirtualDesktop, managers
+
+SWP_NOSIZE = 0x0001
+SWP_NOMOVE = 0x0002
+SWP_NOZORDER = 0x0004
+SWP_NOACTIVATE = 0x0010
+SWP_NOOWNERZORDER = 0x0200
+SW_SHOWNOACTIVATE = 4
+
+_BeginDeferWindowPos = WINFUNCTYPE(HANDLE, INT)(("BeginDeferWindowPos", windll.user32))
+_DeferWindowPos = WINFUNCTYPE(HANDLE, HANDLE, HWND, HWND, INT, INT, INT, INT, UINT)(("DeferWindowPos", windll.user32))
+_EndDeferWindowPos = WINFUNCTYPE(BOOL, HANDLE)(("EndDeferWindowPos", windll.user32))
+
+
+class Rect(NamedTuple):
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+    @property
+    def width(self) -> int:
+        return self.right - self.left
+
+    @property
+    def height(self) -> int:
+        return self.bottom - self.top
+
+
+class WindowGeometry(NamedTuple):
+    hwnd: int
+    # The visible frame, as drawn by DWM
+    frame: Rect
+    # The window rectangle, which also includes any invisible resize borders
+    window: Rect
+
+    def window_for_frame(self, frame: Rect) -> Rect:
+        """The window rectangle which puts this window's visible frame at `frame`."""
+        return Rect(
+            frame.left + self.window.left - self.frame.left,
+            frame.top + self.window.top - self.frame.top,
+            frame.right + self.window.right - self.frame.right,
+            frame.bottom + self.window.bottom - self.frame.bottom,
+        )
+
+
+def window_rect(hwnd: int) -> Rect:
+    """The window rectangle of a window, in screen coordinates."""
+    rect = RECT()
+    if not windll.user32.GetWindowRect(hwnd, byref(rect)):
+        raise ctypes.WinError()
+    return Rect(rect.left, rect.top, rect.right, rect.bottom)
+
+
+def _frame_rect(view: IApplicationView) -> Rect:
+    rect = RECT()
+    view.GetExtendedFramePosition(byref(rect)) # type: ignore
+    return Rect(rect.left, rect.top, rect.right, rect.bottom)
+
+
+def _geometry_of(hwnd: int) -> WindowGeometry:
+    view = managers.view_cache.get(hwnd) # type: ignore
+    return WindowGeometry(hwnd, _frame_rect(view), window_rect(hwnd))
+
+
+def _views_on(desktop: Optional[VirtualDesktop], include_pinned: bool, switcher_windows: bool) -> Iterator[IApplicationView]:
+    """The views on a desktop, in z-order, from one `GetViewsByZOrder` call."""
+    if desktop is None:
+        desktop = VirtualDesktop.current()
+    desktop_id = desktop.id
+    views_arr = managers.adapter.get_views_by_z_order() # type: ignore
+    for view in views_arr.iter(IApplicationView):
+        if switcher_windows and not view.GetShowInSwitchers():
+            continue
+        if view.GetVirtualDesktopId() != desktop_id:
+            if not include_pinned or not managers.pinned_apps.IsViewPinned(view): # type: ignore
+                continue
+        yield view
+
+
+def read_geometry(
+    desktop: Optional[VirtualDesktop] = None,
+    include_pinned: bool = True,
+    switcher_windows: bool = True,
+) -> List[WindowGeometry]:
+    """Read the positions of every window on a desktop in one pass over the z-order.
+
+    Args:
+        desktop (VirtualDesktop, optional): Desktop to read. Defaults to the current desktop.
+        include_pinned (bool, optional): Include pinned windows. Defaults to True.
+        switcher_windows (bool, optional): Only include windows which appear in the alt-tab dialogue. Defaults to True.
+
+    Returns:
+        List[WindowGeometry]: The windows' positions, with the foreground window first.
+    """
+    result = []
+    for view in _views_on(desktop, include_pinned, switcher_windows):
+        hwnd = view.GetThumbnailWindow()
+        result.append(WindowGeometry(hwnd, _frame_rect(view), window_rect(hwnd)))
+    return result
+
+
+class WindowBatch():
+    """Collects window moves and reorderings and applies them together with
+    `DeferWindowPos`, so that the screen is updated once. No window is activated.
+
+        >>> with WindowBatch() as batch:
+        ...     batch.move(hwnd, Rect(0, 0, 1280, 1440))
+        ...     batch.insert_after(other_hwnd, hwnd)
+
+    """
+
+    def __init__(self):
+        # hwnd: (insert after, rect, flags)
+        self._ops: Dict[int, Tuple[int, Optional[Rect], int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def _add(self, hwnd: int, after: Optional[int], rect: Optional[Rect]):
+        old_after, old_rect, _ = self._ops.get(hwnd, (None, None, 0))
+        after = old_after if after is None else after
+        rect = old_rect if rect is None else rect
+        flags = SWP_NOACTIVATE | SWP_NOOWNERZORDER
+        if after is None:
+            flags |= SWP_NOZORDER
+        if rect is None:
+            flags |= SWP_NOMOVE | SWP_NOSIZE
+        self._ops[hwnd] = (after, rect, flags) # type: ignore
+
+    def move(self, hwnd: int, rect: Rect):
+        """Move and resize a window, given its window rectangle."""
+        self._add(hwnd, None, rect)
+
+    def insert_after(self, hwnd: int, after: int):
+        """Place a window directly below `after` in the z-order."""
+        self._add(hwnd, after, None)
+
+    def apply(self):
+        """Make every queued change at once.
+
+        Raises:
+            OSError: If the batch couldn't be applied. No window is changed in that case.
+        """
+        if not self._ops:
+            return
+        ops, self._ops = self._ops, {}
+        hdwp = _BeginDeferWindowPos(len(ops))
+        if not hdwp:
+            raise ctypes.WinError()
+        for hwnd, (after, rect, flags) in ops.items():
+            x, y, cx, cy = (rect.left, rect.top, rect.width, rect.height) if rect is not None else (0, 0, 0, 0)
+            hdwp = _DeferWindowPos(hdwp, hwnd, after, x, y, cx, cy, flags)
+            if not hdwp:
+                # The batch has been freed, nothing was moved
+                raise ctypes.WinError()
+        if not _EndDeferWindowPos(hdwp):
+            raise ctypes.WinError()
+
+    def __enter__(self) -> 'WindowBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.apply()
+
+
+def apply_layout(
+    layout: Mapping[int, Rect],
+    geometry: Optional[List[WindowGeometry]] = None,
+    frames: bool = True,
+) -> int:
+    """Move and resize many windows as one batch.
+
+    Maximized and minimized windows are restored first, without activating them.
+
+    Args:
+        layout (Mapping[int, Rect]): Where to put each window, by handle.
+        geometry (List[WindowGeometry], optional): The windows' current positions, from `read_geometry`. Only needed with `frames`, and read for the windows in `layout` if not given.
+        frames (bool, optional): The rectangles are visible frames rather than window rectangles, so that windows line up without gaps from their invisible borders. Defaults to True.
+
+    Returns:
+        int: The number of windows moved.
+    """
+    current: Dict[int, WindowGeometry] = {}
+    if frames:
+        if geometry is None:
+            geometry = [_geometry_of(hwnd) for hwnd in layout]
+        current = {g.hwnd: g for g in geometry}
+    user32 = windll.user32
+    batch = WindowBatch()
+    for hwnd, rect in layout.items():
+        if user32.IsZoomed(hwnd) or user32.IsIconic(hwnd):
+            user32.ShowWindow(hwnd, SW_SHOWNOACTIVATE)
+            # Restoring changes the borders
+            if hwnd in current:
+                current[hwnd] = _geometry_of(hwnd)
+        if hwnd in current:
+            rect = current[hwnd].window_for_frame(rect)
+        batch.move(hwnd, rect)
+    moved = len(batch)
+    batch.apply()
+    return moved
+
@@ -0,0 +1,173 @@
+import threading
+from typing import List, Optional, Tuple
+
+from pyvda.compat import GUID, COMError
+from pyvda.pyvda import VirtualDesktop, _desktop_listeners, managers
+
+DEFAULT_SIZE = 32
+
+
+class DesktopHistory():
+    """
+    A fixed-size history of visited desktops, with browser style `back` and
+    `forward` navigation.
+
+    Switches made through pyvda (`VirtualDesktop.go` and `go_and_focus`) are
+    recorded as they happen. Switches made some other way, e.g. with the
+    keyboard, are picked up by `sync`, which `back` and `forward` call
+    first. On builds which report the last active desktop, `sync` also
+    recovers the desktop visited just before the current one.
+
+    Once the history is full, each new visit overwrites the oldest one. Only
+    desktop IDs are stored, since listeners update the history from whichever
+    thread switched desktop, and are resolved on the thread which goes back or
+    forward.
+
+        >>> history = DesktopHistory()
+        >>> VirtualDesktop(2).go()
+        >>> VirtualDesktop(3).go()
+        >>> history.back()  # Back on desktop 2
+
+    """
+
+    def __init__(self, size: int = DEFAULT_SIZE, track_switches: bool = True):
+        """
+        Args:
+            size (int, optional): Maximum number of visits to remember. Defaults to `DEFAULT_SIZE`.
+            track_switches (bool, optional): Record switches made through pyvda. Defaults to True.
+        """
+        if size < 1:
+            raise ValueError(f"History size must be at least 1, {size} provided")
+        self._slots: List[Optional[GUID]] = [None] * size
+        self._start = 0
+        self._len = 0
+        # Offset of the current visit from the oldest
+        self._pos = -1
+        self._lock = threading.RLock()
+        self._tracking = track_switches
+        if track_switches:
+            _desktop_listeners.append(self._on_desktop_event)
+        self.sync()
+
+    def close(self):
+        """Stop recording switches made through pyvda."""
+        if self._tracking:
+            _desktop_listeners.remove(self._on_desktop_event)
+            self._tracking = False
+
+    def _slot(self, pos: int) -> int:
+        return (self._start + pos) % len(self._slots)
+
+    @property
+    def current(self) -> Optional[GUID]:
+        """The ID of the desktop at the current position in the history."""
+        with self._lock:
+            return self._slots[self._slot(self._pos)] if self._len else None
+
+    def entries(self) -> List[GUID]:
+        """
+        Returns:
+            List[GUID]: The IDs of the remembered desktops, oldest first.
+        """
+        with self._lock:
+            return [self._slots[self._slot(i)] for i in range(self._len)] # type: ignore
+
+    def __len__(self) -> int:
+        return self._len
+
+    def can_go_back(self) -> bool:
+        return self._pos > 0
+
+    def can_go_forward(self) -> bool:
+        return self._pos < self._len - 1
+
+    def record(self, desktop_id: GUID):
+        """Record a visit to a desktop. Visits after the current position are
+        dropped, as in a browser. Visiting the current desktop again does nothing.
+        """
+        with self._lock:
+            if self._len and self._slots[self._slot(self._pos)] == desktop_id:
+                return
+            self._len = self._pos + 1
+            if self._len == len(self._slots):
+                self._start = self._slot(1)
+                self._len -= 1
+            self._slots[self._slot(self._len)] = desktop_id
+            self._len += 1
+            self._pos = self._len - 1
+
+    def sync(self):
+        """Record the current desktop, if it was switched to without pyvda."""
+        adapter = managers.adapter
+        current = adapter.get_current_desktop().GetID() # type: ignore
+        if current == self.current:
+            return
+        if adapter.get_last_active_desktop is not None and self._len: # type: ignore
+            try:
+                last = adapter.get_last_active_desktop().GetID() # type: ignore
+            except COMError:
+                last = None
+            if last is not None and last != current:
+                self.record(last)
+        self.record(current)
+
+    def _on_desktop_event(self, event: str, desktop: VirtualDesktop):
+        if event == "switch":
+            self.record(desktop.id)
+
+    def _move(self, step: int) -> Optional[VirtualDesktop]:
+        self.sync()
+        with self._lock:
+            candidates: List[Tuple[int, GUID]] = []
+            pos = self._pos + step
+            while 0 <= pos < self._len:
+                candidates.append((pos, self._slots[self._slot(pos)])) # type: ignore
+                pos += step
+        # The desktops are found and switched to without holding the lock, so
+        # that a slow shell, or a listener running during the switch, doesn't
+        # block other users of the history
+        for pos, desktop_id in candidates:
+            try:
+                desktop = VirtualDesktop(desktop_id=desktop_id)
+            except COMError:
+                # The desktop has been removed
+                continue
+            with self._lock:
+                # Unless the history changed meanwhile, move to the visit, so
+                # that recording the switch below leaves the history alone
+                if pos < self._len and self._slots[self._slot(pos)] == desktop_id:
+                    self._pos = pos
+            desktop.go()
+            return desktop
+        return None
+
+    def back(self) -> Optional[VirtualDesktop]:
+        """Switch to the previously visited desktop, skipping desktops which have been removed.
+
+        Returns:
+            VirtualDesktop: The desktop switched to, or `None` if there is no earlier desktop.
+        """
+        return self._move(-1)
+
+    def forward(self) -> Optional[VirtualDesktop]:
+        """Switch to the next desktop in the history, after going `back`.
+
+        Returns:
+            VirtualDesktop: The desktop switched to, or `None` if there is no later desktop.
+        """
+        return self._move(1)
+
+
+def last_active_desktop() -> VirtualDesktop:
+    """The desktop which was active before the current one, as reported by the shell.
+
+    Returns:
+        VirtualDesktop: The last active desktop.
+
+    Raises:
+        NotImplementedError: If the Windows version is < 22631.
+    """
+    get_last_active = managers.adapter.get_last_active_desktop # type: ignore
+    if get_last_active is None:
+        raise NotImplementedError("last_active_desktop is only available on 22631 and later")
+    return VirtualDesktop(desktop=get_last_active())
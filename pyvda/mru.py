@@ -0,0 +1,142 @@
+import heapq
+from typing import Dict, List, NamedTuple, Optional, Union
+
+from pyvda.arena import untrack
+from pyvda.com_defns import IApplicationView
+from pyvda.compat import GUID
+from pyvda.pyvda import AppView, VirtualDesktop, managers
+
+
+class _Entry(NamedTuple):
+    view: AppView
+    timestamp: int
+    desktop_id: GUID
+    pinned: bool
+    shown: bool
+
+
+class MRUTracker():
+    """
+    Tracks the most recently used windows on each virtual desktop, ordered by
+    their last activation timestamp.
+
+    Each `refresh` reads the handle and activation timestamp of every view,
+    and only re-reads the desktop, pinned state and switcher visibility of
+    views which are new or have been activated since the last refresh.
+    Windows which are moved between desktops without being activated are
+    only picked up by a full refresh.
+
+    Example:
+
+        >>> tracker = MRUTracker()
+        >>> tracker.most_recent(VirtualDesktop.current(), 3)
+        >>> tracker.focus_previous()
+
+    """
+
+    def __init__(self, switcher_windows: bool = True):
+        """
+        Args:
+            switcher_windows (bool, optional): Only track windows which appear in the alt-tab dialogue. Defaults to True.
+        """
+        self.switcher_windows = switcher_windows
+        self._entries: Dict[int, _Entry] = {}
+        self._by_desktop: Dict[GUID, List[_Entry]] = {}
+        self._pinned: List[_Entry] = []
+        self._merged: Dict[GUID, List[AppView]] = {}
+        self.refresh(full=True)
+
+    def refresh(self, full: bool = False) -> int:
+        """Bring the tracker up to date with the shell.
+
+        Args:
+            full (bool, optional): Re-read every view, not just those whose timestamp changed. Defaults to False.
+
+        Returns:
+            int: The number of views which were re-read.
+        """
+        views_arr = managers.adapter.get_views_by_z_order() # type: ignore
+        entries: Dict[int, _Entry] = {}
+        changed = 0
+        for view in views_arr.iter(IApplicationView):
+            app = AppView(view=view)
+            hwnd = app.hwnd
+            timestamp = app.get_activation_timestamp()
+            entry = self._entries.get(hwnd)
+            if full or entry is None or entry.timestamp != timestamp:
+                shown = app.is_shown_in_switchers()
+                if self.switcher_windows and not shown:
+                    entry = _Entry(app, timestamp, GUID(), False, shown)
+                else:
+                    entry = _Entry(app, timestamp, app.desktop_id, app.is_pinned(), shown)
+                # Kept until the view is activated again, so it must outlive any arena
+                untrack(view)
+                changed += 1
+            entries[hwnd] = entry
+
+        if changed or len(entries) != len(self._entries):
+            self._entries = entries
+            self._rebuild()
+        return changed
+
+    def _rebuild(self):
+        tracked = [e for e in self._entries.values() if e.shown or not self.switcher_windows]
+        tracked.sort(key=lambda e: e.timestamp, reverse=True)
+        self._by_desktop = {}
+        self._pinned = []
+        for entry in tracked:
+            if entry.pinned:
+                self._pinned.append(entry)
+            else:
+                self._by_desktop.setdefault(entry.desktop_id, []).append(entry)
+        # Desktop windows merged with the pinned windows, built on demand
+        self._merged = {}
+
+    def _desktop_id(self, desktop: Optional[Union[VirtualDesktop, GUID]]) -> GUID:
+        if desktop is None:
+            desktop = VirtualDesktop.current()
+        if isinstance(desktop, VirtualDesktop):
+            return desktop.id
+        return desktop
+
+    def most_recent(self, desktop: Optional[Union[VirtualDesktop, GUID]] = None, n: int = 1, include_pinned: bool = True) -> List[AppView]:
+        """The most recently used windows on a desktop, as of the last `refresh`.
+
+        Args:
+            desktop (VirtualDesktop or GUID, optional): Desktop to query. Defaults to the current desktop.
+            n (int, optional): Maximum number of windows to return. Defaults to 1.
+            include_pinned (bool, optional): Include pinned windows. Defaults to True.
+
+        Returns:
+            List[AppView]: Up to `n` windows, most recently activated first.
+        """
+        guid = self._desktop_id(desktop)
+        if not include_pinned:
+            return [e.view for e in self._by_desktop.get(guid, [])[:n]]
+        merged = self._merged.get(guid)
+        if merged is None:
+            entries = heapq.merge(
+                self._by_desktop.get(guid, []),
+                self._pinned,
+                key=lambda e: e.timestamp,
+                reverse=True,
+            )
+            merged = self._merged[guid] = [e.view for e in entries]
+        return merged[:n]
+
+    def focus_previous(self, desktop: Optional[Union[VirtualDesktop, GUID]] = None) -> Optional[AppView]:
+        """Switch to the second most recently used window on a desktop, like a
+        single press of alt-tab.
+
+        Args:
+            desktop (VirtualDesktop or GUID, optional): Desktop to switch within. Defaults to the current desktop.
+
+        Returns:
+            AppView: The window switched to, or `None` if there was no previous window.
+        """
+        self.refresh()
+        recent = self.most_recent(desktop, 2)
+        if len(recent) < 2:
+            return None
+        recent[1].switch_to()
+        return recent[1]
@@ -0,0 +1,131 @@
+"""
+Group windows by the top level window which owns them.
+
+`get_apps_by_z_order` returns dialogs, tool windows and other owned popups
+as separate views. `get_ownership_groups` instead collapses each ownership
+tree into one `OwnershipGroup`, keyed by its root switchable owner (the
+window which represents the tree in alt-tab), so that the whole tree can be
+moved, pinned or focused together:
+
+.. code:: python
+
+    for group in get_ownership_groups(current_desktop=True):
+        print(group.root.hwnd, [v.hwnd for v in group.owned])
+        group.move(VirtualDesktop(2))
+
+"""
+from typing import Dict, Iterator, List, Optional
+
+from pyvda.arena import track
+from pyvda.com_defns import IApplicationView
+from pyvda.compat import GUID, COMError
+from pyvda.pyvda import AppView, VirtualDesktop, _notify, _pinned_index, managers
+
+
+class OwnershipGroup():
+    """A root window and the windows it owns, as enumerated by `get_ownership_groups`."""
+
+    def __init__(self, root: AppView, hwnd: int):
+        self.root = root
+        self.hwnd = hwnd
+        # All of the group's views in z-order, including the root
+        self.views: List[AppView] = []
+        self._hwnds: List[int] = []
+
+    def __repr__(self) -> str:
+        return f"OwnershipGroup(root={self.hwnd}, hwnds={self._hwnds})"
+
+    def __len__(self) -> int:
+        return len(self.views)
+
+    def __iter__(self) -> Iterator[AppView]:
+        return iter(self.views)
+
+    def _add(self, view: AppView, hwnd: int):
+        self.views.append(view)
+        self._hwnds.append(hwnd)
+
+    @property
+    def hwnds(self) -> List[int]:
+        """Handles of the group's windows in z-order, including the root."""
+        return list(self._hwnds)
+
+    @property
+    def owned(self) -> List[AppView]:
+        """The group's windows other than the root, in z-order."""
+        return [v for v, h in zip(self.views, self._hwnds) if h != self.hwnd]
+
+    @property
+    def top(self) -> AppView:
+        """The group's frontmost window, e.g. a dialog which is open over the root."""
+        return self.views[0]
+
+    def move(self, desktop: VirtualDesktop):
+        """Move every window in the group to a desktop."""
+        move = managers.manager_internal.MoveViewToDesktop # type: ignore
+        for view in self.views:
+            move(view._view, desktop._virtual_desktop)
+        _notify("move", desktop)
+
+    def pin(self):
+        """Pin every window in the group to all desktops."""
+        pinned_apps = managers.pinned_apps
+        for view in self.views:
+            if not pinned_apps.IsViewPinned(view._view): # type: ignore
+                pinned_apps.PinView(view._view) # type: ignore
+                _pinned_index.update_view(view, True)
+
+    def unpin(self):
+        """Unpin every window in the group."""
+        pinned_apps = managers.pinned_apps
+        for view in self.views:
+            if pinned_apps.IsViewPinned(view._view): # type: ignore
+                pinned_apps.UnpinView(view._view) # type: ignore
+                _pinned_index.update_view(view, False)
+
+    def focus(self):
+        """Focus the group's frontmost window, so that an open dialog stays in front of its owner."""
+        self.top.set_focus()
+
+
+def _root_of(view: IApplicationView) -> Optional[IApplicationView]:
+    try:
+        root = track(view.GetRootSwitchableOwner()) # type: ignore
+    except COMError:
+        return None
+    return root if root else None
+
+
+def get_ownership_groups(switcher_windows: bool = True, current_desktop: bool = False) -> List[OwnershipGroup]:
+    """Group every window with its root switchable owner, in one pass over the z-order.
+
+    Args:
+        switcher_windows (bool, optional): Only include groups whose root appears in the alt-tab dialogue. Defaults to True.
+        current_desktop (bool, optional): Only include groups whose root is on the current desktop, or pinned. Defaults to False.
+
+    Returns:
+        List[OwnershipGroup]: Groups ordered by their frontmost window, foreground first.
+    """
+    desktop_id: Optional[GUID] = VirtualDesktop.current().id if current_desktop else None
+    groups: Dict[int, Optional[OwnershipGroup]] = {}
+    result: List[OwnershipGroup] = []
+    views_arr = managers.adapter.get_views_by_z_order() # type: ignore
+    for v in views_arr.iter(IApplicationView):
+        hwnd = v.GetThumbnailWindow()
+        root = _root_of(v) or v
+        root_hwnd = root.GetThumbnailWindow() if root is not v else hwnd
+        if root_hwnd not in groups:
+            # Filter on the root, once per group
+            group: Optional[OwnershipGroup] = OwnershipGroup(AppView(view=root), root_hwnd)
+            if switcher_windows and not root.GetShowInSwitchers():
+                group = None
+            elif desktop_id is not None and root.GetVirtualDesktopId() != desktop_id \
+                    and not managers.pinned_apps.IsViewPinned(root): # type: ignore
+                group = None
+            groups[root_hwnd] = group
+            if group is not None:
+                result.append(group)
+        group = groups[root_hwnd]
+        if group is not None:
+            group._add(group.root if hwnd == root_hwnd else AppView(view=v), hwnd)
+    return result
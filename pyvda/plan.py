@@ -0,0 +1,261 @@
+"""
+Declarative provisioning of desktops and windows.
+
+A `Plan` describes the desired end state. It is compared against a single
+snapshot of the current state, and only the operations needed to reach the
+desired state are run, in an order where each operation's targets exist:
+desktops are created, then named, then given wallpapers, then windows are
+unpinned, moved and pinned. Every operation records how to undo itself, so
+a plan which fails part way can be rolled back.
+
+.. code:: python
+
+    plan = Plan(
+        desktops=[
+            DesktopSpec("Comms", wallpaper="C:/wallpapers/comms.jpg"),
+            DesktopSpec("Build"),
+        ],
+        windows=[
+            WindowSpec(app_id="MSTeams_8wekyb3d8bbwe!MSTeams", desktop="Comms"),
+            WindowSpec(hwnd=0x1F02A6, pinned=True),
+        ],
+        pinned_apps=["Microsoft.WindowsTerminal_8wekyb3d8bbwe!App"],
+    )
+    plan.execute()
+"""
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+from pyvda.compat import GUID
+from pyvda.pyvda import AppView, VirtualDesktop
+from pyvda.snapshot import Snapshot, capture
+
+logger = logging.getLogger(__name__)
+
+
+class DesktopSpec(NamedTuple):
+    """A desktop which should exist.
+
+    Matched to an existing desktop with the same name, otherwise to the unnamed
+    desktop at the same position, otherwise created.
+    """
+    name: str
+    wallpaper: Optional[str] = None
+
+
+class WindowSpec(NamedTuple):
+    """Where matching windows should be. Windows are matched by handle, or by app ID.
+
+    `desktop` is either the name of a desktop or its (1-indexed) position in
+    the plan's desktops. Fields left as `None` are not changed.
+    """
+    hwnd: Optional[int] = None
+    app_id: Optional[str] = None
+    desktop: Optional[Union[str, int]] = None
+    pinned: Optional[bool] = None
+
+
+class Operation():
+    """One step of a plan, and how to reverse it."""
+
+    def __init__(self, description: str, apply: Callable[[], None], undo: Optional[Callable[[], None]] = None):
+        self.description = description
+        self._apply = apply
+        self._undo = undo
+
+    def apply(self):
+        self._apply()
+
+    def undo(self):
+        if self._undo is not None:
+            self._undo()
+
+    def __repr__(self):
+        return f"<Operation {self.description}>"
+
+
+class PlanError(Exception):
+    """Raised when a plan can't be diffed, e.g. because it refers to a desktop which isn't in the plan."""
+
+
+class Plan():
+    def __init__(
+        self,
+        desktops: Optional[List[DesktopSpec]] = None,
+        windows: Optional[List[WindowSpec]] = None,
+        pinned_apps: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            desktops (List[DesktopSpec], optional): Desktops which should exist, in order.
+            windows (List[WindowSpec], optional): Where windows should be. Later specs override earlier ones for the same window.
+            pinned_apps (List[str], optional): App IDs which should be pinned to all desktops.
+        """
+        self.desktops = list(desktops or [])
+        self.windows = list(windows or [])
+        self.pinned_apps = list(pinned_apps or [])
+        self.snapshot: Optional[Snapshot] = None
+        self.operations: List[Operation] = []
+        self.undo_log: List[Operation] = []
+        # Desktop for each DesktopSpec, filled in as desktops are created
+        self._targets: Dict[int, VirtualDesktop] = {}
+
+    def diff(self) -> List[Operation]:
+        """Snapshot the current state and work out the operations needed to reach the plan's state.
+
+        Returns:
+            List[Operation]: The operations `execute` will run, in order.
+        """
+        snapshot, desktop_objects, view_objects = capture()
+        self.snapshot = snapshot
+        self._targets = {}
+        creates: List[Operation] = []
+        renames: List[Operation] = []
+        wallpapers: List[Operation] = []
+
+        by_name = {}
+        for d in snapshot.desktops:
+            if d.name:
+                by_name.setdefault(d.name, d)
+        claimed = set()
+        target_ids: Dict[int, GUID] = {}
+        fallback = desktop_objects[snapshot.current_desktop_id]
+
+        for i, spec in enumerate(self.desktops):
+            match = by_name.get(spec.name)
+            if match is None and i < len(snapshot.desktops):
+                candidate = snapshot.desktops[i]
+                if not candidate.name and candidate.id not in claimed:
+                    match = candidate
+            if match is not None and match.id in claimed:
+                match = None
+
+            if match is None:
+                creates.append(self._create(i, spec, fallback))
+                renames.append(self._rename(i, spec.name, ""))
+                if spec.wallpaper is not None:
+                    wallpapers.append(self._set_wallpaper(i, spec.wallpaper, None))
+                continue
+
+            claimed.add(match.id)
+            target_ids[i] = match.id
+            self._targets[i] = desktop_objects[match.id]
+            if match.name != spec.name:
+                renames.append(self._rename(i, spec.name, match.name))
+            if spec.wallpaper is not None and match.wallpaper != spec.wallpaper:
+                wallpapers.append(self._set_wallpaper(i, spec.wallpaper, match.wallpaper))
+
+        # The final desired state of each window, later specs winning
+        desired: Dict[int, WindowSpec] = {}
+        for spec in self.windows:
+            for state in snapshot.views:
+                if state.hwnd == spec.hwnd or (spec.hwnd is None and spec.app_id is not None and state.app_id == spec.app_id):
+                    previous = desired.get(state.hwnd, WindowSpec())
+                    desired[state.hwnd] = WindowSpec(
+                        state.hwnd,
+                        state.app_id,
+                        spec.desktop if spec.desktop is not None else previous.desktop,
+                        spec.pinned if spec.pinned is not None else previous.pinned,
+                    )
+
+        unpins: List[Operation] = []
+        moves: List[Operation] = []
+        pins: List[Operation] = []
+        states = {s.hwnd: s for s in snapshot.views}
+        for hwnd, spec in desired.items():
+            state = states[hwnd]
+            view = view_objects[hwnd]
+            if spec.pinned is False and state.pinned:
+                unpins.append(Operation(f"unpin window {hwnd}", view.unpin, view.pin))
+            if spec.desktop is not None and not (spec.pinned or (state.pinned and spec.pinned is None)):
+                index = self._desktop_index(spec.desktop)
+                if target_ids.get(index) != state.desktop_id:
+                    moves.append(self._move(hwnd, view, index, desktop_objects.get(state.desktop_id)))
+            if spec.pinned and not state.pinned:
+                pins.append(Operation(f"pin window {hwnd}", view.pin, view.unpin))
+
+        pinned_apps = {s.app_id for s in snapshot.views if s.app_pinned}
+        for app_id in self.pinned_apps:
+            if app_id in pinned_apps:
+                continue
+            view = next((view_objects[s.hwnd] for s in snapshot.views if s.app_id == app_id), None)
+            if view is None:
+                logger.warning("No window found for app %s, so it can't be pinned", app_id)
+                continue
+            pins.append(Operation(f"pin app {app_id}", view.pin_app, view.unpin_app))
+
+        self.operations = creates + renames + wallpapers + unpins + moves + pins
+        return self.operations
+
+    def _desktop_index(self, ref: Union[str, int]) -> int:
+        if isinstance(ref, int):
+            if not 1 <= ref <= len(self.desktops):
+                raise PlanError(f"Desktop number {ref} is not in the plan, which has {len(self.desktops)} desktops")
+            return ref - 1
+        for i, spec in enumerate(self.desktops):
+            if spec.name == ref:
+                return i
+        raise PlanError(f"Desktop {ref!r} is not in the plan")
+
+    def _create(self, index: int, spec: DesktopSpec, fallback: VirtualDesktop) -> Operation:
+        def apply():
+            self._targets[index] = VirtualDesktop.create()
+        def undo():
+            self._targets.pop(index).remove(fallback)
+        return Operation(f"create desktop {spec.name!r}", apply, undo)
+
+    def _rename(self, index: int, name: str, old_name: str) -> Operation:
+        return Operation(
+            f"rename desktop {index + 1} to {name!r}",
+            lambda: self._targets[index].rename(name),
+            lambda: self._targets[index].rename(old_name) if index in self._targets else None,
+        )
+
+    def _set_wallpaper(self, index: int, path: str, old_path: Optional[str]) -> Operation:
+        undo = None
+        if old_path:
+            undo = lambda: self._targets[index].set_wallpaper(old_path)
+        return Operation(f"set wallpaper of desktop {index + 1} to {path!r}", lambda: self._targets[index].set_wallpaper(path), undo)
+
+    def _move(self, hwnd: int, view: AppView, index: int, origin: Optional[VirtualDesktop]) -> Operation:
+        undo = None
+        if origin is not None:
+            undo = lambda: view.move(origin)
+        return Operation(f"move window {hwnd} to desktop {index + 1}", lambda: view.move(self._targets[index]), undo)
+
+    def execute(self, rollback_on_error: bool = True) -> List[Operation]:
+        """Run the plan, diffing it first if `diff` hasn't been called since the
+        last `execute`.
+
+        Args:
+            rollback_on_error (bool, optional): Undo the operations which succeeded if one fails. Defaults to True.
+
+        Returns:
+            List[Operation]: The operations which were run.
+        """
+        if self.snapshot is None:
+            self.diff()
+        self.undo_log = []
+        for op in self.operations:
+            logger.debug("Applying %s", op.description)
+            try:
+                op.apply()
+            except Exception:
+                logger.exception("Failed to %s", op.description)
+                if rollback_on_error:
+                    self.rollback()
+                raise
+            self.undo_log.append(op)
+        self.snapshot = None
+        return list(self.undo_log)
+
+    def rollback(self):
+        """Undo the operations run by the last `execute`, most recent first.
+        Errors while undoing are logged and don't stop the rest of the rollback."""
+        while self.undo_log:
+            op = self.undo_log.pop()
+            try:
+                op.undo()
+            except Exception:
+                logger.exception("Failed to undo %s", op.description)
+        self.snapshot = None
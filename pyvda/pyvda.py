@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-from ctypes import windll
-from typing import List, Optional
-
-import _ctypes
-from comtypes import GUID
-
-import pyvda.build as build
-from pyvda.com_defns import IApplicationView, IVirtualDesktop, IVirtualDesktop2
-from pyvda.utils import Managers
+import os
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union, overload
+
+from pyvda.arena import hold
+from pyvda.com_base import IObjectArray
+from pyvda.com_defns import IApplicationView, IVirtualDesktop
+from pyvda.compat import GUID, COMError, windll
+from pyvda.utils import Managers, wstr
+from pyvda.view_cache import DEFAULT_MAXSIZE, CacheInfo
 from pyvda.winstring import HSTRING
 
 ASFW_ANY = -1
@@ -16,6 +17,119 @@ NULL_PTR = 0
 
 managers = Managers()
 
+# Called with ("switch", desktop) after pyvda switches desktop, ("remove",
+# desktop) after pyvda removes one, ("create", desktop) and ("rename", desktop)
+# after it creates or renames one, and ("move", desktop) after it moves a
+# window to a desktop. See `pyvda.history` and `pyvda.state_cache`.
+_desktop_listeners: List[Callable[[str, VirtualDesktop], None]] = []
+
+
+def _notify(event: str, desktop: VirtualDesktop):
+    for listener in _desktop_listeners:
+        listener(event, desktop)
+
+
+class _NameIndex():
+    """Maps desktop names to GUIDs. Built from one pass over all desktops,
+    and dropped whenever pyvda creates, renames or removes a desktop.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names: Optional[List[Tuple[GUID, str]]] = None
+        self._by_name: Dict[str, GUID] = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._names = None
+
+    def load(self, refresh: bool = False) -> List[Tuple[GUID, str]]:
+        with self._lock:
+            if self._names is None or refresh:
+                self._names = [(guid, str(name)) for guid, name in managers.adapter.get_all_names()] # type: ignore
+                self._by_name = {}
+                for guid, name in self._names:
+                    # Unnamed desktops can't be looked up, and the first of any duplicates wins.
+                    if name:
+                        self._by_name.setdefault(name, guid)
+            return self._names
+
+    def find(self, name: str, refresh: bool = False) -> Optional[GUID]:
+        self.load(refresh)
+        return self._by_name.get(name)
+
+
+_name_index = _NameIndex()
+
+
+class _PinnedIndex():
+    """Pinned windows and apps. Built from one pass over all windows, since the
+    shell can't list them, then kept up to date as pyvda pins and unpins.
+
+    Shared by every thread, so it only holds window handles and app IDs. COM
+    pointers belong to the thread which acquired them, so callers resolve
+    views from the handles on their own thread.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Handles of pinned windows in z-order, used as an ordered set
+        self._order: Optional[Dict[int, None]] = None
+        self._hwnds: FrozenSet[int] = frozenset()
+        self._apps: FrozenSet[str] = frozenset()
+
+    def invalidate(self):
+        with self._lock:
+            self._order = None
+
+    def load(self, refresh: bool = False) -> Tuple[List[int], FrozenSet[str]]:
+        with self._lock:
+            if self._order is None or refresh:
+                order: Dict[int, None] = {}
+                apps = set()
+                checked = set()
+                views_arr = managers.adapter.get_views_by_z_order() # type: ignore
+                for v in views_arr.iter(IApplicationView):
+                    view = AppView(view=v)
+                    if view.is_pinned():
+                        order[view.hwnd] = None
+                    app_id = view.app_id
+                    key = wstr(app_id)
+                    if key and key not in checked:
+                        checked.add(key)
+                        if managers.pinned_apps.IsAppIdPinned(app_id): # type: ignore
+                            apps.add(key)
+                self._order = order
+                self._hwnds = frozenset(order)
+                self._apps = frozenset(apps)
+            return list(self._order), self._apps
+
+    def hwnds(self, refresh: bool = False) -> FrozenSet[int]:
+        self.load(refresh)
+        return self._hwnds
+
+    def update_view(self, view: AppView, pinned: bool):
+        if self._order is None:
+            # Not loaded, so there is nothing to update and no need to ask for the handle
+            return
+        hwnd = view.hwnd
+        with self._lock:
+            if self._order is None:
+                return
+            if pinned:
+                self._order[hwnd] = None
+            else:
+                self._order.pop(hwnd, None)
+            self._hwnds = frozenset(self._order)
+
+    def update_app(self, app_id: Any, pinned: bool):
+        with self._lock:
+            if self._order is None:
+                return
+            key = wstr(app_id)
+            self._apps = self._apps | {key} if pinned else self._apps - {key} # type: ignore
+
+
+_pinned_index = _PinnedIndex()
+
 
 class AppView():
     """
@@ -35,10 +149,12 @@ class AppView():
             view (IApplicationView, optional): An `IApplicationView` object. Defaults to None.
         """
         if hwnd:
-            # Get the IApplicationView for the window
-            self._view = managers.view_collection.GetViewForHwnd(hwnd) # type: ignore
+            # Get the IApplicationView for the window, reusing this thread's cached view if it is still valid
+            self._view = managers.view_cache.get(hwnd)
         elif view:
             self._view = view
+            # Lets an active `Arena` report the view as still in use
+            hold(view, self)
         else:
             raise Exception(f"Must pass 'hwnd' or 'view'")
 
@@ -60,7 +176,7 @@ class AppView():
             # This seems to happen for things like window managers which are pinned above the normal windows.
             # Can be reliably reproduced with the 'f.lux' options window.
             return self._view.GetAppUserModelId() # type: ignore
-        except _ctypes.COMError:
+        except COMError:
             return None
 
     @classmethod
@@ -69,7 +185,7 @@ class AppView():
         Returns:
             AppView: An AppView for the currently focused window.
         """
-        focused = managers.view_collection.GetViewInFocus() # type: ignore
+        focused = managers.adapter.get_view_in_focus() # type: ignore
         return cls(view=focused)
 
     #  ------------------------------------------------
@@ -108,12 +224,14 @@ class AppView():
         Pin the window (corresponds to the 'show window on all desktops' toggle).
         """
         managers.pinned_apps.PinView(self._view) # type: ignore
+        _pinned_index.update_view(self, True)
 
     def unpin(self):
         """
         Unpin the window (corresponds to the 'show window on all desktops' toggle).
         """
         managers.pinned_apps.UnpinView(self._view) # type: ignore
+        _pinned_index.update_view(self, False)
 
     def is_pinned(self) -> bool:
         """
@@ -133,7 +251,8 @@ class AppView():
         # Returning without doing anything is the best we can do here, and matches the behaviour of the windows UI.
         if app_id is None:
             return
-        managers.pinned_apps.PinAppID(self.app_id) # type: ignore
+        managers.pinned_apps.PinAppID(app_id) # type: ignore
+        _pinned_index.update_app(app_id, True)
 
     def unpin_app(self):
         """
@@ -142,7 +261,8 @@ class AppView():
         app_id = self.app_id
         if app_id is None:
             return
-        managers.pinned_apps.UnpinAppID(self.app_id) # type: ignore
+        managers.pinned_apps.UnpinAppID(app_id) # type: ignore
+        _pinned_index.update_app(app_id, False)
 
     def is_app_pinned(self) -> bool:
         """
@@ -154,7 +274,7 @@ class AppView():
         app_id = self.app_id
         if app_id is None:
             return
-        return managers.pinned_apps.IsAppIdPinned(self.app_id) # type: ignore
+        return managers.pinned_apps.IsAppIdPinned(app_id) # type: ignore
 
 
     #  ------------------------------------------------
@@ -172,6 +292,7 @@ class AppView():
 
         """
         managers.manager_internal.MoveViewToDesktop(self._view, desktop._virtual_desktop)  # type: ignore
+        _notify("move", desktop)
 
     @property
     def desktop_id(self) -> GUID:
@@ -225,7 +346,7 @@ def get_apps_by_z_order(switcher_windows: bool = True, current_desktop: bool = T
     Returns:
         List[AppView]: AppViews matching the specified criteria.
     """
-    views_arr = managers.view_collection.GetViewsByZOrder() # type: ignore
+    views_arr = managers.adapter.get_views_by_z_order() # type: ignore
     all_views = [AppView(view=v) for v in views_arr.iter(IApplicationView)]
     if not switcher_windows and not current_desktop:
         # no filters
@@ -265,25 +386,21 @@ class VirtualDesktop():
         if number:
             if number <= 0:
                 raise ValueError(f"Desktop number must be at least 1, {number} provided")
-            array = managers.manager_internal.get_all_desktops() # type: ignore
-            desktop_count = array.GetCount()
-            if number > desktop_count:
-                raise ValueError(
-                    f"Desktop number {number} exceeds the number of desktops, {desktop_count}."
-                )
-            self._virtual_desktop = array.get_at(number - 1, IVirtualDesktop)
+            array = managers.adapter.get_all_desktops() # type: ignore
+            self._virtual_desktop = _desktop_at(array, number - 1)
 
         elif desktop_id:
-            self._virtual_desktop = managers.manager_internal.FindDesktop(desktop_id) # type: ignore
+            self._virtual_desktop = managers.adapter.find_desktop(desktop_id) # type: ignore
 
         elif desktop:
             self._virtual_desktop = desktop
 
         elif current:
-            self._virtual_desktop = managers.manager_internal.get_current_desktop() # type: ignore
+            self._virtual_desktop = managers.adapter.get_current_desktop() # type: ignore
 
         else:
             raise Exception("Must provide one of 'number', 'desktop_id' or 'desktop'")
+        hold(self._virtual_desktop, self)
 
     @classmethod
     def current(cls):
@@ -302,8 +419,44 @@ class VirtualDesktop():
         Returns:
             VirtualDesktop: The created desktop.
         """
-        desktop = managers.manager_internal.create_desktop() # type: ignore
-        return cls(desktop=desktop)
+        desktop = cls(desktop=managers.adapter.create_desktop()) # type: ignore
+        _name_index.invalidate()
+        _notify("create", desktop)
+        return desktop
+
+    @classmethod
+    def by_name(cls, name: str, create: bool = False):
+        """Find a desktop by its name in the task view. Names are resolved
+        from an index which is only rebuilt when a name can't be found or
+        pyvda has created, renamed or removed a desktop.
+
+        Args:
+            name (str): The desktop name.
+            create (bool, optional): Create and name the desktop if it doesn't exist. Defaults to False.
+
+        Returns:
+            VirtualDesktop: The first desktop with the given name.
+
+        Raises:
+            ValueError: If there is no desktop with this name and `create` is False.
+            NotImplementedError: If the Windows version is < 19041.
+        """
+        if name:
+            # A miss may be a desktop renamed outside of pyvda, so check once more with fresh names
+            for refresh in (False, True):
+                guid = _name_index.find(name, refresh)
+                if guid is None:
+                    continue
+                try:
+                    return cls(desktop_id=guid)
+                except COMError:
+                    # Removed outside of pyvda
+                    continue
+        if not create:
+            raise ValueError(f"No desktop named {name!r}")
+        desktop = cls.create()
+        desktop.rename(name)
+        return desktop
 
     @property
     def id(self) -> GUID:
@@ -322,7 +475,7 @@ class VirtualDesktop():
         Returns:
             int: The desktop number.
         """
-        array = managers.manager_internal.get_all_desktops() # type: ignore
+        array = managers.adapter.get_all_desktops() # type: ignore
         for i, vd in enumerate(array.iter(IVirtualDesktop), 1):
             if self.id == vd.GetID():
                 return i
@@ -341,18 +494,7 @@ class VirtualDesktop():
         Raises:
             NotImplementedError: If the Windows version is < 19041.
         """
-        if build.OVER_21313:
-            return str(self._virtual_desktop.GetName()) # type: ignore
-
-        if not build.OVER_19041:
-            raise NotImplementedError(f"{VirtualDesktop.name.fget.__name__} is not supported on < 19041 versions")
-
-        array = managers.manager_internal.get_all_desktops() # type: ignore
-        for vd in array.iter(IVirtualDesktop2):
-            if self.id == vd.GetID():
-                return str(vd.GetName())
-        else:
-            raise Exception(f"Desktop with ID {self.id} not found")
+        return str(managers.adapter.get_name(self._virtual_desktop)) # type: ignore
 
     def rename(self, name: str):
         """Rename this desktop.
@@ -363,15 +505,9 @@ class VirtualDesktop():
         Raises:
             NotImplementedError: If the Windows version is < 19041.
         """
-
-        if managers.manager_internal2 is not None: # type: ignore
-            managers.manager_internal2.SetName(self._virtual_desktop, HSTRING(name)) # type: ignore
-            return
-
-        if not build.OVER_19041:
-            raise NotImplementedError(f"{VirtualDesktop.rename.__name__} is not supported on < 19041 versions")
-
-        managers.manager_internal.SetName(self._virtual_desktop, HSTRING(name)) # type: ignore
+        managers.adapter.set_name(self._virtual_desktop, HSTRING(name)) # type: ignore
+        _name_index.invalidate()
+        _notify("rename", self)
 
     def remove(self, fallback: Optional[VirtualDesktop] = None):
         """Delete this virtual desktop, falling back to 'fallback'.
@@ -384,6 +520,8 @@ class VirtualDesktop():
         if fallback is None:
             fallback = VirtualDesktop(1)
         managers.manager_internal.RemoveDesktop(self._virtual_desktop, fallback._virtual_desktop) # type: ignore
+        _name_index.invalidate()
+        _notify("remove", self)
 
     def go(self, allow_set_foreground: bool = True):
         """Switch to this virtual desktop.
@@ -396,7 +534,8 @@ class VirtualDesktop():
         """
         if allow_set_foreground:
             windll.user32.AllowSetForegroundWindow(ASFW_ANY)
-        managers.manager_internal.switch_desktop(self._virtual_desktop) # type: ignore
+        managers.adapter.switch_desktop(self._virtual_desktop) # type: ignore
+        _notify("switch", self)
 
     def apps_by_z_order(self, include_pinned: bool = True) -> List[AppView]:
         """Get a list of AppViews, ordered by their Z position, with
@@ -409,13 +548,45 @@ class VirtualDesktop():
         Returns:
             List[AppView]: AppViews matching the specified criteria.
         """
-        views_arr = managers.view_collection.GetViewsByZOrder() # type: ignore
-        all_views = [AppView(view=v) for v in views_arr.iter(IApplicationView)]
-        result = []
-        for view in all_views:
-            if view.is_shown_in_switchers() and view.is_on_desktop(self, include_pinned):
-                result.append(view)
-        return result
+        return list(self._iter_apps(include_pinned))
+
+    def _iter_apps(self, include_pinned: bool = True) -> Iterator[AppView]:
+        """Lazily walk the z-order, yielding switcher windows on this desktop."""
+        desktop_id = self.id
+        views_arr = managers.adapter.get_views_by_z_order() # type: ignore
+        for v in views_arr.iter(IApplicationView):
+            view = AppView(view=v)
+            if not view.is_shown_in_switchers():
+                continue
+            if view.desktop_id == desktop_id or (include_pinned and view.is_pinned()):
+                yield view
+
+    def go_and_focus(self, take_foreground: bool = False) -> Optional[AppView]:
+        """Switch to this virtual desktop and focus its top window, rather than
+        leaving focus behind on the previous desktop.
+
+        The z-order is walked lazily and the walk stops at the first window
+        shown in the alt-tab dialogue which is on this desktop or pinned.
+
+        Args:
+            take_foreground (bool, optional): Instead move the currently focused window along to this desktop, keeping it focused. Uses `SwitchDesktopAndMoveForegroundView` where the Windows build provides it, otherwise this is ignored. Defaults to False.
+
+        Returns:
+            AppView: The window which was focused, or `None` if there are no windows on this desktop or the foreground window was taken along.
+        """
+        switch_and_move = managers.adapter.switch_desktop_and_move_foreground_view # type: ignore
+        if take_foreground and switch_and_move is not None:
+            switch_and_move(self._virtual_desktop)
+            _notify("switch", self)
+            return None
+
+        windll.user32.AllowSetForegroundWindow(ASFW_ANY)
+        managers.adapter.switch_desktop(self._virtual_desktop) # type: ignore
+        _notify("switch", self)
+        top = next(self._iter_apps(), None)
+        if top is not None:
+            top.set_focus()
+        return top
 
     def set_wallpaper(self, path: str):
         """Set wallpaper on current virtual desktop to `path`.
@@ -423,29 +594,291 @@ class VirtualDesktop():
         Args:
             path (str): path to wallpaper file
         """
-        if build.OVER_21313:
-            managers.manager_internal.SetWallpaper(self._virtual_desktop,path=HSTRING(path)) # type: ignore
-        else:
-            raise NotImplementedError("set_wallpaper is only available on Windows 11")
+        managers.adapter.set_wallpaper(self._virtual_desktop, HSTRING(path)) # type: ignore
+
+
+def _desktop_at(array: 'IObjectArray', index: int) -> 'IVirtualDesktop':
+    """Fetch one desktop, only counting the desktops if `index` is out of range."""
+    try:
+        desktop = array.get_at(index, IVirtualDesktop)
+    except COMError:
+        desktop = None
+    if not desktop:
+        raise ValueError(
+            f"Desktop number {index + 1} exceeds the number of desktops, {array.GetCount()}." # type: ignore
+        )
+    return desktop
 
 
-def get_virtual_desktops() -> List[VirtualDesktop]:
+class DesktopList(Sequence[VirtualDesktop]):
+    """
+    A lazy sequence of the desktops which existed when it was created, in task
+    view order. `len()` is answered with a single `GetCount` call, and
+    desktops are only fetched when they are indexed or iterated over.
+    Slices are also lazy, so `desktops[-2:]` and `reversed(desktops)` only
+    fetch the desktops they return.
+    """
+
+    def __init__(self, array: 'IObjectArray', indices: Optional[range] = None):
+        """
+        Args:
+            array (IObjectArray): Array of `IVirtualDesktop`s.
+            indices (range, optional): The positions in `array` this sequence covers. Defaults to all of them.
+        """
+        self._array = array
+        self._indices = indices
+        self._desktops: Dict[int, VirtualDesktop] = {}
+
+    def _range(self) -> range:
+        if self._indices is None:
+            self._indices = range(self._array.GetCount()) # type: ignore
+        return self._indices
+
+    def __len__(self) -> int:
+        return len(self._range())
+
+    @overload
+    def __getitem__(self, index: int) -> VirtualDesktop: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> DesktopList: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DesktopList(self._array, self._range()[index])
+        position = self._range()[index]
+        desktop = self._desktops.get(position)
+        if desktop is None:
+            desktop = self._desktops[position] = VirtualDesktop(desktop=_desktop_at(self._array, position))
+        return desktop
+
+    def __iter__(self) -> Iterator[VirtualDesktop]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __reversed__(self) -> Iterator[VirtualDesktop]:
+        for i in reversed(range(len(self))):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"<DesktopList of {len(self)} desktops>"
+
+
+def get_virtual_desktops(lazy: bool = False) -> Union[List[VirtualDesktop], DesktopList]:
     """Return a list of all current virtual desktops, one for each desktop visible in the task view.
 
+    Args:
+        lazy (bool, optional): Return a `DesktopList`, which only fetches desktops as they are used. Defaults to False.
+
     Returns:
-        List[VirtualDesktop]: Virtual desktops currently active.
+        List[VirtualDesktop]: Virtual desktops currently active, or a `DesktopList` of them if `lazy`.
     """
-    array = managers.manager_internal.get_all_desktops() # type: ignore
+    array = managers.adapter.get_all_desktops() # type: ignore
+    if lazy:
+        return DesktopList(array)
     return [VirtualDesktop(desktop=vd) for vd in array.iter(IVirtualDesktop)]
 
 
+class DesktopWindows(NamedTuple):
+    """Windows grouped by desktop, returned by `windows_by_desktop`."""
+    # Desktop ID to the windows on that desktop, in z-order. Every desktop has
+    # an entry, in task view order.
+    desktops: Dict[GUID, List[AppView]]
+    # Windows which are shown on all desktops, in z-order.
+    pinned: List[AppView]
+
+
+def windows_by_desktop(switcher_windows: bool = True) -> DesktopWindows:
+    """Group all windows by the desktop they are on, in one pass over the z-order.
+
+    Args:
+        switcher_windows (bool, optional): Only include windows which appear in the alt-tab dialogue. Defaults to True.
+
+    Returns:
+        DesktopWindows: Windows on each desktop, and pinned windows separately.
+    """
+    array = managers.adapter.get_all_desktops() # type: ignore
+    desktops: Dict[GUID, List[AppView]] = {vd.GetID(): [] for vd in array.iter(IVirtualDesktop)}
+    pinned: List[AppView] = []
+    views_arr = managers.adapter.get_views_by_z_order() # type: ignore
+    for v in views_arr.iter(IApplicationView):
+        view = AppView(view=v)
+        if switcher_windows and not view.is_shown_in_switchers():
+            continue
+        if view.is_pinned():
+            pinned.append(view)
+        else:
+            # Windows which aren't on any desktop in the task view get their own entry
+            desktops.setdefault(view.desktop_id, []).append(view)
+    return DesktopWindows(desktops, pinned)
+
+
+def desktop_window_counts(switcher_windows: bool = True, include_pinned: bool = False) -> Dict[GUID, int]:
+    """Count the windows on every desktop, in one pass over the z-order.
+
+    Args:
+        switcher_windows (bool, optional): Only count windows which appear in the alt-tab dialogue. Defaults to True.
+        include_pinned (bool, optional): Count pinned windows on every desktop. Defaults to False.
+
+    Returns:
+        Dict[GUID, int]: Desktop ID to number of windows, in task view order.
+    """
+    groups = windows_by_desktop(switcher_windows)
+    extra = len(groups.pinned) if include_pinned else 0
+    return {guid: len(views) + extra for guid, views in groups.desktops.items()}
+
+
+def desktop_names() -> List[str]:
+    """Return the names of all current virtual desktops, in task view order.
+    All names are fetched in one pass, which also refreshes the index used by
+    `VirtualDesktop.by_name`.
+
+    Returns:
+        List[str]: Desktop names. Unnamed desktops have an empty name.
+
+    Raises:
+        NotImplementedError: If the Windows version is < 19041.
+    """
+    return [name for _, name in _name_index.load(refresh=True)]
+
+
+def pinned_views(refresh: bool = False) -> List[AppView]:
+    """Return the windows which are pinned to all desktops.
+
+    The shell can't list pinned windows, so the first call checks every
+    window. The result is cached and kept up to date by `AppView.pin` and
+    `AppView.unpin`; pass `refresh` to pick up changes made outside pyvda.
+
+    Args:
+        refresh (bool, optional): Re-read the pinned state of every window. Defaults to False.
+
+    Returns:
+        List[AppView]: Pinned windows, in z-order as of the last refresh.
+    """
+    views = []
+    for hwnd in _pinned_index.load(refresh)[0]:
+        try:
+            views.append(AppView(hwnd=hwnd))
+        except COMError:
+            # The window has closed since the last refresh
+            continue
+    return views
+
+
+def pinned_hwnds(refresh: bool = False) -> FrozenSet[int]:
+    """Return the handles of the windows which are pinned to all desktops, from the cache used by `pinned_views`.
+
+    Args:
+        refresh (bool, optional): Re-read the pinned state of every window. Defaults to False.
+
+    Returns:
+        FrozenSet[int]: Handles of pinned windows.
+    """
+    return _pinned_index.hwnds(refresh)
+
+
+def pinned_app_ids(refresh: bool = False) -> FrozenSet[str]:
+    """Return the IDs of apps which are pinned to all desktops, from the cache used by `pinned_views`.
+    Apps are only found if they have at least one window open.
+
+    Args:
+        refresh (bool, optional): Re-read the pinned state of every window. Defaults to False.
+
+    Returns:
+        FrozenSet[str]: App IDs of pinned apps.
+    """
+    return _pinned_index.load(refresh)[1]
+
+
+def set_view_cache_size(maxsize: int = DEFAULT_MAXSIZE):
+    """Cache the views looked up by `AppView(hwnd)`, saving a call to the shell
+    each time the same window is looked up again. The cache is off by default.
+
+    A cached view can be stale if the window's handle is reused by the thread
+    which created it, or if the shell recreates the window's view, e.g. when
+    it is hidden and shown again. Call `invalidate_view` when that happens.
+
+    Applies to the calling thread straight away, and to other threads when
+    they next initialise their managers.
+
+    Args:
+        maxsize (int, optional): Maximum number of views each thread holds. 0 turns the cache off. Defaults to `DEFAULT_MAXSIZE`.
+    """
+    Managers.view_cache_size = maxsize
+    managers.view_cache.resize(maxsize)
+
+
+def view_cache_info() -> CacheInfo:
+    """Return hit/miss statistics for the calling thread's cache of window views, used by `AppView(hwnd)`.
+
+    Returns:
+        CacheInfo: Hits, misses, evictions, invalidations, current size and maximum size.
+    """
+    return managers.view_cache.info()
+
+
+def invalidate_view(hwnd: Optional[int] = None):
+    """Drop the calling thread's cached view for a window, e.g. from a window destroyed or hidden event handler.
+
+    Args:
+        hwnd (int, optional): Handle to the window. Defaults to None, which drops every cached view.
+    """
+    managers.view_cache.invalidate(hwnd)
+
+
 def set_wallpaper_for_all_desktops(path: str):
     """Set wallpaper on current virtual desktop to `path`.
 
     Args:
         path (str): path to wallpaper file
     """
-    if build.OVER_21313:
-        managers.manager_internal.SetWallpaperForAllDesktops(path=HSTRING(path)) # type: ignore
-    else:
-        raise NotImplementedError("set_wallpaper_for_all_desktops is only available on Windows 11")
+    managers.adapter.set_wallpaper_for_all_desktops(HSTRING(path)) # type: ignore
+
+
+def _same_path(a: str, b: str) -> bool:
+    return os.path.normcase(os.path.normpath(a)) == os.path.normcase(os.path.normpath(b))
+
+
+def apply_wallpapers(wallpapers: Mapping[Union[VirtualDesktop, GUID], str], force: bool = False) -> int:
+    """Set the wallpapers of several desktops, skipping desktops which already have the right one.
+
+    The current wallpapers are read in one pass. Each distinct path is only
+    converted to an `HSTRING` once, and if every desktop is getting the same
+    wallpaper, they are all set with one call.
+
+    Args:
+        wallpapers (Mapping[Union[VirtualDesktop, GUID], str]): Path to the wallpaper file for each desktop, keyed by desktop or desktop ID.
+        force (bool, optional): Set every wallpaper, even if it hasn't changed. Defaults to False.
+
+    Returns:
+        int: The number of desktops whose wallpaper was set.
+
+    Raises:
+        ValueError: If a desktop in `wallpapers` doesn't exist.
+        NotImplementedError: If the Windows version doesn't support wallpapers.
+    """
+    adapter = managers.adapter
+    targets = {(d.id if isinstance(d, VirtualDesktop) else d): path for d, path in wallpapers.items()}
+    desktops = {vd.GetID(): vd for vd in adapter.get_all_desktops().iter(IVirtualDesktop)} # type: ignore
+    missing = [str(guid) for guid in targets if guid not in desktops]
+    if missing:
+        raise ValueError(f"No desktops with IDs {', '.join(missing)}")
+
+    changed = [
+        guid for guid, path in targets.items()
+        if force or not _same_path(str(adapter.get_wallpaper(desktops[guid])), path) # type: ignore
+    ]
+    if not changed:
+        return 0
+    paths = set(targets.values())
+    if len(targets) == len(desktops) and len(paths) == 1:
+        adapter.set_wallpaper_for_all_desktops(HSTRING(paths.pop())) # type: ignore
+        return len(changed)
+
+    hstrings: Dict[str, HSTRING] = {}
+    for guid in changed:
+        path = targets[guid]
+        if path not in hstrings:
+            hstrings[path] = HSTRING(path)
+        adapter.set_wallpaper(desktops[guid], hstrings[path]) # type: ignore
+    return len(changed)
@@ -0,0 +1,350 @@
+"""
+Event driven placement of windows onto desktops.
+
+A `RulesEngine` maps app IDs or executable paths to a target desktop and
+pinned state. Rather than polling, it hooks window show events and places
+each new window once, shortly after it appears:
+
+.. code:: python
+
+    engine = RulesEngine([
+        Rule(r"MSTeams", desktop="Comms"),
+        Rule(r"\\\\code\\.exe$", desktop=2, exe=True),
+        Rule(r"Spotify", pinned=True),
+    ])
+    engine.scan()   # Place the windows which are already open
+    engine.start()  # Then place new windows as they appear
+"""
+import logging
+import re
+import threading
+import warnings
+from ctypes import byref, create_unicode_buffer
+from ctypes.wintypes import BOOL, DWORD, HANDLE, HWND, LONG, LPDWORD, LPWSTR, MSG
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Set, Tuple, Union
+
+from pyvda.com_defns import IApplicationView
+from pyvda.compat import GUID, WINFUNCTYPE, COMError, windll
+from pyvda.pyvda import AppView, VirtualDesktop, _notify, invalidate_view, managers
+from pyvda.utils import wstr
+
+logger = logging.getLogger(__name__)
+
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+GA_ROOT = 2
+WM_TIMER = 0x0113
+WM_QUIT = 0x0012
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+WINEVENTPROC = WINFUNCTYPE(None, HANDLE, DWORD, HWND, LONG, LONG, DWORD, DWORD)
+_SetWinEventHook = WINFUNCTYPE(HANDLE, DWORD, DWORD, HANDLE, WINEVENTPROC, DWORD, DWORD, DWORD)(("SetWinEventHook", windll.user32))
+_UnhookWinEvent = WINFUNCTYPE(BOOL, HANDLE)(("UnhookWinEvent", windll.user32))
+_OpenProcess = WINFUNCTYPE(HANDLE, DWORD, BOOL, DWORD)(("OpenProcess", windll.kernel32))
+_CloseHandle = WINFUNCTYPE(BOOL, HANDLE)(("CloseHandle", windll.kernel32))
+_QueryFullProcessImageNameW = WINFUNCTYPE(BOOL, HANDLE, DWORD, LPWSTR, LPDWORD)(("QueryFullProcessImageNameW", windll.kernel32))
+
+DesktopRef = Union[int, str, GUID]
+
+
+class Rule(NamedTuple):
+    """Where windows of matching apps should go.
+
+    `pattern` is a regular expression searched for in the window's app ID,
+    or in its executable's full path if `exe` is set. `desktop` is a desktop
+    number (1-indexed), name or GUID. Fields left as `None` are not changed.
+    When several rules match a window, the first one wins.
+    """
+    pattern: str
+    desktop: Optional[DesktopRef] = None
+    pinned: Optional[bool] = None
+    exe: bool = False
+
+
+def window_exe(hwnd: int) -> Optional[str]:
+    """The full path of the executable which owns a window, or `None` if it can't be read."""
+    pid = DWORD()
+    windll.user32.GetWindowThreadProcessId(hwnd, byref(pid))
+    process = _OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
+    if not process:
+        return None
+    try:
+        buffer = create_unicode_buffer(32768)
+        size = DWORD(len(buffer))
+        if not _QueryFullProcessImageNameW(process, 0, buffer, byref(size)):
+            return None
+        return buffer.value
+    finally:
+        _CloseHandle(process)
+
+
+def _combinable(pattern: str, flags: int) -> bool:
+    """Whether a pattern means the same inside an alternation as on its own.
+
+    Patterns with groups (which backreferences need) or inline global flags
+    like `(?i)` can't be wrapped, and are matched on their own instead.
+    """
+    if re.compile(pattern, flags).groups:
+        return False
+    try:
+        with warnings.catch_warnings():
+            # Before Python 3.11 misplaced global flags only warn
+            warnings.simplefilter("error")
+            return re.compile(f"(?:{pattern})", flags).groups == 0
+    except (re.error, DeprecationWarning):
+        return False
+
+
+class _Matcher(NamedTuple):
+    # The combinable patterns as one regex, whose matching group names the first matching pattern
+    combined: Optional[Pattern]
+    # Rule index and regex of each pattern matched on its own, in rule order
+    separate: List[Tuple[int, Pattern]]
+
+
+def _combine(patterns: List[Tuple[int, str]], flags: int) -> Optional[_Matcher]:
+    """Compile patterns into as few regexes as possible.
+
+    Each alternative is anchored at the start and may skip ahead, so the
+    alternatives are tried in order rather than by where in the string they match.
+
+    Raises:
+        re.error: If a pattern isn't a valid regular expression.
+    """
+    if not patterns:
+        return None
+    combined: List[Tuple[int, str]] = []
+    separate: List[Tuple[int, Pattern]] = []
+    for i, p in patterns:
+        if _combinable(p, flags):
+            combined.append((i, p))
+        else:
+            separate.append((i, re.compile(p, flags)))
+    regex = re.compile("|".join(f"(?P<r{i}>.*?(?:{p}))" for i, p in combined), flags) if combined else None
+    return _Matcher(regex, separate)
+
+
+def _first_match(matcher: Optional[_Matcher], value: Optional[str]) -> Optional[int]:
+    if matcher is None or value is None:
+        return None
+    best: Optional[int] = None
+    if matcher.combined is not None:
+        m = matcher.combined.match(value)
+        best = int(m.lastgroup[1:]) if m else None # type: ignore
+    for i, regex in matcher.separate:
+        if best is not None and i > best:
+            break
+        if regex.search(value):
+            return i
+    return best
+
+
+class RulesEngine():
+    def __init__(
+        self,
+        rules: Iterable[Rule],
+        batch_delay: float = 0.1,
+        flags: int = re.IGNORECASE,
+        exe_lookup: Callable[[int], Optional[str]] = window_exe,
+    ):
+        """
+        Args:
+            rules (Iterable[Rule]): Rules in priority order.
+            batch_delay (float, optional): Seconds to wait after a window appears before placing it, so that windows which open together are placed in one batch. Defaults to 0.1.
+            flags (int, optional): Flags for compiling the patterns. Defaults to `re.IGNORECASE`.
+            exe_lookup (Callable, optional): Returns the executable path for a window handle. Defaults to `window_exe`.
+        """
+        self.rules = list(rules)
+        self.batch_delay = batch_delay
+        self._exe_lookup = exe_lookup
+        self._app_matcher = _combine([(i, r.pattern) for i, r in enumerate(self.rules) if not r.exe], flags)
+        self._exe_matcher = _combine([(i, r.pattern) for i, r in enumerate(self.rules) if r.exe], flags)
+        # Index of the winning rule for each (app ID, exe) seen so far
+        self._decisions: Dict[Tuple[Optional[str], Optional[str]], Optional[int]] = {}
+        self._placed: Set[int] = set()
+        self._pending: Dict[int, None] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id = 0
+        self._timer = 0
+        self._started = threading.Event()
+        self.evaluations = 0
+        self.moves = 0
+
+    def match(self, app_id: Optional[str], exe: Optional[str] = None) -> Optional[Rule]:
+        """
+        Returns:
+            Rule: The first rule matching the app ID or executable path, or `None`.
+        """
+        key = (app_id, exe)
+        if key not in self._decisions:
+            self.evaluations += 1
+            hits = [i for i in (_first_match(self._app_matcher, app_id), _first_match(self._exe_matcher, exe)) if i is not None]
+            self._decisions[key] = min(hits) if hits else None
+        i = self._decisions[key]
+        return None if i is None else self.rules[i]
+
+    def _resolve(self, target: DesktopRef) -> Optional[VirtualDesktop]:
+        try:
+            if isinstance(target, GUID):
+                return VirtualDesktop(desktop_id=target)
+            if isinstance(target, str):
+                return VirtualDesktop.by_name(target)
+            return VirtualDesktop(target)
+        except (ValueError, NotImplementedError, COMError) as e:
+            logger.warning("Can't place windows on desktop %r: %s", target, e)
+            return None
+
+    def notify(self, hwnd: int):
+        """Queue a window to be placed by the next `apply`."""
+        with self._lock:
+            self._pending[hwnd] = None
+
+    def forget(self, hwnd: int):
+        """Forget a window, e.g. because it was destroyed, so that its handle is evaluated again if it is reused."""
+        with self._lock:
+            self._placed.discard(hwnd)
+            self._pending.pop(hwnd, None)
+        invalidate_view(hwnd)
+
+    def apply(self, hwnds: Optional[Iterable[int]] = None) -> int:
+        """Place windows which haven't been placed yet.
+
+        Windows are grouped by target desktop, each target is resolved once,
+        and then all of the moves are made together.
+
+        Args:
+            hwnds (Iterable[int], optional): Windows to place. Defaults to the windows queued by `notify`.
+
+        Returns:
+            int: The number of windows moved, pinned or unpinned.
+        """
+        with self._lock:
+            if hwnds is None:
+                hwnds, self._pending = list(self._pending), {}
+            else:
+                hwnds = [h for h in hwnds if h not in self._placed]
+
+        needs_exe = self._exe_matcher is not None
+        # Windows which were matched against the rules, so won't be evaluated again
+        evaluated: List[int] = []
+
+        moves: Dict[DesktopRef, List[AppView]] = {}
+        pins: List[AppView] = []
+        unpins: List[AppView] = []
+        for hwnd in hwnds:
+            try:
+                view = AppView(hwnd=hwnd)
+                if not view.is_shown_in_switchers():
+                    continue
+                app_id = wstr(view.app_id)
+            except COMError:
+                # Not a window the shell manages, or not yet
+                continue
+            rule = self.match(app_id, self._exe_lookup(hwnd) if needs_exe else None)
+            evaluated.append(hwnd)
+            if rule is None:
+                continue
+            if rule.pinned:
+                pins.append(view)
+                continue
+            if rule.pinned is False:
+                unpins.append(view)
+            if rule.desktop is not None:
+                moves.setdefault(rule.desktop, []).append(view)
+        with self._lock:
+            # Windows skipped above, e.g. because they weren't shown in the switchers yet, are placed when they next show
+            self._placed.update(evaluated)
+
+        changed = 0
+        for view in unpins:
+            if view.is_pinned():
+                view.unpin()
+                changed += 1
+        for target, views in moves.items():
+            desktop = self._resolve(target)
+            if desktop is None:
+                continue
+            for view in views:
+                managers.manager_internal.MoveViewToDesktop(view._view, desktop._virtual_desktop) # type: ignore
+            _notify("move", desktop)
+            self.moves += len(views)
+            changed += len(views)
+        for view in pins:
+            if not view.is_pinned():
+                view.pin()
+                changed += 1
+        return changed
+
+    def scan(self) -> int:
+        """Place every window which is currently open.
+
+        Returns:
+            int: The number of windows moved, pinned or unpinned.
+        """
+        views_arr = managers.adapter.get_views_by_z_order() # type: ignore
+        hwnds = [v.GetThumbnailWindow() for v in views_arr.iter(IApplicationView)]
+        return self.apply(hwnds)
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, thread, time):
+        if id_object != OBJID_WINDOW or id_child != CHILDID_SELF or not hwnd:
+            return
+        if event == EVENT_OBJECT_DESTROY:
+            self.forget(hwnd)
+            return
+        if windll.user32.GetAncestor(hwnd, GA_ROOT) != hwnd:
+            return
+        with self._lock:
+            if hwnd in self._placed:
+                return
+            self._pending[hwnd] = None
+        if not self._timer:
+            self._timer = windll.user32.SetTimer(None, 0, int(self.batch_delay * 1000), None)
+
+    def _run(self):
+        user32 = windll.user32
+        self._thread_id = windll.kernel32.GetCurrentThreadId()
+        callback = WINEVENTPROC(self._on_event)
+        flags = WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS
+        hooks = [
+            _SetWinEventHook(EVENT_OBJECT_SHOW, EVENT_OBJECT_SHOW, None, callback, 0, 0, flags),
+            _SetWinEventHook(EVENT_OBJECT_DESTROY, EVENT_OBJECT_DESTROY, None, callback, 0, 0, flags),
+        ]
+        self._started.set()
+        msg = MSG()
+        try:
+            while user32.GetMessageW(byref(msg), None, 0, 0) > 0:
+                if msg.message == WM_TIMER and msg.hWnd is None and msg.wParam == self._timer:
+                    user32.KillTimer(None, self._timer)
+                    self._timer = 0
+                    try:
+                        self.apply()
+                    except Exception:
+                        logger.exception("Failed to place windows")
+                    continue
+                user32.TranslateMessage(byref(msg))
+                user32.DispatchMessageW(byref(msg))
+        finally:
+            for hook in hooks:
+                _UnhookWinEvent(hook)
+
+    def start(self):
+        """Place new windows as they appear, from a background thread."""
+        if self._thread is not None:
+            return
+        self._started.clear()
+        self._thread = threading.Thread(target=self._run, name="pyvda-rules", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self):
+        """Stop reacting to new windows."""
+        if self._thread is None:
+            return
+        windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,244 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Roughly the length of the shell's desktop switch animation
+DEFAULT_INTERVAL = 0.3
+
+
+class DesktopSwitchBackend():
+    """Performs switches for a `SwitchScheduler` using pyvda. Desktops are
+    identified by their number in the task view (1-indexed).
+    """
+    # pyvda.pyvda is imported on first use, so that schedulers with other
+    # backends can be used without COM
+
+    def current(self) -> int:
+        from pyvda.pyvda import VirtualDesktop
+        return VirtualDesktop.current().number
+
+    def count(self) -> int:
+        from pyvda.pyvda import managers
+        return managers.adapter.get_all_desktops().GetCount() # type: ignore
+
+    def switch(self, number: int):
+        from pyvda.pyvda import VirtualDesktop
+        VirtualDesktop(number).go()
+
+
+class SwitchScheduler():
+    """
+    Coalesces bursts of desktop switch requests, such as a held down "next
+    desktop" hotkey, into as few switches as possible.
+
+    Requests only replace the pending target, so however many arrive between
+    two switches, only the latest is acted on. Switches are spaced at least
+    `interval` seconds apart so that they don't queue up behind the shell's
+    animation.
+
+    Switches happen when `pump` is called, or on a background thread after
+    `start`:
+
+        >>> scheduler = SwitchScheduler()
+        >>> scheduler.start()
+        >>> for _ in range(5):
+        ...     scheduler.request_offset(1)
+        >>> scheduler.wait()  # One switch, to the desktop five to the right
+
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        backend: Optional[DesktopSwitchBackend] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            interval (float, optional): Minimum number of seconds between two switches. Defaults to `DEFAULT_INTERVAL`.
+            backend (DesktopSwitchBackend, optional): Performs the switches. Defaults to a `DesktopSwitchBackend`.
+            clock (Callable, optional): Returns the current time in seconds. Defaults to `time.monotonic`.
+        """
+        self.interval = interval
+        self._backend = backend or DesktopSwitchBackend()
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._pending: Optional[int] = None
+        self._resolved: Optional[int] = None
+        self._last_switch: Optional[float] = None
+        self._switching = False
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.requests = 0
+        self.switches = 0
+
+    @property
+    def resolved(self) -> Optional[int]:
+        """The desktop most recently switched to, or read from the shell when the
+        latest burst of requests started. `None` before the first request."""
+        return self._resolved
+
+    @property
+    def target(self) -> Optional[int]:
+        """The desktop which will be current once all requests have been handled."""
+        with self._cond:
+            return self._pending if self._pending is not None else self._resolved
+
+    def request(self, number: int):
+        """Request a switch to desktop `number`, replacing any pending request.
+
+        Args:
+            number (int): The number of the desktop in the task view (1-indexed).
+        """
+        current = self._burst_start()
+        with self._cond:
+            self._start_burst(current)
+            self._pending = number
+            self.requests += 1
+            self._cond.notify_all()
+
+    def _burst_start(self) -> Optional[int]:
+        """Read the current desktop if no switch is pending, i.e. a new burst is starting."""
+        if self._pending is None and not self._switching:
+            # The desktop may have been switched without this scheduler since its last switch
+            return self._backend.current()
+        return None
+
+    def _start_burst(self, current: Optional[int]):
+        # Only if still idle, a request from another thread may have started the burst meanwhile
+        if current is not None and self._pending is None and not self._switching:
+            self._resolved = current
+
+    def request_offset(self, offset: int, wrap: bool = True):
+        """Request a switch relative to the latest target, so that consecutive
+        requests accumulate: three requests with offset 1 move three desktops.
+
+        Args:
+            offset (int): Number of desktops to move by, negative to move left.
+            wrap (bool, optional): Wrap around from the last desktop to the first and vice versa, otherwise stop at either end. Defaults to True.
+        """
+        count = self._backend.count()
+        current = self._burst_start()
+        with self._cond:
+            self._start_burst(current)
+            base = self._pending if self._pending is not None else self._resolved
+            if base is None:
+                base = self._backend.current()
+            if wrap:
+                number = (base - 1 + offset) % count + 1
+            else:
+                number = min(max(base + offset, 1), count)
+            self._pending = number
+            self.requests += 1
+            self._cond.notify_all()
+
+    def due_in(self) -> Optional[float]:
+        """
+        Returns:
+            float: Seconds until the pending switch may be performed, or `None` if there is nothing pending.
+        """
+        with self._cond:
+            return self._due_in()
+
+    def _due_in(self) -> Optional[float]:
+        if self._pending is None:
+            return None
+        if self._last_switch is None:
+            return 0.0
+        return max(0.0, self._last_switch + self.interval - self._clock())
+
+    def pump(self) -> Optional[int]:
+        """Perform the pending switch if the interval since the last one has passed.
+
+        If the switch fails, its target stays pending unless a newer request
+        replaced it meanwhile, and the failed attempt doesn't count towards
+        the interval.
+
+        Returns:
+            int: The desktop switched to, or `None` if no switch was performed.
+        """
+        with self._cond:
+            if self._switching or self._due_in() != 0.0:
+                return None
+            number, self._pending = self._pending, None
+            if number == self._resolved:
+                # The burst came back to where it started
+                self._cond.notify_all()
+                return None
+            self._switching = True
+        try:
+            self._backend.switch(number) # type: ignore
+        except Exception:
+            with self._cond:
+                if self._pending is None:
+                    self._pending = number
+                self._switching = False
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._resolved = number
+            self._last_switch = self._clock()
+            self._switching = False
+            self.switches += 1
+            self._cond.notify_all()
+        return number
+
+    def _discard(self, number: int):
+        """Drop the pending request for `number`, unless it has been replaced by a newer one."""
+        with self._cond:
+            if self._pending == number:
+                self._pending = None
+                self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Block until there are no pending requests. Requires `start` to have been called.
+
+        Returns:
+            int: The resolved desktop.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending is None and not self._switching, timeout)
+            return self._resolved
+
+    def start(self):
+        """Perform switches on a background thread as they become due."""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="pyvda-switch-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread. Pending requests are dropped."""
+        with self._cond:
+            self._stopping = True
+            self._pending = None
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopping or self._pending is not None)
+                if self._stopping:
+                    return
+                delay = self._due_in()
+            if delay:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._stopping, delay)
+                continue
+            with self._cond:
+                number = self._pending
+            try:
+                self.pump()
+            except Exception:
+                # Give up on the target rather than retrying it in a loop, e.g.
+                # after a switch to a removed desktop, and keep servicing later requests
+                logger.exception("Failed to switch desktop")
+                if number is not None:
+                    self._discard(number)
@@ -0,0 +1,189 @@
+"""
+An in-memory index of window titles, for launchers and window switchers.
+
+Building the index enumerates every window once. After that, `refresh` only
+re-reads the app ID and desktop of windows whose title or activation
+timestamp changed, and `search` never leaves Python:
+
+.. code:: python
+
+    index = WindowIndex()
+    for keystroke in ...:
+        index.refresh()
+        for entry in index.search(query, limit=10):
+            print(entry.title)
+
+"""
+from ctypes import create_unicode_buffer
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from pyvda.compat import GUID, windll
+from pyvda.pyvda import AppView, get_apps_by_z_order
+from pyvda.utils import wstr
+
+# Match tiers, best first
+PREFIX = 0
+WORD_PREFIX = 1
+SUBSTRING = 2
+SUBSEQUENCE = 3
+
+
+class WindowEntry(NamedTuple):
+    hwnd: int
+    title: str
+    app_id: Optional[str]
+    desktop_id: GUID
+    timestamp: int
+
+
+def window_title(hwnd: int) -> str:
+    """The window's title, as shown in its title bar."""
+    length = windll.user32.GetWindowTextLengthW(hwnd)
+    if not length:
+        return ""
+    buffer = create_unicode_buffer(length + 1)
+    windll.user32.GetWindowTextW(hwnd, buffer, length + 1)
+    return buffer.value
+
+
+def _score(query: str, text: str) -> Optional[Tuple[int, int]]:
+    """Rank how well a lowercase query matches lowercase text.
+
+    Returns:
+        Tuple[int, int]: The match tier and a penalty within it, lower is better, or `None` if there is no match.
+    """
+    if text.startswith(query):
+        return (PREFIX, len(text))
+    i = text.find(query)
+    if i >= 0:
+        while i >= 0:
+            if not text[i - 1].isalnum():
+                return (WORD_PREFIX, i)
+            i = text.find(query, i + 1)
+        return (SUBSTRING, text.find(query))
+    # Every character in order, preferring the tightest span. Matching greedily
+    # from a start gives the earliest end for it, so try every start.
+    best: Optional[int] = None
+    start = text.find(query[0])
+    while start >= 0:
+        pos = start
+        for c in query[1:]:
+            pos = text.find(c, pos + 1)
+            if pos < 0:
+                # No later start can match either
+                return None if best is None else (SUBSEQUENCE, best)
+        if best is None or pos - start < best:
+            best = pos - start
+        start = text.find(query[0], start + 1)
+    return None if best is None else (SUBSEQUENCE, best)
+
+
+class WindowIndex():
+    def __init__(
+        self,
+        title_of: Callable[[int], str] = window_title,
+        switcher_windows: bool = True,
+    ):
+        """
+        Args:
+            title_of (Callable, optional): Returns the title of a window handle. Defaults to `window_title`.
+            switcher_windows (bool, optional): Only index windows which appear in the alt-tab dialogue. Defaults to True.
+        """
+        self._title_of = title_of
+        self.switcher_windows = switcher_windows
+        self._entries: Dict[int, WindowEntry] = {}
+        # Lowercased title and app ID, for matching
+        self._keys: Dict[int, Tuple[str, str]] = {}
+        # Position in the z-order, foreground first
+        self._rank: Dict[int, int] = {}
+        self.rescans = 0
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, hwnd: int) -> bool:
+        return hwnd in self._entries
+
+    def get(self, hwnd: int) -> Optional[WindowEntry]:
+        return self._entries.get(hwnd)
+
+    def entries(self) -> List[WindowEntry]:
+        """
+        Returns:
+            List[WindowEntry]: Every indexed window, in z-order with the foreground window first.
+        """
+        return sorted(self._entries.values(), key=lambda e: self._rank[e.hwnd])
+
+    def _store(self, view: AppView, title: str, timestamp: int):
+        hwnd = view.hwnd
+        app_id = wstr(view.app_id)
+        self._entries[hwnd] = WindowEntry(hwnd, title, app_id, view.desktop_id, timestamp)
+        self._keys[hwnd] = (title.lower(), (app_id or "").lower())
+        self.rescans += 1
+
+    def refresh(self, full: bool = False) -> int:
+        """Bring the index up to date with the open windows.
+
+        Only windows which are new, or whose title or activation timestamp
+        changed, are re-read. A window moved to another desktop without being
+        activated keeps its old desktop until `full` is used or it is activated.
+
+        Args:
+            full (bool, optional): Re-read every window. Defaults to False.
+
+        Returns:
+            int: The number of windows added, updated or removed.
+        """
+        views = get_apps_by_z_order(switcher_windows=self.switcher_windows, current_desktop=False)
+        changed = 0
+        rank: Dict[int, int] = {}
+        for i, view in enumerate(views):
+            hwnd = view.hwnd
+            rank[hwnd] = i
+            title = self._title_of(hwnd)
+            timestamp = view.get_activation_timestamp()
+            entry = self._entries.get(hwnd)
+            if full or entry is None or entry.title != title or entry.timestamp != timestamp:
+                self._store(view, title, timestamp)
+                changed += 1
+        for hwnd in [h for h in self._entries if h not in rank]:
+            del self._entries[hwnd]
+            del self._keys[hwnd]
+            changed += 1
+        self._rank = rank
+        return changed
+
+    def search(self, query: str, limit: Optional[int] = 10, desktop_id: Optional[GUID] = None) -> List[WindowEntry]:
+        """Find windows whose title or app ID matches a query, best match first.
+
+        Prefixes rank above word prefixes, then substrings and finally
+        subsequences (e.g. "vsc" for "Visual Studio Code"). Within each of
+        those, title matches rank above app ID matches, tighter matches above
+        looser ones, and then windows nearer the foreground first.
+
+        Args:
+            query (str): Text to look for, case-insensitively. An empty query matches every window.
+            limit (int, optional): Maximum number of results, or `None` for all of them. Defaults to 10.
+            desktop_id (GUID, optional): Only include windows on this desktop.
+
+        Returns:
+            List[WindowEntry]: The matching windows.
+        """
+        query = query.lower()
+        scored = []
+        for hwnd, (title, app_id) in self._keys.items():
+            if desktop_id is not None and self._entries[hwnd].desktop_id != desktop_id:
+                continue
+            if not query:
+                scored.append(((0, 0, 0), self._rank[hwnd], hwnd))
+                continue
+            title_score = _score(query, title)
+            if title_score is not None:
+                scored.append(((title_score[0], 0, title_score[1]), self._rank[hwnd], hwnd))
+                continue
+            app_score = _score(query, app_id) if app_id else None
+            if app_score is not None:
+                scored.append(((app_score[0], 1, app_score[1]), self._rank[hwnd], hwnd))
+        scored.sort()
+        return [self._entries[hwnd] for _, _, hwnd in scored[:limit]]
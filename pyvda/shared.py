@@ -0,0 +1,336 @@
+"""
+Publish desktop and window state to shared memory for other processes.
+
+One process runs a `StatePublisher`, which refreshes the state from the shell
+and writes it into a memory-mapped region with a fixed layout. Any number of
+`StateReader`s map the region read-only and decode records straight out of
+it, so only the publisher ever makes COM calls.
+
+.. code:: python
+
+    # In one process
+    publisher = StatePublisher(interval=0.5)
+    publisher.start()
+
+    # In any number of others
+    reader = StateReader()
+    state = reader.read()
+    desktop_index = reader.desktop_of(hwnd)
+
+Writes are guarded by a sequence number, as in a seqlock: it is odd while a
+write is in progress and is bumped again when it completes, and readers retry
+if it was odd or changed while they were reading.
+
+Layout, all little-endian:
+
+* Header (`_HEADER`): magic, layout version, flags, sequence number, publish
+  time, desktop and window capacities and counts, and the index of the
+  current desktop.
+* `max_desktops` desktop records (`_DESKTOP`): GUID (as in memory), UTF-8
+  name length and name, truncated to `NAME_BYTES`.
+* `max_windows` window records (`_WINDOW`): handle, desktop index (-1 if the
+  window is on no listed desktop) and flags, sorted by handle.
+
+This module doesn't import anything which touches COM until a publisher's
+default state source is used.
+"""
+import bisect
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NAME = "pyvda-state"
+LAYOUT_VERSION = 1
+NAME_BYTES = 110
+
+_MAGIC = b"PVDM"
+_HEADER = struct.Struct("<4sHHQdIIIIi")
+_SEQ_OFFSET = 8
+_SEQ = struct.Struct("<Q")
+_DESKTOP = struct.Struct(f"<16sH{NAME_BYTES}s")
+_WINDOW = struct.Struct("<QiI")
+
+# Header flags
+TRUNCATED = 1
+
+# Window flags, as in `pyvda.snapshot`
+PINNED = 1
+APP_PINNED = 2
+SHOWN_IN_SWITCHERS = 4
+
+DEFAULT_TIMEOUT = 1.0
+
+
+class SharedDesktop(NamedTuple):
+    id: uuid.UUID
+    name: str
+
+
+class SharedWindow(NamedTuple):
+    hwnd: int
+    # Index into `SharedState.desktops`, or -1
+    desktop: int
+    flags: int
+
+
+class SharedState(NamedTuple):
+    sequence: int
+    published: float
+    desktops: List[SharedDesktop]
+    # Sorted by handle
+    windows: List[SharedWindow]
+    current_desktop: int
+    # More desktops or windows existed than the region has room for
+    truncated: bool
+
+
+def region_size(max_desktops: int, max_windows: int) -> int:
+    return _HEADER.size + max_desktops * _DESKTOP.size + max_windows * _WINDOW.size
+
+
+def _open_region(size: int, name: str, path: Optional[str], write: bool) -> mmap.mmap:
+    """Map a named region on Windows, or a file anywhere."""
+    if path is None:
+        if sys.platform != "win32":
+            raise NotImplementedError("Named shared memory is only available on Windows, pass a path instead")
+        access = mmap.ACCESS_WRITE if write else mmap.ACCESS_READ
+        return mmap.mmap(-1, size, tagname=name, access=access)
+    if write:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            return mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return mmap.mmap(fd, size or os.fstat(fd).st_size, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+
+def _default_source() -> Any:
+    # Imported here so that readers never load the COM interfaces
+    from pyvda.snapshot import take_snapshot
+    return take_snapshot()
+
+
+def _guid_bytes(guid: Any) -> bytes:
+    return uuid.UUID(str(guid)).bytes_le
+
+
+class StatePublisher():
+    def __init__(
+        self,
+        source: Callable[[], Any] = _default_source,
+        interval: float = 0.5,
+        max_desktops: int = 64,
+        max_windows: int = 1024,
+        name: str = DEFAULT_NAME,
+        path: Optional[str] = None,
+    ):
+        """
+        Args:
+            source (Callable, optional): Returns the state to publish, as a `pyvda.snapshot.Snapshot` or anything with the same fields. Defaults to taking a snapshot.
+            interval (float, optional): Seconds between refreshes after `start`. Defaults to 0.5.
+            max_desktops (int, optional): Number of desktop records the region has room for. Defaults to 64.
+            max_windows (int, optional): Number of window records the region has room for. Defaults to 1024.
+            name (str, optional): Name of the shared memory region, on Windows. Defaults to `DEFAULT_NAME`.
+            path (str, optional): Map this file instead of named shared memory.
+        """
+        self._source = source
+        self.interval = interval
+        self.max_desktops = max_desktops
+        self.max_windows = max_windows
+        self._map = _open_region(region_size(max_desktops, max_windows), name, path, write=True)
+        self._sequence = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._write_header(0, 0.0, 0, 0, -1, 0)
+
+    def _write_header(self, flags: int, published: float, n_desktops: int, n_windows: int, current: int, sequence: int):
+        _HEADER.pack_into(
+            self._map, 0, _MAGIC, LAYOUT_VERSION, flags, sequence, published,
+            self.max_desktops, self.max_windows, n_desktops, n_windows, current,
+        )
+
+    def publish(self, state: Optional[Any] = None) -> int:
+        """Write the state into the region.
+
+        Args:
+            state (Snapshot, optional): State to publish. Defaults to fetching it from the source.
+
+        Returns:
+            int: The sequence number of the published state.
+        """
+        if state is None:
+            state = self._source()
+        desktops = state.desktops[:self.max_desktops]
+        index = {str(d.id): i for i, d in enumerate(desktops)}
+        windows = sorted(
+            (
+                v.hwnd,
+                index.get(str(v.desktop_id), -1),
+                (PINNED * v.pinned) | (APP_PINNED * v.app_pinned) | (SHOWN_IN_SWITCHERS * v.shown_in_switchers),
+            )
+            for v in state.views
+        )[:self.max_windows]
+        truncated = len(state.desktops) > self.max_desktops or len(state.views) > self.max_windows
+        current = index.get(str(state.current_desktop_id), -1)
+
+        # Odd while the records are being written
+        _SEQ.pack_into(self._map, _SEQ_OFFSET, self._sequence + 1)
+        offset = _HEADER.size
+        for d in desktops:
+            name = (d.name or "").encode("utf-8")[:NAME_BYTES]
+            _DESKTOP.pack_into(self._map, offset, _guid_bytes(d.id), len(name), name)
+            offset += _DESKTOP.size
+        offset = _HEADER.size + self.max_desktops * _DESKTOP.size
+        for record in windows:
+            _WINDOW.pack_into(self._map, offset, *record)
+            offset += _WINDOW.size
+        self._write_header(TRUNCATED * truncated, time.time(), len(desktops), len(windows), current, self._sequence + 1)
+        # Only now that the header is complete can readers accept it
+        self._sequence += 2
+        _SEQ.pack_into(self._map, _SEQ_OFFSET, self._sequence)
+        return self._sequence
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.publish()
+            except Exception:
+                logger.exception("Failed to publish desktop state")
+
+    def start(self):
+        """Publish once, then refresh from a background thread every `interval` seconds."""
+        if self._thread is not None:
+            return
+        self.publish()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pyvda-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def close(self):
+        self.stop()
+        self._map.close()
+
+
+class StateReader():
+    """Reads state written by a `StatePublisher`, without making any COM calls."""
+
+    def __init__(self, name: str = DEFAULT_NAME, path: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            name (str, optional): Name of the shared memory region, on Windows. Defaults to `DEFAULT_NAME`.
+            path (str, optional): Map this file instead of named shared memory.
+            timeout (float, optional): Seconds to keep retrying a read which overlaps with writes before raising `TimeoutError`. Defaults to `DEFAULT_TIMEOUT`.
+        """
+        self.timeout = timeout
+        header = _open_region(_HEADER.size, name, path, write=False)
+        try:
+            magic, version, _, _, _, max_desktops, max_windows, _, _, _ = _HEADER.unpack_from(header, 0)
+        finally:
+            header.close()
+        if magic != _MAGIC or version != LAYOUT_VERSION:
+            raise ValueError("Region doesn't hold published pyvda state")
+        self._windows_offset = _HEADER.size + max_desktops * _DESKTOP.size
+        self._map = _open_region(region_size(max_desktops, max_windows), name, path, write=False)
+        self._buffer = memoryview(self._map)
+
+    def sequence(self) -> int:
+        """The current sequence number, which changes whenever new state is published."""
+        return _SEQ.unpack_from(self._buffer, _SEQ_OFFSET)[0]
+
+    def _read(self, decode: Callable[[tuple], Any]) -> Any:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            header = _HEADER.unpack_from(self._buffer, 0)
+            sequence = header[3]
+            if not sequence % 2:
+                result = decode(header)
+                if self.sequence() == sequence:
+                    return result
+            if time.monotonic() > deadline:
+                raise TimeoutError("Published state kept changing while it was being read")
+            # Let the publisher finish its write
+            time.sleep(0)
+
+    def _desktop(self, i: int) -> SharedDesktop:
+        guid, length, name = _DESKTOP.unpack_from(self._buffer, _HEADER.size + i * _DESKTOP.size)
+        return SharedDesktop(uuid.UUID(bytes_le=guid), name[:length].decode("utf-8", "ignore"))
+
+    def _window(self, i: int) -> SharedWindow:
+        return SharedWindow(*_WINDOW.unpack_from(self._buffer, self._windows_offset + i * _WINDOW.size))
+
+    def read(self) -> SharedState:
+        """
+        Returns:
+            SharedState: A consistent copy of the latest published state.
+        """
+        def decode(header):
+            _, _, flags, sequence, published, _, _, n_desktops, n_windows, current = header
+            return SharedState(
+                sequence,
+                published,
+                [self._desktop(i) for i in range(n_desktops)],
+                [self._window(i) for i in range(n_windows)],
+                current,
+                bool(flags & TRUNCATED),
+            )
+        return self._read(decode)
+
+    def desktop_of(self, hwnd: int) -> Optional[int]:
+        """Find the desktop a window is on, by binary search over the window records.
+
+        Returns:
+            int: Index of the window's desktop, -1 if it is on no listed desktop, or `None` if the window isn't published.
+        """
+        def decode(header):
+            n_windows = header[8]
+            hwnds = _WindowHandles(self, n_windows)
+            i = bisect.bisect_left(hwnds, hwnd)
+            if i < n_windows and hwnds[i] == hwnd:
+                return self._window(i).desktop
+            return None
+        return self._read(decode)
+
+    def current_desktop(self) -> Optional[SharedDesktop]:
+        """The current desktop, as of the latest published state."""
+        def decode(header):
+            current = header[9]
+            return self._desktop(current) if current >= 0 else None
+        return self._read(decode)
+
+    def close(self):
+        self._buffer.release()
+        self._map.close()
+
+
+class _WindowHandles():
+    """A sequence view of the window handles, for `bisect`."""
+
+    def __init__(self, reader: StateReader, length: int):
+        self._reader = reader
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i: int) -> int:
+        return _WINDOW.unpack_from(self._reader._buffer, self._reader._windows_offset + i * _WINDOW.size)[0]
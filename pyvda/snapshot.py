@@ -0,0 +1,317 @@
+import json
+import struct
+import uuid
+import zlib
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from pyvda.com_defns import IApplicationView, IVirtualDesktop
+from pyvda.compat import GUID
+from pyvda.pyvda import AppView, VirtualDesktop, _name_index, managers
+from pyvda.utils import wstr
+
+
+class DesktopState(NamedTuple):
+    id: GUID
+    number: int
+    name: str
+    # `None` where the Windows build can't report wallpapers.
+    wallpaper: Optional[str]
+
+
+class ViewState(NamedTuple):
+    hwnd: int
+    app_id: Optional[str]
+    desktop_id: GUID
+    pinned: bool
+    app_pinned: bool
+    shown_in_switchers: bool
+
+
+FORMAT_VERSION = 1
+_MAGIC = b"PVDS"
+
+# View flags in the encoded forms
+PINNED = 1
+APP_PINNED = 2
+SHOWN_IN_SWITCHERS = 4
+
+_HEADER = struct.Struct("<4sBHIh")
+_DESKTOP = struct.Struct("<16s")
+_VIEW = struct.Struct("<QhB")
+_STRLEN = struct.Struct("<H")
+_NONE_STR = 0xFFFF
+
+
+def _guid_bytes(guid: GUID) -> bytes:
+    return uuid.UUID(str(guid)).bytes_le
+
+
+def _guid_from_bytes(data: bytes) -> GUID:
+    return GUID("{%s}" % uuid.UUID(bytes_le=bytes(data)))
+
+
+def _flags(view: ViewState) -> int:
+    return (PINNED * view.pinned) | (APP_PINNED * view.app_pinned) | (SHOWN_IN_SWITCHERS * view.shown_in_switchers)
+
+
+def _ref(guid: GUID, index: Dict[GUID, int]) -> Union[int, str]:
+    """Refer to a desktop by its position where possible, otherwise by its GUID."""
+    i = index.get(guid)
+    return str(guid) if i is None else i
+
+
+def _deref(ref: Union[int, str], desktops: List[DesktopState]) -> GUID:
+    return desktops[ref].id if isinstance(ref, int) else GUID(ref)
+
+
+def _view_record(view: ViewState, index: Dict[GUID, int]) -> List[Any]:
+    return [view.hwnd, view.app_id, _ref(view.desktop_id, index), _flags(view)]
+
+
+def _view_from_record(record: List[Any], desktops: List[DesktopState]) -> ViewState:
+    hwnd, app_id, ref, flags = record
+    return ViewState(hwnd, app_id, _deref(ref, desktops), bool(flags & PINNED), bool(flags & APP_PINNED), bool(flags & SHOWN_IN_SWITCHERS))
+
+
+def _desktops_from_records(records: List[List[Any]]) -> List[DesktopState]:
+    return [DesktopState(GUID(guid), number, name, wallpaper) for number, (guid, name, wallpaper) in enumerate(records, 1)]
+
+
+def _pack_str(value: Optional[str]) -> bytes:
+    if value is None:
+        return _STRLEN.pack(_NONE_STR)
+    data = value.encode("utf-8")
+    return _STRLEN.pack(len(data)) + data
+
+
+def _unpack_str(buffer: memoryview, offset: int) -> Tuple[Optional[str], int]:
+    (length,) = _STRLEN.unpack_from(buffer, offset)
+    offset += _STRLEN.size
+    if length == _NONE_STR:
+        return None, offset
+    return str(buffer[offset:offset + length], "utf-8"), offset + length
+
+
+class Snapshot(NamedTuple):
+    """The state of all desktops and windows at one point in time.
+
+    Snapshots can be encoded to compact JSON (`to_json`) or binary
+    (`to_bytes`). In both, windows refer to desktops by position, and
+    pinned/switcher state is packed into one flags field. For periodic
+    reporting, `delta` encodes only what changed since a previous snapshot:
+
+        >>> previous = take_snapshot()
+        >>> send(previous.to_bytes())
+        >>> current = take_snapshot()
+        >>> send(json.dumps(current.delta(previous)))
+        # on the receiving end
+        >>> current = previous.apply_delta(delta)
+
+    """
+    desktops: List[DesktopState]
+    views: List[ViewState]
+    current_desktop_id: GUID
+
+    def _index(self) -> Dict[GUID, int]:
+        return {d.id: i for i, d in enumerate(self.desktops)}
+
+    def to_json(self) -> str:
+        index = self._index()
+        return json.dumps({
+            "v": FORMAT_VERSION,
+            "c": _ref(self.current_desktop_id, index),
+            "d": [[str(d.id), d.name, d.wallpaper] for d in self.desktops],
+            "w": [_view_record(v, index) for v in self.views],
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, data: Union[str, bytes]) -> "Snapshot":
+        obj = json.loads(data)
+        if obj["v"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {obj['v']}")
+        desktops = _desktops_from_records(obj["d"])
+        views = [_view_from_record(r, desktops) for r in obj["w"]]
+        return cls(desktops, views, _deref(obj["c"], desktops))
+
+    def to_bytes(self) -> bytes:
+        index = self._index()
+        parts = [_HEADER.pack(_MAGIC, FORMAT_VERSION, len(self.desktops), len(self.views), index.get(self.current_desktop_id, -1))]
+        if self.current_desktop_id not in index:
+            parts.append(_guid_bytes(self.current_desktop_id))
+        for d in self.desktops:
+            parts.append(_DESKTOP.pack(_guid_bytes(d.id)))
+            parts.append(_pack_str(d.name))
+            parts.append(_pack_str(d.wallpaper))
+        for v in self.views:
+            desktop = index.get(v.desktop_id, -1)
+            parts.append(_VIEW.pack(v.hwnd, desktop, _flags(v)))
+            if desktop == -1:
+                parts.append(_guid_bytes(v.desktop_id))
+            parts.append(_pack_str(v.app_id))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Snapshot":
+        buffer = memoryview(data)
+        magic, version, n_desktops, n_views, current = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a supported binary snapshot")
+        offset = _HEADER.size
+        current_id = None
+        if current == -1:
+            current_id = _guid_from_bytes(buffer[offset:offset + 16])
+            offset += 16
+
+        desktops = []
+        for number in range(1, n_desktops + 1):
+            (guid,) = _DESKTOP.unpack_from(buffer, offset)
+            offset += _DESKTOP.size
+            name, offset = _unpack_str(buffer, offset)
+            wallpaper, offset = _unpack_str(buffer, offset)
+            desktops.append(DesktopState(_guid_from_bytes(guid), number, name or "", wallpaper))
+
+        views = []
+        for _ in range(n_views):
+            hwnd, desktop, flags = _VIEW.unpack_from(buffer, offset)
+            offset += _VIEW.size
+            if desktop == -1:
+                desktop_id = _guid_from_bytes(buffer[offset:offset + 16])
+                offset += 16
+            else:
+                desktop_id = desktops[desktop].id
+            app_id, offset = _unpack_str(buffer, offset)
+            views.append(ViewState(hwnd, app_id, desktop_id, bool(flags & PINNED), bool(flags & APP_PINNED), bool(flags & SHOWN_IN_SWITCHERS)))
+
+        return cls(desktops, views, current_id if current_id is not None else desktops[current].id)
+
+    def digest(self) -> int:
+        """A checksum of this snapshot, used to check deltas are applied to the snapshot they were made against."""
+        return zlib.crc32(self.to_bytes())
+
+    def delta(self, previous: "Snapshot") -> Dict[str, Any]:
+        """Encode the changes from `previous` to this snapshot.
+
+        Args:
+            previous (Snapshot): The snapshot the receiver already has.
+
+        Returns:
+            dict: A JSON serialisable delta, to be passed to `previous.apply_delta`.
+        """
+        index = self._index()
+        delta: Dict[str, Any] = {"v": FORMAT_VERSION, "b": previous.digest()}
+        if self.desktops != previous.desktops:
+            delta["d"] = [[str(d.id), d.name, d.wallpaper] for d in self.desktops]
+        if self.current_desktop_id != previous.current_desktop_id or "d" in delta:
+            delta["c"] = _ref(self.current_desktop_id, index)
+
+        old = {v.hwnd: v for v in previous.views}
+        new = {v.hwnd for v in self.views}
+        changed = [_view_record(v, index) for v in self.views if old.get(v.hwnd) != v]
+        removed = [hwnd for hwnd in old if hwnd not in new]
+        if changed:
+            delta["w"] = changed
+        if removed:
+            delta["x"] = removed
+        order = [v.hwnd for v in self.views]
+        if order != _default_order(previous, delta):
+            delta["o"] = order
+        return delta
+
+    def apply_delta(self, delta: Dict[str, Any]) -> "Snapshot":
+        """Apply a delta made by `Snapshot.delta` against this snapshot.
+
+        Raises:
+            ValueError: If the delta was made against a different snapshot.
+        """
+        if delta["v"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {delta['v']}")
+        if delta["b"] != self.digest():
+            raise ValueError("Delta was made against a different snapshot")
+        desktops = _desktops_from_records(delta["d"]) if "d" in delta else self.desktops
+        current = _deref(delta["c"], desktops) if "c" in delta else self.current_desktop_id
+
+        views = {v.hwnd: v for v in self.views}
+        for hwnd in delta.get("x", ()):
+            del views[hwnd]
+        for record in delta.get("w", ()):
+            view = _view_from_record(record, desktops)
+            views[view.hwnd] = view
+        order = delta.get("o") or _default_order(self, delta)
+        return Snapshot(desktops, [views[hwnd] for hwnd in order], current)
+
+
+def _default_order(previous: Snapshot, delta: Dict[str, Any]) -> List[int]:
+    """The window order assumed when a delta has none: new windows on top, in
+    the order they are listed, then the remaining previous windows."""
+    removed = set(delta.get("x", ()))
+    old = {v.hwnd for v in previous.views}
+    added = [r[0] for r in delta.get("w", ()) if r[0] not in old]
+    return added + [v.hwnd for v in previous.views if v.hwnd not in removed]
+
+
+class Capture(NamedTuple):
+    snapshot: Snapshot
+    # The objects the snapshot was built from, by desktop ID and by window handle
+    desktops: Dict[GUID, VirtualDesktop]
+    views: Dict[int, AppView]
+
+
+def capture(switcher_windows: bool = True) -> Capture:
+    """Take a snapshot, also returning the desktop and window objects it was
+    built from, for callers which act on what they find.
+
+    Args:
+        switcher_windows (bool, optional): Only include windows which appear in the alt-tab dialogue. Defaults to True.
+
+    Returns:
+        Capture: The snapshot and its objects.
+    """
+    adapter = managers.adapter
+    try:
+        names = dict(_name_index.load(refresh=True))
+    except NotImplementedError:
+        names = {}
+    get_wallpaper = adapter.get_wallpaper # type: ignore
+
+    desktops: List[DesktopState] = []
+    desktop_objects: Dict[GUID, VirtualDesktop] = {}
+    array = adapter.get_all_desktops() # type: ignore
+    for number, vd in enumerate(array.iter(IVirtualDesktop), 1):
+        guid = vd.GetID()
+        wallpaper = None
+        if get_wallpaper is not None:
+            try:
+                wallpaper = str(get_wallpaper(vd))
+            except NotImplementedError:
+                get_wallpaper = None
+        desktops.append(DesktopState(guid, number, names.get(guid, ""), wallpaper))
+        desktop_objects[guid] = VirtualDesktop(desktop=vd)
+
+    views: List[ViewState] = []
+    view_objects: Dict[int, AppView] = {}
+    views_arr = adapter.get_views_by_z_order() # type: ignore
+    for v in views_arr.iter(IApplicationView):
+        view = AppView(view=v)
+        shown = view.is_shown_in_switchers()
+        if switcher_windows and not shown:
+            continue
+        hwnd = view.hwnd
+        app_id = wstr(view.app_id)
+        app_pinned = bool(app_id) and bool(managers.pinned_apps.IsAppIdPinned(app_id)) # type: ignore
+        views.append(ViewState(hwnd, app_id, view.desktop_id, view.is_pinned(), app_pinned, shown))
+        view_objects[hwnd] = view
+
+    current = adapter.get_current_desktop().GetID() # type: ignore
+    return Capture(Snapshot(desktops, views, current), desktop_objects, view_objects)
+
+
+def take_snapshot(switcher_windows: bool = True) -> Snapshot:
+    """Read the state of every desktop and window in one pass.
+
+    Args:
+        switcher_windows (bool, optional): Only include windows which appear in the alt-tab dialogue. Defaults to True.
+
+    Returns:
+        Snapshot: Desktops in task view order and windows in z-order.
+    """
+    return capture(switcher_windows).snapshot
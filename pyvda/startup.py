@@ -0,0 +1,103 @@
+"""
+Pay pyvda's start up costs before the first call which needs to be fast.
+
+The first call in a process initialises COM, acquires the shell's manager
+interfaces and makes the first calls into explorer, which loads the proxy
+code and opens the connection to it. `warmup` does all of that ahead of
+time, by default on a background thread:
+
+.. code:: python
+
+    ready = pyvda.warmup()
+    ...
+    # Later, e.g. in a hotkey handler
+    ready.result(timeout=1)
+    state = pyvda.cached_state()  # Shared with the warm-up thread, no COM calls
+
+COM interfaces belong to the apartment which acquired them, so the warm-up
+thread registers its managers in the process's global interface table (see
+`pyvda.utils.share_managers`). Another thread's first call then unmarshals
+them from there instead of asking explorer for them again. That thread still
+initialises COM for itself, and the unmarshalling is a short round trip, but
+neither costs as much as the shell's service lookups. Also handed over are
+the process-wide `pyvda.state_cache.default_cache`, primed with the desktop
+list and current desktop, and the focused window's handle.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple, Optional
+
+from pyvda.compat import COMError
+from pyvda.pyvda import managers
+from pyvda.state_cache import CachedState, default_cache
+from pyvda.utils import share_managers
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_future: Optional['Future[WarmState]'] = None
+
+
+class WarmState(NamedTuple):
+    state: CachedState
+    # The window which was focused during warm-up, or `None`
+    focused_hwnd: Optional[int]
+    # Seconds the warm-up took
+    elapsed: float
+
+
+def _warm(future: 'Future[WarmState]'):
+    if not future.set_running_or_notify_cancel():
+        return
+    start = time.perf_counter()
+    try:
+        # The first use of `managers` on this thread initialises COM and acquires the managers
+        adapter = managers.adapter
+        try:
+            share_managers(managers)
+        except (COMError, OSError) as e:
+            # Other threads acquire their own managers instead
+            logger.warning("Failed to share the managers: %s", str(e))
+        try:
+            focused_hwnd: Optional[int] = adapter.get_view_in_focus().GetThumbnailWindow() # type: ignore
+        except Exception:
+            # Nothing is focused, e.g. on the lock screen
+            focused_hwnd = None
+        state = default_cache.get()
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(WarmState(state, focused_hwnd, time.perf_counter() - start))
+
+
+def warmup(background: bool = True) -> 'Future[WarmState]':
+    """Initialise COM, acquire and share the managers and prime the shared state cache.
+
+    Calling this again while a warm-up is running, or after one succeeded,
+    returns the same future. A failed warm-up is retried.
+
+    Args:
+        background (bool, optional): Warm up on a new daemon thread and return straight away. If False, warm up the calling thread before returning. Defaults to True.
+
+    Returns:
+        Future[WarmState]: Completes when pyvda is ready, with the state which was fetched.
+    """
+    global _future
+    with _lock:
+        future = _future
+        reuse = future is not None and not (future.done() and future.exception() is not None)
+        if not reuse:
+            future = _future = Future()
+    if reuse:
+        if not background:
+            # Unmarshal this thread's managers now, rather than on its first call
+            managers.view_collection
+            future.result() # type: ignore
+        return future # type: ignore
+    if background:
+        threading.Thread(target=_warm, args=(future,), name="pyvda-warmup", daemon=True).start()
+    else:
+        _warm(future)
+    return future
@@ -0,0 +1,155 @@
+"""
+A process-wide cache of desktop state, shared between threads.
+
+pyvda's COM interfaces are per thread, so every thread which asks for e.g.
+the current desktop normally makes its own calls to explorer. A `StateCache`
+instead holds plain values derived from those calls (desktop IDs and names,
+the current desktop, and which desktop each window is on) which any thread
+can read:
+
+.. code:: python
+
+    state = cached_state()
+    state.current_desktop_id
+    state.view_desktops.get(hwnd)
+
+Each snapshot of the state is stamped with the cache's generation. The
+generation is bumped whenever pyvda creates, renames, removes or switches a
+desktop or moves a window, and readers compare it without taking a lock. Only
+when the state is out of date or older than `ttl` does one thread refresh it,
+while any others needing it wait for and share that result.
+"""
+import itertools
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from pyvda.com_defns import IApplicationView, IVirtualDesktop
+from pyvda.compat import GUID
+from pyvda.pyvda import VirtualDesktop, _desktop_listeners, managers
+
+DEFAULT_TTL = 1.0
+
+
+class CachedState(NamedTuple):
+    generation: int
+    # `time.monotonic()` when the state was fetched
+    fetched: float
+    # In task view order
+    desktop_ids: List[GUID]
+    # Matching `desktop_ids`, or empty where the Windows build has no names
+    names: List[str]
+    current_desktop_id: GUID
+    # Window handle to the ID of the desktop it is on
+    view_desktops: Dict[int, GUID]
+
+    def desktop_number(self, desktop_id: GUID) -> Optional[int]:
+        """The 1-indexed number of a desktop, or `None` if it doesn't exist."""
+        try:
+            return self.desktop_ids.index(desktop_id) + 1
+        except ValueError:
+            return None
+
+
+def fetch_state(generation: int = 0) -> CachedState:
+    """Read the state from the shell, on the calling thread."""
+    adapter = managers.adapter
+    fetched = time.monotonic()
+    desktop_ids = [vd.GetID() for vd in adapter.get_all_desktops().iter(IVirtualDesktop)] # type: ignore
+    try:
+        names = {guid: str(name) for guid, name in adapter.get_all_names()} # type: ignore
+    except NotImplementedError:
+        names = {}
+    current = adapter.get_current_desktop().GetID() # type: ignore
+    views_arr = adapter.get_views_by_z_order() # type: ignore
+    view_desktops = {v.GetThumbnailWindow(): v.GetVirtualDesktopId() for v in views_arr.iter(IApplicationView)}
+    return CachedState(
+        generation,
+        fetched,
+        desktop_ids,
+        [names.get(guid, "") for guid in desktop_ids] if names else [],
+        current,
+        view_desktops,
+    )
+
+
+class StateCache():
+    def __init__(self, ttl: float = DEFAULT_TTL, track_changes: bool = True):
+        """
+        Args:
+            ttl (float, optional): Seconds before the state is fetched again, to pick up changes made without pyvda. Defaults to `DEFAULT_TTL`.
+            track_changes (bool, optional): Invalidate the state whenever pyvda changes desktops or moves windows. Defaults to True.
+        """
+        self.ttl = ttl
+        self._generations = itertools.count(1)
+        self._generation = next(self._generations)
+        self._state: Optional[CachedState] = None
+        # Held by the one thread refreshing the state
+        self._refresh_lock = threading.Lock()
+        self.refreshes = 0
+        self._tracking = track_changes
+        if track_changes:
+            _desktop_listeners.append(self._on_desktop_event)
+
+    def close(self):
+        """Stop tracking changes made through pyvda."""
+        if self._tracking:
+            _desktop_listeners.remove(self._on_desktop_event)
+            self._tracking = False
+
+    def _on_desktop_event(self, event: str, desktop: VirtualDesktop):
+        self.invalidate()
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever the cached state is invalidated."""
+        return self._generation
+
+    def invalidate(self):
+        """Mark the cached state as out of date, so that the next `get` fetches it again."""
+        # next() on a count is atomic, so concurrent invalidations can't be lost
+        self._generation = next(self._generations)
+
+    def _fresh(self, state: Optional[CachedState]) -> bool:
+        return (
+            state is not None
+            and state.generation == self._generation
+            and time.monotonic() - state.fetched < self.ttl
+        )
+
+    def get(self) -> CachedState:
+        """
+        Returns:
+            CachedState: The cached state, fetched first if it is out of date.
+        """
+        state = self._state
+        if self._fresh(state):
+            return state # type: ignore
+        with self._refresh_lock:
+            # Another thread may have refreshed it while this one waited
+            state = self._state
+            if self._fresh(state):
+                return state # type: ignore
+            # Read before fetching, so that an invalidation during the fetch isn't missed
+            state = fetch_state(self._generation)
+            self._state = state
+            self.refreshes += 1
+            return state
+
+    def current_desktop_id(self) -> GUID:
+        return self.get().current_desktop_id
+
+    def desktop_ids(self) -> List[GUID]:
+        return self.get().desktop_ids
+
+    def desktop_of(self, hwnd: int) -> Optional[GUID]:
+        """The ID of the desktop a window is on, or `None` if it isn't known."""
+        return self.get().view_desktops.get(hwnd)
+
+
+default_cache = StateCache()
+
+
+def cached_state() -> CachedState:
+    """The state held by the process-wide `default_cache`."""
+    return default_cache.get()
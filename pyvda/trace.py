@@ -0,0 +1,490 @@
+"""
+Recording and deterministic replay of the COM calls made by pyvda.
+
+A trace is a text file with one JSON record per line. The first line is a
+header describing the recording machine, every other line is either a root
+record (one per manager slot, written whenever a thread populates its
+`Managers`) or a call record:
+
+.. code:: text
+
+    {"format":2,"pyvda":"0.5.0","windows":"10.0.22631","build":{"OVER_19041":true,...}}
+    {"n":0,"root":"manager_internal","o":1,"i":"IVirtualDesktopManagerInternal"}
+    {"o":1,"i":"IVirtualDesktopManagerInternal","m":"GetCurrentDesktop","a":[],"r":{"o":5,"i":"IVirtualDesktop"},"d":212.4}
+    {"o":5,"i":"IVirtualDesktop","m":"GetID","a":[],"r":{"g":"{...}"},"d":95.1}
+
+`o` identifies the interface pointer a call was made on, `m` is the method,
+`a` the encoded arguments, `r` the encoded result and `d` the duration in
+microseconds. Failed calls store the HRESULT in `hr` instead of a result.
+Buffers passed with `byref` are recorded after the call in `out`, and are
+filled in again when it is replayed.
+
+Objects which aren't comtypes interfaces, such as those of a backend written
+in Python, are recorded as the interface named by their class's
+`__com_interface__` attribute. Without one, their methods named like COM
+methods, starting with an upper case letter, are recorded.
+
+Recording:
+
+.. code:: python
+
+    from pyvda import trace
+
+    with trace.record("session.trace"):
+        run_workload()
+
+Replaying serves the recorded responses in place of the shell, so the same
+workload can be re-run and profiled without the original machine:
+
+.. code:: python
+
+    with trace.replay("session.trace", realtime=True):
+        run_workload()
+
+This works on machines without the shell, or without Windows, provided the
+replay starts before anything from pyvda which talks to the shell, such as
+`AppView`, is imported. The interfaces are then declared for the recording
+machine's build instead of detecting this one's. Once the interfaces have
+been declared they can't change, so replaying a trace from a machine whose
+feature flags differ raises `ReplayError`.
+"""
+import ctypes
+import functools
+import json
+import sys
+import threading
+import time
+import types
+from collections import deque
+from contextlib import contextmanager
+from ctypes import c_void_p, c_wchar, wstring_at
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import pyvda.build as build
+from pyvda._version import __version__
+from pyvda.compat import GUID, COMError
+
+if TYPE_CHECKING:
+    # pyvda.utils declares the interfaces, which needs the build's features, so
+    # it is imported once a replay has set them
+    from pyvda import utils
+
+FORMAT_VERSION = 2
+MANAGER_SLOTS = ("manager_internal", "view_collection", "pinned_apps", "manager_internal2")
+BUILD_FLAGS = build.FLAGS
+
+# Python-level helpers which are recorded as a single call, because the COM
+# method they wrap fills in a pointer passed by the caller.
+RECORDED_HELPERS = frozenset(["get_at"])
+_IUNKNOWN_METHODS = frozenset(["QueryInterface", "AddRef", "Release"])
+
+# Exceptions which are re-raised with their original type during replay.
+_REPLAYABLE_ERRORS = {
+    e.__name__: e for e in (OSError, NotImplementedError, TypeError, IndexError, ValueError)
+}
+
+
+class ReplayError(Exception):
+    """Raised when a replayed workload makes a call which does not match the trace."""
+
+
+@functools.lru_cache(maxsize=None)
+def _com_methods(cls: type) -> Optional[frozenset]:
+    """The COM methods declared by `cls`, or None if it isn't an interface."""
+    names = set()
+    declared = False
+    for klass in cls.__mro__:
+        if "_methods_" in vars(klass):
+            declared = True
+            names.update(spec[1] for spec in vars(klass)["_methods_"])
+    return frozenset(names - _IUNKNOWN_METHODS) if declared else None
+
+
+def _is_recorded(cls: Optional[type], name: str) -> bool:
+    """Whether calling `name` on an instance of `cls` is recorded, rather than run in Python."""
+    if name in RECORDED_HELPERS:
+        return True
+    methods = None if cls is None else _com_methods(getattr(cls, "__com_interface__", cls))
+    if methods is None:
+        return name[:1].isupper()
+    return name in methods
+
+
+def _interface_name(obj: Any) -> str:
+    cls = type(obj)
+    return getattr(cls, "__com_interface__", cls).__name__
+
+
+def _is_com_pointer(value: Any) -> bool:
+    return isinstance(value, c_void_p) and hasattr(type(value), "_iid_")
+
+
+def _byref_target(value: Any) -> Optional[Any]:
+    """The ctypes object behind a `byref` argument, which the callee may write to."""
+    return getattr(value, "_obj", None) if type(value).__name__ == "CArgObject" else None
+
+
+def _encode_arg(value: Any) -> Any:
+    """Encode an argument. Pointers which came from the trace are referred to
+    by id, and other objects which can't be compared between runs by type."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    trace_id = getattr(value, "_trace_id", None)
+    if trace_id is not None:
+        return {"o": trace_id}
+    if isinstance(value, type):
+        return {"c": value.__name__}
+    if isinstance(value, (tuple, list)):
+        return [_encode_arg(v) for v in value]
+    name = type(value).__name__
+    if name == "GUID":
+        return {"g": str(value)}
+    if name == "HSTRING":
+        return {"s": str(value)}
+    if getattr(type(value), "_type_", None) is c_wchar:
+        return {"w": wstring_at(value) if value else None}
+    if _is_com_pointer(value):
+        return {"t": name}
+    if isinstance(value, ctypes._SimpleCData):
+        return _encode_arg(value.value)
+    target = _byref_target(value)
+    if target is not None:
+        return {"ref": type(target).__name__}
+    return {"t": name}
+
+
+def _unwrap(value: Any) -> Any:
+    return getattr(value, "__wrapped__", value) if isinstance(value, _RecordingProxy) else value
+
+
+class _RecordingProxy():
+    """Stands in for an interface pointer, recording each COM method called through it."""
+
+    def __init__(self, recorder: "TraceRecorder", target: Any, trace_id: int):
+        self.__wrapped__ = target
+        self._recorder = recorder
+        self._trace_id = trace_id
+        self._interface = _interface_name(target)
+
+    def __getattr__(self, name: str) -> Any:
+        target = self.__wrapped__
+        if _is_recorded(type(target), name):
+            return functools.partial(self._recorder.call, self, name, getattr(target, name))
+        helper = getattr(type(target), name, None)
+        if isinstance(helper, types.FunctionType):
+            # Bind helpers like `iter` to the proxy so the calls they make are recorded
+            return helper.__get__(self)
+        return getattr(target, name)
+
+    def __bool__(self) -> bool:
+        return bool(self.__wrapped__)
+
+    def __repr__(self) -> str:
+        return f"<recorded {self._interface} #{self._trace_id}>"
+
+
+class TraceRecorder():
+    """Writes every COM call made through the managers it wraps to `path`.
+
+    Args:
+        path (str): File to write the trace to.
+        backend (Callable, optional): The backend whose managers are recorded. Defaults to the active backend.
+    """
+
+    def __init__(self, path: str, backend: Optional[Callable[["utils.Managers"], None]] = None):
+        from pyvda import utils
+        build.detect()
+        self._file = open(path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._next_root = 0
+        self._inner = backend or utils.get_backend()
+        self.calls = 0
+        winver = sys.getwindowsversion() if sys.platform == "win32" else None  # type: ignore
+        self._write({
+            "format": FORMAT_VERSION,
+            "pyvda": __version__,
+            "windows": f"{winver.major}.{winver.minor}.{winver.build}" if winver else None,
+            "build": {flag: getattr(build, flag) for flag in build.FLAGS},
+        })
+
+    def _write(self, record: Dict[str, Any]):
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + "\n")
+
+    def _wrap(self, target: Any) -> _RecordingProxy:
+        with self._lock:
+            trace_id = self._next_id
+            self._next_id += 1
+        return _RecordingProxy(self, target, trace_id)
+
+    def _encode_result(self, value: Any) -> Tuple[Any, Any]:
+        """Encode a call result. Returned objects which aren't plain values are
+        wrapped, so that the calls made on them are recorded too."""
+        if isinstance(value, tuple):
+            pairs = [self._encode_result(v) for v in value]
+            return [p[0] for p in pairs], tuple(p[1] for p in pairs)
+        if _is_com_pointer(value) and not value:
+            return None, value
+        encoded = _encode_arg(value)
+        if isinstance(encoded, dict) and ("t" in encoded or "ref" in encoded):
+            proxy = self._wrap(value)
+            return {"o": proxy._trace_id, "i": proxy._interface}, proxy
+        return encoded, value
+
+    def backend(self, managers: "utils.Managers"):
+        """A backend for `utils.set_backend` which records the wrapped backend's managers."""
+        self._inner(managers)
+        with self._lock:
+            root = self._next_root
+            self._next_root += 1
+        for slot in MANAGER_SLOTS:
+            target = getattr(managers, slot)
+            if target is None:
+                self._write({"n": root, "root": slot, "o": None})
+                continue
+            proxy = self._wrap(target)
+            self._write({"n": root, "root": slot, "o": proxy._trace_id, "i": proxy._interface})
+            setattr(managers, slot, proxy)
+
+    def call(self, proxy: _RecordingProxy, name: str, method: Callable, *args, **kwargs) -> Any:
+        record: Dict[str, Any] = {
+            "o": proxy._trace_id,
+            "i": proxy._interface,
+            "m": name,
+            "a": [_encode_arg(a) for a in args],
+        }
+        if kwargs:
+            record["k"] = {k: _encode_arg(v) for k, v in kwargs.items()}
+        args = tuple(_unwrap(a) for a in args)
+        kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
+        buffers = {i: t for i, t in enumerate(map(_byref_target, args)) if t is not None}
+
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except COMError as e:
+            record["hr"] = e.hresult
+            record["x"] = e.text
+            raise
+        except Exception as e:
+            record["err"] = type(e).__name__
+            record["x"] = str(e)
+            raise
+        else:
+            record["r"], result = self._encode_result(result)
+            if buffers:
+                record["out"] = {str(i): ctypes.string_at(ctypes.addressof(t), ctypes.sizeof(t)).hex() for i, t in buffers.items()}
+            return result
+        finally:
+            record["d"] = round((time.perf_counter() - start) * 1e6, 1)
+            self.calls += 1
+            self._write(record)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class _ReplayObject():
+    """Stands in for a recorded interface pointer, answering calls from the trace."""
+
+    def __init__(self, player: "ReplayBackend", trace_id: int, interface: str):
+        self._player = player
+        self._trace_id = trace_id
+        self._interface = interface
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        cls = _interface_class(self._interface)
+        if not _is_recorded(cls, name):
+            helper = getattr(cls, name, None)
+            if isinstance(helper, types.FunctionType):
+                return helper.__get__(self)
+            raise AttributeError(f"{self._interface} has no attribute {name!r}")
+        return functools.partial(self._player.serve, self, name)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return f"<replayed {self._interface} #{self._trace_id}>"
+
+
+@functools.lru_cache(maxsize=None)
+def _interface_class(name: str) -> Optional[type]:
+    # Imported here so that the interfaces are declared with the trace's build features
+    from pyvda import com_base, com_defns
+    return getattr(com_defns, name, None) or getattr(com_base, name, None)
+
+
+class ReplayBackend():
+    """Serves the calls recorded in a trace in place of the shell.
+
+    Calls are matched per interface pointer, in the order they were recorded,
+    so workloads which spread calls across threads replay deterministically as
+    long as each thread repeats its own sequence.
+
+    Args:
+        path (str): Trace file written by `TraceRecorder`.
+        realtime (bool, optional): Sleep for each call's recorded duration, so that profiles reflect the original COM latency. Defaults to False.
+    """
+
+    def __init__(self, path: str, realtime: bool = False):
+        self.realtime = realtime
+        self._lock = threading.Lock()
+        self._objects: Dict[int, _ReplayObject] = {}
+        self._calls: Dict[int, Deque[Dict[str, Any]]] = {}
+        self._roots: Deque[List[Dict[str, Any]]] = deque()
+        with open(path, encoding="utf-8") as f:
+            self.header = json.loads(f.readline())
+            if self.header.get("format") != FORMAT_VERSION:
+                raise ReplayError(f"Unsupported trace format {self.header.get('format')}")
+            roots: Dict[int, List[Dict[str, Any]]] = {}
+            for line in f:
+                record = json.loads(line)
+                if "root" in record:
+                    roots.setdefault(record["n"], []).append(record)
+                else:
+                    self._calls.setdefault(record["o"], deque()).append(record)
+        self._roots.extend(roots[n] for n in sorted(roots))
+
+    @property
+    def build_flags(self) -> Dict[str, bool]:
+        """The feature detection results of the recording machine."""
+        return self.header["build"]
+
+    def remaining(self) -> int:
+        """Number of recorded calls which have not been served yet."""
+        return sum(len(q) for q in self._calls.values())
+
+    def _object(self, trace_id: int, interface: str) -> _ReplayObject:
+        obj = self._objects.get(trace_id)
+        if obj is None:
+            obj = self._objects[trace_id] = _ReplayObject(self, trace_id, interface)
+        return obj
+
+    def _decode(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return tuple(self._decode(v) for v in value)
+        if not isinstance(value, dict):
+            return value
+        if "o" in value:
+            return self._object(value["o"], value["i"])
+        if "g" in value:
+            return GUID(value["g"])
+        if "s" in value:
+            return value["s"]
+        if "w" in value:
+            return value["w"]
+        raise ReplayError(f"Can't replay the recorded value {value}")
+
+    def __call__(self, managers: "utils.Managers"):
+        with self._lock:
+            if not self._roots:
+                raise ReplayError("The trace has no more recorded manager initialisations")
+            group = self._roots.popleft()
+        for record in group:
+            value = None if record["o"] is None else self._object(record["o"], record["i"])
+            setattr(managers, record["root"], value)
+
+    def serve(self, obj: _ReplayObject, name: str, *args, **kwargs) -> Any:
+        encoded = [_encode_arg(a) for a in args]
+        encoded_kwargs = {k: _encode_arg(v) for k, v in kwargs.items()}
+        with self._lock:
+            queue = self._calls.get(obj._trace_id)
+            if not queue:
+                raise ReplayError(f"No recorded call left for {obj._interface}.{name}")
+            record = queue[0]
+            if record["m"] != name or record["a"] != encoded or record.get("k", {}) != encoded_kwargs:
+                raise ReplayError(
+                    f"Expected {obj._interface}.{record['m']}({record['a']}), got {name}({encoded})"
+                )
+            queue.popleft()
+
+        if self.realtime:
+            time.sleep(record["d"] / 1e6)
+        if "hr" in record:
+            raise COMError(record["hr"], record.get("x"), None)
+        if "err" in record:
+            error = _REPLAYABLE_ERRORS.get(record["err"], RuntimeError)
+            raise error(record.get("x"))
+        for i, data in record.get("out", {}).items():
+            target = _byref_target(args[int(i)])
+            if target is not None:
+                ctypes.memmove(ctypes.addressof(target), bytes.fromhex(data), ctypes.sizeof(target))
+        return self._decode(record["r"])
+
+
+def _clear_managers():
+    # The managers are populated from the backend when next used
+    from pyvda.pyvda import managers
+    managers.clear()
+
+
+@contextmanager
+def record(path: str) -> Iterator[TraceRecorder]:
+    """Record every COM call made by pyvda on the current thread, and any
+    thread which initialises its managers inside the block, to `path`.
+
+    Args:
+        path (str): File to write the trace to.
+    """
+    from pyvda import utils
+    recorder = TraceRecorder(path)
+    previous = utils.get_backend()
+    utils.set_backend(recorder.backend)
+    try:
+        _clear_managers()
+        yield recorder
+    finally:
+        utils.set_backend(previous)
+        recorder.close()
+        _clear_managers()
+
+
+@contextmanager
+def replay(path: str, realtime: bool = False) -> Iterator[ReplayBackend]:
+    """Serve pyvda's COM calls from the trace at `path` instead of the shell.
+
+    If pyvda hasn't detected this machine's features yet, the recording
+    machine's feature flags are applied, and stay applied afterwards since
+    the interfaces are declared with them from then on. Otherwise the flags
+    already in use must match the trace's, and are left as they were.
+
+    Args:
+        path (str): Trace file written by `record`.
+        realtime (bool, optional): Reproduce the recorded call durations. Defaults to False.
+
+    Raises:
+        ReplayError: The flags have already been detected, and differ from the recording machine's.
+    """
+    player = ReplayBackend(path, realtime)
+    detected = build.is_detected()
+    saved_flags = {flag: getattr(build, flag) for flag in build.FLAGS}
+    if detected:
+        differing = [
+            flag for flag in build.FLAGS
+            if flag in player.build_flags and bool(player.build_flags[flag]) != saved_flags[flag]
+        ]
+        if differing:
+            raise ReplayError(
+                f"The trace was recorded with different feature flags ({', '.join(differing)}) "
+                "from those pyvda's interfaces were declared with. Start the replay before "
+                "importing anything from pyvda which talks to the shell, e.g. in a new process."
+            )
+    build.set_flags(player.build_flags)
+    from pyvda import utils
+    previous = utils.get_backend()
+    utils.set_backend(player)
+    try:
+        _clear_managers()
+        yield player
+    finally:
+        utils.set_backend(previous)
+        if detected:
+            build.set_flags(saved_flags)
+        _clear_managers()
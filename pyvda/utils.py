@@ -1,13 +1,11 @@
 import logging
 import sys
 import threading
-from ctypes import POINTER
-from typing import Optional
+from ctypes import POINTER, wstring_at
+from typing import Any, Callable, Dict, NamedTuple, Optional
 
-import _ctypes
-from comtypes import CLSCTX_LOCAL_SERVER, CoCreateInstance, CoInitializeEx
-
-from pyvda.com_base import IServiceProvider
+from pyvda.adapters import select_adapter
+from pyvda.com_base import IGlobalInterfaceTable, IServiceProvider
 from pyvda.com_defns import (
     CLSID_ImmersiveShell,
     CLSID_VirtualDesktopManagerInternal,
@@ -17,6 +15,9 @@ from pyvda.com_defns import (
     IVirtualDesktopManagerInternal2,
     IVirtualDesktopPinnedApps,
 )
+from pyvda.compat import CLSCTX_INPROC_SERVER, CLSCTX_LOCAL_SERVER, COMError, CoCreateInstance, CoInitializeEx
+from pyvda.const import CLSID_StdGlobalInterfaceTable
+from pyvda.view_cache import ViewCache
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,7 @@ def _get_object(cls, clsid = None):
             cls._iid_,
             pObject,
         )
-    except _ctypes.COMError as e:
+    except COMError as e:
         winver = sys.getwindowsversion()
         platver = sys.getwindowsversion().platform_version
         raise NotImplementedError(
@@ -40,6 +41,12 @@ def _get_object(cls, clsid = None):
         )
     return pObject
 
+def wstr(value: Any) -> Optional[str]:
+    """Convert a wide string returned from a COM method (e.g. an app ID) to `str`."""
+    if value is None or isinstance(value, str):
+        return value
+    return wstring_at(value) if value else None
+
 def get_vd_manager_internal() -> "IVirtualDesktopManagerInternal2":
     return _get_object(IVirtualDesktopManagerInternal, CLSID_VirtualDesktopManagerInternal)
 
@@ -55,13 +62,155 @@ def get_view_collection() -> "IApplicationViewCollection":
 def get_pinned_apps() -> "IVirtualDesktopPinnedApps":
     return _get_object(IVirtualDesktopPinnedApps, CLSID_VirtualDesktopPinnedApps)
 
+def com_backend(managers: "Managers"):
+    """The default backend. Populates `managers` with interfaces acquired from the running shell."""
+    Managers.try_init_com()
+    managers.manager_internal = get_vd_manager_internal()
+    managers.view_collection = get_view_collection()
+    managers.pinned_apps = get_pinned_apps()
+    managers.manager_internal2 = get_vd_manager_internal2()
+
+_backend: Callable[["Managers"], None] = com_backend
+
+def get_backend() -> Callable[["Managers"], None]:
+    return _backend
+
+def set_backend(backend: Optional[Callable[["Managers"], None]] = None):
+    """Replace the function used to populate each thread's `Managers`.
+
+    Threads which have already initialised their managers keep them until
+    `Managers.reset` or `Managers.clear` is called from that thread. Managers
+    shared with `share_managers` are no longer handed out.
+
+    Args:
+        backend (Callable, optional): Called with the `Managers` instance to populate. Defaults to `com_backend`.
+    """
+    global _backend
+    _backend = backend or com_backend
+    unshare_managers()
+
+def _global_interface_table() -> "IGlobalInterfaceTable":
+    return CoCreateInstance(CLSID_StdGlobalInterfaceTable, IGlobalInterfaceTable, CLSCTX_INPROC_SERVER)
+
+# The interface each manager is shared as
+_SHARED_SLOTS = {
+    "manager_internal": IVirtualDesktopManagerInternal,
+    "view_collection": IApplicationViewCollection,
+    "pinned_apps": IVirtualDesktopPinnedApps,
+    "manager_internal2": IVirtualDesktopManagerInternal2,
+}
+
+class _Shared(NamedTuple):
+    # The backend the managers were populated by
+    backend: Callable[["Managers"], None]
+    table: Any
+    # Global interface table cookie for each manager which was acquired
+    cookies: Dict[str, int]
+
+_shared: Optional[_Shared] = None
+_shared_lock = threading.Lock()
+
+def share_managers(managers: "Managers"):
+    """Register the calling thread's managers in the process's global interface
+    table, so that other threads' `Managers` are unmarshalled from it instead of
+    being acquired from the shell again.
+
+    The managers are proxies to explorer, so the threads using them talk to
+    explorer directly and the calling thread needn't outlive them. Sharing is
+    dropped when the backend is changed with `set_backend`, or by `unshare_managers`.
+
+    Args:
+        managers (Managers): The calling thread's managers.
+    """
+    global _shared
+    backend = _backend
+    table = _global_interface_table()
+    cookies: Dict[str, int] = {}
+    try:
+        for name, cls in _SHARED_SLOTS.items():
+            obj = getattr(managers, name)
+            if obj is not None:
+                cookies[name] = table.RegisterInterfaceInGlobal(obj, cls._iid_) # type: ignore
+    except BaseException:
+        _revoke(_Shared(backend, table, cookies))
+        raise
+    with _shared_lock:
+        previous, _shared = _shared, _Shared(backend, table, cookies)
+    if previous is not None:
+        _revoke(previous)
+
+def unshare_managers():
+    """Stop handing out the managers registered by `share_managers`."""
+    global _shared
+    with _shared_lock:
+        previous, _shared = _shared, None
+    if previous is not None:
+        _revoke(previous)
+
+def _revoke(shared: _Shared):
+    for cookie in shared.cookies.values():
+        try:
+            shared.table.RevokeInterfaceFromGlobal(cookie) # type: ignore
+        except (COMError, OSError) as e:
+            logger.warning("Failed to revoke shared manager: %s", str(e))
+
+def _populate_shared(managers: "Managers") -> bool:
+    # Populate `managers` from the global interface table, if the current backend's managers were shared
+    shared = _shared
+    if shared is None or shared.backend != _backend:
+        return False
+    if shared.backend == com_backend:
+        Managers.try_init_com()
+    try:
+        for name, cls in _SHARED_SLOTS.items():
+            cookie = shared.cookies.get(name)
+            obj = None
+            if cookie is not None:
+                obj = shared.table.GetInterfaceFromGlobal(cookie, cls._iid_).QueryInterface(cls) # type: ignore
+            setattr(managers, name, obj)
+    except (COMError, OSError) as e:
+        logger.warning("Failed to use shared managers, acquiring them again: %s", str(e))
+        return False
+    return True
+
 class Managers(threading.local):
+    """Each thread's manager interfaces, and the adapter bound to them.
+
+    They are populated from the backend on the thread's first use, so a
+    backend installed with `set_backend` before then is used from the start.
+    If another thread has shared its managers with `share_managers`, they are
+    unmarshalled from the global interface table instead.
+    """
+    # Maximum size of each thread's view cache, off by default
+    view_cache_size = 0
+
     def __init__(self):
-        self.try_init_com()
-        self.manager_internal = get_vd_manager_internal()
-        self.view_collection = get_view_collection()
-        self.pinned_apps = get_pinned_apps()
-        self.manager_internal2 = get_vd_manager_internal2()
+        self._populated = False
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes which aren't set, i.e. before this thread's managers are populated
+        if name.startswith("_") or self._populated:
+            raise AttributeError(name)
+        self.reset()
+        return getattr(self, name)
+
+    def reset(self):
+        """Re-populate this thread's managers from the current backend, and bind
+        the adapter for this Windows build to them. Cached views are dropped."""
+        self._populated = True
+        try:
+            if not _populate_shared(self):
+                _backend(self)
+            self.adapter = select_adapter()(self.manager_internal, self.manager_internal2, self.view_collection)
+            self.view_cache = ViewCache(self.adapter.get_view_for_hwnd, Managers.view_cache_size)
+        except BaseException:
+            self.clear()
+            raise
+
+    def clear(self):
+        """Drop this thread's managers, so that they are populated from the backend again when next used."""
+        self.__dict__.clear()
+        self._populated = False
 
     @staticmethod
     def try_init_com():
@@ -0,0 +1,120 @@
+"""
+A per-thread cache of `IApplicationView` pointers, keyed by window handle.
+
+`AppView(hwnd)` otherwise costs a cross-process `GetViewForHwnd` call every
+time. Entries are validated with `GetWindowThreadProcessId`, which is local
+to the calling process: a handle which no longer names a window, or which has
+been reused by a window on a different thread, is treated as a miss.
+
+That check can't tell when a handle is reused by the same thread, or when the
+shell gives a window a new view without its handle changing, e.g. when it is
+hidden and shown again. So the cache is off unless enabled with
+`pyvda.set_view_cache_size`, and code which enables it and tracks window
+events should call `invalidate` from its `EVENT_OBJECT_DESTROY`/
+`EVENT_OBJECT_HIDE` handlers.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from pyvda.arena import untrack
+from pyvda.compat import windll
+
+DEFAULT_MAXSIZE = 256
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    maxsize: int
+
+
+def _window_thread(hwnd: int) -> int:
+    """The ID of the thread which created the window, or 0 if `hwnd` is not a window."""
+    return windll.user32.GetWindowThreadProcessId(hwnd, None)
+
+
+class ViewCache():
+    """A bounded LRU mapping of window handle to `IApplicationView`.
+
+    COM pointers belong to the apartment they were acquired in, so each
+    thread's `Managers` has its own cache and no locking is needed. The cache
+    holds the only reference it adds to each pointer, so an evicted pointer is
+    released as soon as no `AppView` is still using it.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[int], Any],
+        maxsize: int = DEFAULT_MAXSIZE,
+        window_thread: Callable[[int], int] = _window_thread,
+    ):
+        """
+        Args:
+            lookup (Callable): Fetches the view for a handle on a miss, e.g. the adapter's `get_view_for_hwnd`.
+            maxsize (int, optional): Maximum number of views to hold. 0 disables caching. Defaults to `DEFAULT_MAXSIZE`.
+            window_thread (Callable, optional): Returns the creating thread of a window, or 0 if it doesn't exist.
+        """
+        self._lookup = lookup
+        self._window_thread = window_thread
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, Tuple[Any, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, hwnd: int) -> Any:
+        """
+        Args:
+            hwnd (int): Handle to a window.
+
+        Returns:
+            IApplicationView: The view for the window.
+        """
+        if self.maxsize <= 0:
+            self.misses += 1
+            return self._lookup(hwnd)
+        entry = self._entries.get(hwnd)
+        thread = self._window_thread(hwnd)
+        if entry is not None:
+            if entry[1] == thread and thread:
+                self._entries.move_to_end(hwnd)
+                self.hits += 1
+                return entry[0]
+            del self._entries[hwnd]
+            self.invalidations += 1
+        self.misses += 1
+        view = self._lookup(hwnd)
+        if thread:
+            # Kept beyond any `Arena` the view was looked up in
+            untrack(view)
+            self._entries[hwnd] = (view, thread)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return view
+
+    def resize(self, maxsize: int):
+        """Change the maximum number of views held, evicting the least recently used ones if needed."""
+        self.maxsize = maxsize
+        while len(self._entries) > max(maxsize, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, hwnd: Optional[int] = None):
+        """Drop the cached view for a window, or for every window if `hwnd` is `None`."""
+        if hwnd is None:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+        elif self._entries.pop(hwnd, None) is not None:
+            self.invalidations += 1
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, self.invalidations, len(self._entries), self.maxsize)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
@@ -26,6 +26,8 @@
 import ctypes
 import weakref
 
+from pyvda.compat import windll
+
 E_FAIL = -2147467259  # 0x80004005L
 E_NOTIMPL = -2147467263  # 0x80004001L
 E_NOINTERFACE = -2147467262  # 0x80004002L
@@ -47,7 +49,7 @@ def check_hresult(hr):
     return hr
 
 
-combase = ctypes.windll.LoadLibrary("combase.dll")
+combase = windll.LoadLibrary("combase.dll")
 WindowsCreateString = combase.WindowsCreateString
 WindowsCreateString.argtypes = (ctypes.c_void_p, ctypes.c_uint32, ctypes.POINTER(ctypes.c_void_p))
 WindowsCreateString.restype = check_hresult
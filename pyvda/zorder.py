@@ -0,0 +1,115 @@
+"""
+Capture the stacking order of windows and restore it later without
+activating them, e.g. after moving them between desktops:
+
+.. code:: python
+
+    order = capture_z_order()
+    for view in views:
+        view.move(VirtualDesktop(2))
+    restore_z_order(order, desktop=VirtualDesktop(2))
+
+Rather than raising every window in turn, the restore only moves the
+windows which are out of place: it keeps the longest run of windows which
+are already in the right relative order and slots each of the others in
+below its neighbour, all in one `DeferWindowPos` batch.
+"""
+import bisect
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pyvda.geometry import WindowBatch, _views_on
+from pyvda.pyvda import VirtualDesktop
+
+HWND_TOP = 0
+
+
+def capture_z_order(
+    desktop: Optional[VirtualDesktop] = None,
+    include_pinned: bool = True,
+    switcher_windows: bool = True,
+) -> List[int]:
+    """The handles of the windows on a desktop, from a single `GetViewsByZOrder` call.
+
+    Args:
+        desktop (VirtualDesktop, optional): Desktop to capture. Defaults to the current desktop.
+        include_pinned (bool, optional): Include pinned windows. Defaults to True.
+        switcher_windows (bool, optional): Only include windows which appear in the alt-tab dialogue. Defaults to True.
+
+    Returns:
+        List[int]: Window handles, with the foreground window first.
+    """
+    return [view.GetThumbnailWindow() for view in _views_on(desktop, include_pinned, switcher_windows)]
+
+
+def _longest_increasing(values: Sequence[int]) -> List[int]:
+    """Indices of a longest strictly increasing subsequence of `values`."""
+    # tails[k] is the index of the smallest value ending an increasing run of length k + 1
+    tails: List[int] = []
+    tail_values: List[int] = []
+    previous: List[int] = [-1] * len(values)
+    for i, value in enumerate(values):
+        k = bisect.bisect_left(tail_values, value)
+        if k:
+            previous[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+    result = []
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        result.append(i)
+        i = previous[i]
+    return result[::-1]
+
+
+def z_order_moves(current: Sequence[int], target: Sequence[int]) -> List[Tuple[int, int]]:
+    """The fewest reorderings which put the windows in `current` into the order of `target`.
+
+    Windows which only appear in one of the lists are ignored.
+
+    Args:
+        current (Sequence[int]): Window handles in their current order, foreground first.
+        target (Sequence[int]): Window handles in the wanted order, foreground first.
+
+    Returns:
+        List[Tuple[int, int]]: `(hwnd, insert_after)` pairs, to be applied in order. `insert_after` is `HWND_TOP` for the window which should be in front.
+    """
+    present = set(current)
+    target = [hwnd for hwnd in target if hwnd in present]
+    rank: Dict[int, int] = {hwnd: i for i, hwnd in enumerate(target)}
+    in_target = [hwnd for hwnd in current if hwnd in rank]
+    keep = {in_target[i] for i in _longest_increasing([rank[hwnd] for hwnd in in_target])}
+    moves = []
+    for i, hwnd in enumerate(target):
+        if hwnd not in keep:
+            # Windows above this one have already been placed
+            moves.append((hwnd, target[i - 1] if i else HWND_TOP))
+    return moves
+
+
+def restore_z_order(
+    order: Sequence[int],
+    desktop: Optional[VirtualDesktop] = None,
+    current: Optional[Sequence[int]] = None,
+) -> int:
+    """Put windows back into a captured stacking order, without activating any of them.
+
+    Args:
+        order (Sequence[int]): Window handles, foreground first, as from `capture_z_order`.
+        desktop (VirtualDesktop, optional): Desktop the windows are on now. Defaults to the current desktop.
+        current (Sequence[int], optional): The current order of the windows, if already known. Defaults to capturing it.
+
+    Returns:
+        int: The number of windows which had to be moved.
+    """
+    if current is None:
+        current = capture_z_order(desktop, switcher_windows=False)
+    moves = z_order_moves(current, order)
+    batch = WindowBatch()
+    for hwnd, after in moves:
+        batch.insert_after(hwnd, after)
+    batch.apply()
+    return len(moves)
@@ -22,6 +22,7 @@ setup(
     long_description_content_type='text/markdown',
     packages=find_packages(exclude=("tests", "tests.*")),
     install_requires=["pywin32", "comtypes"],
+    entry_points={"console_scripts": ["pyvda = pyvda.cli:main"]},
     classifiers=[
                    "Environment :: Win32 (MS Windows)",
                    "License :: OSI Approved :: MIT License",
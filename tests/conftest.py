@@ -0,0 +1,25 @@
+import pytest
+
+from pyvda import utils
+from pyvda.pyvda import managers
+
+from fakes import FakeShell
+
+
+@pytest.fixture
+def desktops():
+    """Number of desktops the `shell` fixture starts with. Override in a module to change it."""
+    return 3
+
+
+@pytest.fixture
+def shell(desktops):
+    """A `FakeShell` installed as the backend for the test. Afterwards the
+    managers are dropped rather than re-populated, so that the real shell isn't
+    touched."""
+    shell = FakeShell(desktops=desktops)
+    utils.set_backend(shell.backend)
+    managers.clear()
+    yield shell
+    utils.set_backend()
+    managers.clear()
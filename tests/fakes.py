@@ -0,0 +1,374 @@
+"""
+An in-memory stand-in for the shell's virtual desktop interfaces, for tests
+which exercise pyvda's own logic without a running explorer. Each fake names
+the interface it stands in for in `__com_interface__`, which `pyvda.trace`
+records it as.
+"""
+import itertools
+import uuid
+from collections import Counter
+
+from pyvda.arena import track
+from pyvda.com_base import IGlobalInterfaceTable, IObjectArray
+from pyvda.com_defns import (
+    IApplicationView,
+    IApplicationViewCollection,
+    IVirtualDesktop,
+    IVirtualDesktopManagerInternal,
+    IVirtualDesktopPinnedApps,
+)
+from pyvda.compat import GUID, COMError
+
+E_INVALIDARG = -2147024809
+E_ELEMENT_NOT_FOUND = -2147023728
+
+
+def handout(obj):
+    """Like a COM method returning an interface pointer, adds a reference for the caller."""
+    obj.AddRef()
+    return obj
+
+
+class FakeArray():
+    __com_interface__ = IObjectArray
+
+    def __init__(self, shell, items):
+        self._shell = shell
+        self._items = list(items)
+        self.refs = 1
+
+    def GetCount(self):
+        self._shell.count("GetCount")
+        return len(self._items)
+
+    def get_at(self, i, cls):
+        # Like GetAt, hands out a new reference
+        self._shell.count("GetAt")
+        if not 0 <= i < len(self._items):
+            raise COMError(E_INVALIDARG, "The parameter is incorrect.", None)
+        item = self._items[i]
+        item.AddRef()
+        return track(item)
+
+    def iter(self, cls):
+        for i in range(self.GetCount()):
+            yield self.get_at(i, cls)
+
+    def AddRef(self):
+        self.refs += 1
+        return self.refs
+
+    def Release(self):
+        self.refs -= 1
+        return self.refs
+
+
+class FakeDesktop():
+    __com_interface__ = IVirtualDesktop
+
+    def __init__(self, shell, name=""):
+        self._shell = shell
+        self.id = GUID("{%s}" % uuid.uuid4())
+        self.name = name
+        self.wallpaper = ""
+        self.refs = 1
+
+    def GetID(self):
+        self._shell.count("GetID")
+        return self.id
+
+    def GetName(self):
+        self._shell.count("GetName")
+        return self.name
+
+    def GetWallpaperPath(self):
+        self._shell.count("GetWallpaperPath")
+        return self.wallpaper
+
+    def AddRef(self):
+        self.refs += 1
+        return self.refs
+
+    def Release(self):
+        self.refs -= 1
+        return self.refs
+
+
+class FakeView():
+    __com_interface__ = IApplicationView
+
+    def __init__(self, shell, hwnd, app_id, desktop, switcher=True):
+        self._shell = shell
+        self.hwnd = hwnd
+        self.app_id = app_id
+        self.desktop = desktop
+        self.switcher = switcher
+        self.timestamp = 0
+        self.frame = (0, 0, 800, 600)
+        self.owner = None
+        self.cloaked = False
+        self.refs = 1
+
+    def GetThumbnailWindow(self):
+        self._shell.count("GetThumbnailWindow")
+        return self.hwnd
+
+    def GetAppUserModelId(self):
+        self._shell.count("GetAppUserModelId")
+        return self.app_id
+
+    def GetShowInSwitchers(self):
+        self._shell.count("GetShowInSwitchers")
+        return int(self.switcher)
+
+    def GetVisibility(self):
+        self._shell.count("GetVisibility")
+        return 1
+
+    def GetExtendedFramePosition(self, rect):
+        self._shell.count("GetExtendedFramePosition")
+        rect._obj.left, rect._obj.top, rect._obj.right, rect._obj.bottom = self.frame
+
+    def SetCloak(self, cloak_type, flags):
+        self._shell.count("SetCloak")
+        if self not in self._shell.views:
+            raise COMError(E_ELEMENT_NOT_FOUND, "Element not found.", None)
+        self.cloaked = bool(flags)
+
+    def GetRootSwitchableOwner(self):
+        self._shell.count("GetRootSwitchableOwner")
+        root = self
+        while root.owner is not None:
+            root = root.owner
+        return handout(root)
+
+    def GetLastActivationTimestamp(self):
+        self._shell.count("GetLastActivationTimestamp")
+        return self.timestamp
+
+    def GetVirtualDesktopId(self):
+        self._shell.count("GetVirtualDesktopId")
+        return self.desktop.id
+
+    def SetFocus(self):
+        self._shell.count("SetFocus")
+        self._shell.activate(self)
+
+    def SwitchTo(self):
+        self._shell.count("SwitchTo")
+        self._shell.activate(self)
+
+    def AddRef(self):
+        self.refs += 1
+        return self.refs
+
+    def Release(self):
+        self.refs -= 1
+        return self.refs
+
+
+class FakeManager():
+    __com_interface__ = IVirtualDesktopManagerInternal
+
+    def __init__(self, shell):
+        self._shell = shell
+
+    def GetCount(self, *monitor):
+        self._shell.count("GetCount")
+        return len(self._shell.desktops)
+
+    def GetDesktops(self, *monitor):
+        self._shell.count("GetDesktops")
+        return FakeArray(self._shell, self._shell.desktops)
+
+    def GetCurrentDesktop(self, *monitor):
+        self._shell.count("GetCurrentDesktop")
+        return handout(self._shell.current)
+
+    def CreateDesktopW(self, *monitor):
+        self._shell.count("CreateDesktopW")
+        return handout(self._shell.add_desktop())
+
+    def SwitchDesktop(self, *args):
+        self._shell.count("SwitchDesktop")
+        self._shell.switch(args[-1])
+
+    def SwitchDesktopAndMoveForegroundView(self, desktop):
+        self._shell.count("SwitchDesktopAndMoveForegroundView")
+        if self._shell.views:
+            self._shell.views[0].desktop = desktop
+        self._shell.switch(desktop)
+
+    def GetLastActiveDesktop(self):
+        self._shell.count("GetLastActiveDesktop")
+        return handout(self._shell.last_active or self._shell.current)
+
+    def RemoveDesktop(self, desktop, fallback):
+        self._shell.count("RemoveDesktop")
+        self._shell.desktops.remove(desktop)
+        for view in self._shell.views:
+            if view.desktop is desktop:
+                view.desktop = fallback
+        if self._shell.current is desktop:
+            self._shell.current = fallback
+
+    def FindDesktop(self, guid):
+        self._shell.count("FindDesktop")
+        for d in self._shell.desktops:
+            if d.id == guid:
+                return handout(d)
+        raise COMError(E_ELEMENT_NOT_FOUND, "Element not found.", None)
+
+    def MoveViewToDesktop(self, view, desktop):
+        self._shell.count("MoveViewToDesktop")
+        view.desktop = desktop
+
+    def SetName(self, desktop, name):
+        self._shell.count("SetName")
+        desktop.name = str(name)
+
+    def SetWallpaper(self, desktop, path):
+        self._shell.count("SetWallpaper")
+        desktop.wallpaper = str(path)
+
+    def SetWallpaperForAllDesktops(self, path):
+        self._shell.count("SetWallpaperForAllDesktops")
+        for d in self._shell.desktops:
+            d.wallpaper = str(path)
+
+
+class FakeViewCollection():
+    __com_interface__ = IApplicationViewCollection
+
+    def __init__(self, shell):
+        self._shell = shell
+
+    def GetViewsByZOrder(self):
+        self._shell.count("GetViewsByZOrder")
+        return FakeArray(self._shell, self._shell.views)
+
+    def GetViewForHwnd(self, hwnd):
+        self._shell.count("GetViewForHwnd")
+        for v in self._shell.views:
+            if v.hwnd == hwnd:
+                return handout(v)
+        raise COMError(E_ELEMENT_NOT_FOUND, "Element not found.", None)
+
+    def GetViewInFocus(self):
+        self._shell.count("GetViewInFocus")
+        return handout(self._shell.views[0])
+
+
+class FakePinnedApps():
+    __com_interface__ = IVirtualDesktopPinnedApps
+
+    def __init__(self, shell):
+        self._shell = shell
+
+    def IsAppIdPinned(self, app_id):
+        self._shell.count("IsAppIdPinned")
+        return app_id in self._shell.pinned_apps
+
+    def PinAppID(self, app_id):
+        self._shell.count("PinAppID")
+        self._shell.pinned_apps.add(app_id)
+
+    def UnpinAppID(self, app_id):
+        self._shell.count("UnpinAppID")
+        self._shell.pinned_apps.discard(app_id)
+
+    def IsViewPinned(self, view):
+        self._shell.count("IsViewPinned")
+        return view in self._shell.pinned_views
+
+    def PinView(self, view):
+        self._shell.count("PinView")
+        self._shell.pinned_views.append(view)
+
+    def UnpinView(self, view):
+        self._shell.count("UnpinView")
+        self._shell.pinned_views.remove(view)
+
+
+class FakeShell():
+    """Install with `utils.set_backend(shell.backend)` followed by
+    `managers.clear()`, or use the `shell` fixture from conftest.py.
+
+    Each fake records how many times each method was called in `calls`, and
+    views and desktops keep a reference count in `refs`.
+    """
+
+    def __init__(self, desktops=3):
+        self.calls = Counter()
+        self._hwnds = itertools.count(100)
+        self._clock = itertools.count(1)
+        self.desktops = []
+        self.views = []
+        self.pinned_apps = set()
+        self.pinned_views = []
+        for _ in range(desktops):
+            self.add_desktop()
+        self.current = self.desktops[0]
+        self.last_active = None
+
+    def count(self, name):
+        self.calls[name] += 1
+
+    def add_desktop(self, name=""):
+        desktop = FakeDesktop(self, name)
+        self.desktops.append(desktop)
+        return desktop
+
+    def add_view(self, app_id="app", desktop=None, switcher=True, owner=None):
+        view = FakeView(self, next(self._hwnds), app_id, desktop or self.current, switcher)
+        view.owner = owner
+        view.timestamp = next(self._clock)
+        self.views.insert(0, view)
+        return view
+
+    def switch(self, desktop):
+        if desktop is not self.current:
+            self.last_active = self.current
+            self.current = desktop
+
+    def activate(self, view):
+        view.timestamp = next(self._clock)
+        self.views.remove(view)
+        self.views.insert(0, view)
+
+    def backend(self, managers):
+        managers.manager_internal = FakeManager(self)
+        managers.view_collection = FakeViewCollection(self)
+        managers.pinned_apps = FakePinnedApps(self)
+        managers.manager_internal2 = None
+
+
+class FakeGlobalInterfaceTable():
+    """Hands registered objects back unchanged, rather than marshalling them."""
+    __com_interface__ = IGlobalInterfaceTable
+
+    def __init__(self):
+        self.entries = {}
+        self._cookies = itertools.count(1)
+
+    def RegisterInterfaceInGlobal(self, obj, iid):
+        cookie = next(self._cookies)
+        self.entries[cookie] = obj
+        return cookie
+
+    def RevokeInterfaceFromGlobal(self, cookie):
+        if self.entries.pop(cookie, None) is None:
+            raise COMError(E_INVALIDARG, "The parameter is incorrect.", None)
+
+    def GetInterfaceFromGlobal(self, cookie, iid):
+        if cookie not in self.entries:
+            raise COMError(E_INVALIDARG, "The parameter is incorrect.", None)
+        return _Unmarshalled(self.entries[cookie])
+
+
+class _Unmarshalled():
+    def __init__(self, obj):
+        self._obj = obj
+
+    def QueryInterface(self, interface):
+        return self._obj
@@ -0,0 +1,119 @@
+import pytest
+
+import pyvda.build as build
+from pyvda.adapters import ADAPTERS, Adapter20231, Adapter21313, Adapter22621, Adapter22631, Adapter26100, select_adapter
+from pyvda.arena import Arena
+
+HWND_ADAPTERS = [a for a in ADAPTERS if issubclass(a, Adapter20231) and not issubclass(a, Adapter22621)]
+NAMED_ADAPTERS = [a for a in ADAPTERS if issubclass(a, Adapter21313)]
+
+
+class FakeVtable():
+    """Records calls made to any method of the manager interfaces."""
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def method(*args):
+            self.calls.append((name, args))
+            return name
+        return method
+
+
+class FakeDesktop():
+    def GetName(self):
+        return "Desktop"
+
+    def GetWallpaperPath(self):
+        return "wallpaper.jpg"
+
+
+@pytest.mark.parametrize("adapter", ADAPTERS)
+def test_adapter_binds_manager_methods(adapter):
+    manager = FakeVtable()
+    a = adapter(manager)
+    hwnd = (0,) if adapter in HWND_ADAPTERS else ()
+
+    assert a.get_all_desktops() == "GetDesktops"
+    assert a.get_current_desktop() == "GetCurrentDesktop"
+    assert a.create_desktop() == "CreateDesktopW"
+    a.switch_desktop("target")
+    assert manager.calls == [
+        ("GetDesktops", hwnd),
+        ("GetCurrentDesktop", hwnd),
+        ("CreateDesktopW", hwnd),
+        ("SwitchDesktop", hwnd + ("target",)),
+    ]
+    if adapter is Adapter26100:
+        a.switch_desktop_and_move_foreground_view("target")
+        assert manager.calls[-1] == ("SwitchDesktopAndMoveForegroundView", ("target",))
+    else:
+        assert a.switch_desktop_and_move_foreground_view is None
+    if issubclass(adapter, Adapter22631):
+        assert a.get_last_active_desktop() == "GetLastActiveDesktop"
+    else:
+        assert a.get_last_active_desktop is None
+
+
+@pytest.mark.parametrize("adapter", ADAPTERS)
+def test_adapter_names_and_wallpapers(adapter):
+    manager = FakeVtable()
+    a = adapter(manager)
+    if adapter in NAMED_ADAPTERS:
+        assert a.get_name(FakeDesktop()) == "Desktop"
+        assert a.get_wallpaper(FakeDesktop()) == "wallpaper.jpg"
+        a.set_name("desktop", "name")
+        a.set_wallpaper("desktop", "path")
+        a.set_wallpaper_for_all_desktops("path")
+        assert manager.calls == [
+            ("SetName", ("desktop", "name")),
+            ("SetWallpaper", ("desktop", "path")),
+            ("SetWallpaperForAllDesktops", ("path",)),
+        ]
+    else:
+        with pytest.raises(NotImplementedError):
+            a.get_wallpaper(FakeDesktop())
+        with pytest.raises(NotImplementedError):
+            a.set_wallpaper("desktop", "path")
+        with pytest.raises(NotImplementedError):
+            a.set_wallpaper_for_all_desktops("path")
+
+
+@pytest.mark.parametrize("adapter", ADAPTERS)
+def test_adapter_prefers_manager2_for_names(adapter):
+    manager, manager2 = FakeVtable(), FakeVtable()
+    adapter(manager, manager2).set_name("desktop", "name")
+    assert manager.calls == []
+    assert manager2.calls == [("SetName", ("desktop", "name"))]
+
+
+@pytest.mark.parametrize("adapter", ADAPTERS)
+def test_adapter_binds_view_collection(adapter):
+    manager, views = FakeVtable(), FakeVtable()
+    a = adapter(manager, None, views)
+    assert a.find_desktop("guid") == "FindDesktop"
+    assert a.get_views_by_z_order() == "GetViewsByZOrder"
+    assert a.get_view_in_focus() == "GetViewInFocus"
+    assert a.get_view_for_hwnd(100) == "GetViewForHwnd"
+    assert views.calls == [("GetViewsByZOrder", ()), ("GetViewInFocus", ()), ("GetViewForHwnd", (100,))]
+    assert adapter(manager).get_views_by_z_order is None
+
+
+def test_adapter_tracks_returned_pointers():
+    a = ADAPTERS[-1](FakeVtable(), None, FakeVtable())
+    with Arena() as arena:
+        a.get_current_desktop()
+        a.get_view_in_focus()
+        a.switch_desktop("target")
+        tracked = [t.ptr for t in arena._tracked()]
+        assert tracked == ["GetCurrentDesktop", "GetViewInFocus"]
+        # The fake's return values can't be released
+        arena.keep(*tracked)
+
+
+@pytest.mark.parametrize("adapter", ADAPTERS)
+def test_select_adapter(monkeypatch, adapter):
+    for a in ADAPTERS:
+        if a.flag is not None:
+            monkeypatch.setattr(build, a.flag, issubclass(adapter, a))
+    assert select_adapter() is adapter
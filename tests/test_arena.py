@@ -0,0 +1,157 @@
+import gc
+import tracemalloc
+
+import pytest
+
+from pyvda import (
+    AppView,
+    Arena,
+    FastSwitcher,
+    MRUTracker,
+    VirtualDesktop,
+    get_apps_by_z_order,
+    get_virtual_desktops,
+    set_view_cache_size,
+)
+from pyvda.arena import track, untrack
+from pyvda.pyvda import managers
+
+
+@pytest.fixture
+def shell(shell):
+    for _ in range(20):
+        shell.add_view()
+    return shell
+
+
+def refs(shell):
+    return [v.refs for v in shell.views] + [d.refs for d in shell.desktops]
+
+
+def test_releases_on_exit(shell):
+    with Arena() as arena:
+        apps = get_apps_by_z_order(switcher_windows=False, current_desktop=False)
+        desktops = get_virtual_desktops()
+        # Plus the two arrays they were fetched from
+        assert len(arena) == len(apps) + len(desktops) + 2
+        assert all(v.refs == 2 for v in shell.views)
+    assert all(r == 1 for r in refs(shell))
+    assert arena.released == len(apps) + len(desktops) + 2
+
+
+def test_untracked_outside_arena(shell):
+    get_apps_by_z_order(switcher_windows=False, current_desktop=False)
+    assert track(shell.views[0]) is shell.views[0]
+
+
+def test_nested_arenas(shell):
+    with Arena() as outer:
+        get_virtual_desktops()
+        with Arena() as inner:
+            get_apps_by_z_order(switcher_windows=False, current_desktop=False)
+        assert inner.released == len(shell.views) + 1
+        assert len(outer) == len(shell.desktops) + 1
+
+
+def test_tracks_pointers_from_the_managers(shell):
+    with Arena() as arena:
+        current = VirtualDesktop.current()
+        found = VirtualDesktop(desktop_id=shell.desktops[1].id)
+        focused = AppView.current()
+        by_hwnd = AppView(shell.views[1].hwnd)
+        assert len(arena) == 4
+        assert shell.desktops[0].refs == 2 and shell.views[0].refs == 2
+    assert all(r == 1 for r in refs(shell))
+
+
+def test_view_cache_keeps_its_views(shell, monkeypatch):
+    set_view_cache_size(8)
+    monkeypatch.setattr(managers.view_cache, "_window_thread", lambda hwnd: 1)
+    try:
+        with Arena() as arena:
+            AppView(shell.views[1].hwnd)
+            assert len(arena) == 0
+        # Served from the cache, which the arena didn't release
+        assert AppView(shell.views[1].hwnd).hwnd == shell.views[1].hwnd
+        assert shell.calls["GetViewForHwnd"] == 1
+    finally:
+        set_view_cache_size(0)
+
+
+def test_keep(shell):
+    with Arena() as arena:
+        kept = get_virtual_desktops()[0]
+        arena.keep(kept)
+    assert shell.desktops[0].refs == 2
+
+
+def test_leak_check_reports_outstanding(shell, caplog):
+    with Arena(leak_check=True) as arena:
+        apps = get_apps_by_z_order(switcher_windows=False, current_desktop=False)
+        outstanding = arena.outstanding()
+        assert len(outstanding) == len(apps)
+        assert "test_arena.py" in outstanding[0].created
+        del apps
+        assert arena.outstanding() == []
+
+
+def test_outstanding_counts_holders(shell):
+    with Arena() as arena:
+        array = managers.view_collection.GetViewsByZOrder()
+        ptr = array.get_at(0, None)
+        # Holding the raw pointer isn't counted, only the objects wrapping it
+        assert arena.outstanding() == []
+        first = AppView(view=ptr)
+        second = AppView(view=ptr)
+        assert [o.references for o in arena.outstanding()] == [2]
+        del first
+        assert [o.references for o in arena.outstanding()] == [1]
+        del second
+        assert arena.outstanding() == []
+
+
+def test_untrack(shell):
+    with Arena() as outer:
+        with Arena() as inner:
+            desktop = get_virtual_desktops()[0]
+            untrack(desktop._virtual_desktop)
+        assert len(inner) == 0 and len(outer) == 0
+    assert shell.desktops[0].refs == 2
+
+
+def test_caches_keep_their_pointers(shell):
+    with Arena():
+        tracker = MRUTracker(switcher_windows=False)
+        switcher = FastSwitcher()
+        switcher.go(VirtualDesktop(2))
+    switcher.close()
+    # Neither the tracker's nor the switcher's views were released, so they are still usable
+    assert all(v.refs == 3 for v in shell.views)
+    assert tracker.most_recent(shell.desktops[0].id)[0].hwnd == shell.views[0].hwnd
+    assert [d.refs for d in shell.desktops] == [1, 2, 1]
+
+
+def test_soak_memory_is_flat(shell):
+    def poll():
+        with Arena():
+            for app in get_apps_by_z_order(switcher_windows=False, current_desktop=False):
+                app.get_activation_timestamp()
+            get_virtual_desktops()
+            VirtualDesktop.current().id
+            AppView.current().hwnd
+
+    for _ in range(200):
+        poll()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(5000):
+            poll()
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    assert growth < 64 * 1024
+    assert all(r == 1 for r in refs(shell))
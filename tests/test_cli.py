@@ -0,0 +1,74 @@
+import io
+import json
+
+import pytest
+
+import pyvda.build as build
+from pyvda.cli import COMMANDS, main, run_batch
+
+
+def batch(lines):
+    out = io.StringIO()
+    failures = run_batch(io.StringIO("".join(json.dumps(l) + "\n" for l in lines)), out)
+    return failures, [json.loads(l) for l in out.getvalue().splitlines()]
+
+
+def test_batch(shell):
+    view = shell.add_view("app")
+    failures, replies = batch([
+        {"cmd": "go", "desktop": 2, "id": 1},
+        {"cmd": "move", "desktop": "3", "hwnd": view.hwnd},
+        {"cmd": "pin", "hwnd": hex(view.hwnd)},
+        {"cmd": "query", "hwnd": view.hwnd},
+    ])
+    assert failures == 0
+    assert replies[0] == {"ok": True, "result": {"id": str(shell.desktops[1].id)}, "id": 1}
+    assert shell.current is shell.desktops[1]
+    assert view.desktop is shell.desktops[2]
+    assert view in shell.pinned_views
+    assert replies[3]["result"]["window"]["desktop"] == 3
+    assert replies[3]["result"]["window"]["pinned"]
+
+
+def test_batch_errors_dont_stop_the_session(shell):
+    failures, replies = batch([
+        {"cmd": "go", "desktop": 9},
+        {"cmd": "nope"},
+        {"cmd": "go", "desktop": 1, "bogus": True},
+        {"cmd": "go", "desktop": 2},
+    ])
+    assert failures == 3
+    assert [r["ok"] for r in replies] == [False, False, False, True]
+    assert replies[0]["type"] == "ValueError"
+
+
+def test_list(shell, capsys):
+    shell.add_view("app", shell.desktops[1])
+    assert main(["list", "--windows"]) == 0
+    result = json.loads(capsys.readouterr().out)["result"]
+    assert [d["number"] for d in result["desktops"]] == [1, 2, 3]
+    assert result["current"] == 1
+    assert [w["desktop"] for w in result["windows"]] == [2]
+
+
+@pytest.mark.skipif(not build.OVER_19041, reason="Desktop names need 19041 or later")
+def test_rename_and_go_by_name(shell, capsys):
+    assert main(["rename", "Comms", "--desktop", "2"]) == 0
+    assert main(["go", "Comms"]) == 0
+    assert shell.current is shell.desktops[1]
+
+
+def test_batch_command_key_errors_are_not_unknown_commands(shell, monkeypatch):
+    def broken():
+        return {}["missing"]
+    monkeypatch.setitem(COMMANDS, "broken", broken)
+    failures, replies = batch([{"cmd": "broken"}, {"cmd": "nope"}])
+    assert failures == 2
+    assert replies[0]["type"] == "KeyError"
+    assert replies[1]["type"] == "ValueError"
+
+
+def test_batch_rejects_a_command(shell, capsys):
+    with pytest.raises(SystemExit) as e:
+        main(["--batch", "list"])
+    assert e.value.code == 2
@@ -7,7 +7,17 @@ import pytest
 import win32gui
 from comtypes import COINIT_MULTITHREADED, CoInitializeEx
 
-from pyvda import AppView, VirtualDesktop, get_apps_by_z_order, get_virtual_desktops
+from pyvda import (
+    AppView,
+    DesktopSpec,
+    MRUTracker,
+    Plan,
+    VirtualDesktop,
+    WindowSpec,
+    desktop_names,
+    get_apps_by_z_order,
+    get_virtual_desktops,
+)
 
 current_window = AppView.current()
 current_desktop = VirtualDesktop.current()
@@ -61,6 +71,20 @@ def test_switch_focus():
 
     assert apps[0].get_activation_timestamp() > ts
 
+def test_mru_tracker():
+    tracker = MRUTracker()
+    recent = tracker.most_recent(current_desktop, 2)
+    assert recent[0] == AppView.current()
+    if len(recent) == 1:
+        raise Exception("For testing purposes, open another window!")
+
+    assert tracker.focus_previous() == recent[1]
+    time.sleep(1)
+    assert AppView.current() == recent[1]
+    tracker.focus_previous()
+    time.sleep(1)
+    assert AppView.current() == recent[0]
+
 def test_visibility():
     cur = AppView.current()
     assert cur.is_shown_in_switchers()
@@ -107,6 +131,29 @@ def test_desktop_names():
     current_desktop.rename(current_name)
     assert current_desktop.name == current_name, f"Wanted '{current_name}', got '{current_desktop.name}'"
 
+@pytest.mark.xfail(
+    condition=not sys.getwindowsversion().build >= 19041,
+    reason="<=18363 has no IVirtualDesktopManagerInternal2 manager",
+    raises=NotImplementedError,
+    strict=True
+)
+def test_desktop_by_name():
+    current_name = current_desktop.name
+    test_name = "pyvda by_name"
+    current_desktop.rename(test_name)
+    assert desktop_names()[current_desktop.number - 1] == test_name
+    assert VirtualDesktop.by_name(test_name).id == current_desktop.id
+    current_desktop.rename(current_name)
+    with pytest.raises(ValueError):
+        VirtualDesktop.by_name(test_name)
+
+    created = VirtualDesktop.by_name(test_name, create=True)
+    try:
+        assert created.name == test_name
+        assert VirtualDesktop.by_name(test_name).id == created.id
+    finally:
+        created.remove(fallback=current_desktop)
+
 @pytest.mark.skipif(sys.getwindowsversion().build >= 19041, reason="Only for builds <=19041")
 def test_desktop_names_pre_19041():
     re_is_not_supported = r".* is not supported .*"
@@ -146,3 +193,29 @@ def test_initialisation_with_com_mta():
     t.join()
     if error is not None:
         raise error
+
+def test_plan_execute_and_rollback():
+    old_count = len(get_virtual_desktops())
+    current_desktop = VirtualDesktop.current()
+    current_window = AppView.current()
+    names = desktop_names() + ["pyvda plan"]
+
+    plan = Plan(
+        desktops=[DesktopSpec(n) for n in names],
+        windows=[WindowSpec(hwnd=current_window.hwnd, desktop=len(names))],
+    )
+    descriptions = [op.description for op in plan.diff()]
+    assert descriptions == [
+        "create desktop 'pyvda plan'",
+        f"rename desktop {len(names)} to 'pyvda plan'",
+        f"move window {current_window.hwnd} to desktop {len(names)}",
+    ]
+
+    plan.execute()
+    assert len(get_virtual_desktops()) == old_count + 1
+    assert VirtualDesktop.by_name("pyvda plan").id == current_window.desktop_id
+    assert Plan(desktops=[DesktopSpec(n) for n in names]).diff() == []
+
+    plan.rollback()
+    assert len(get_virtual_desktops()) == old_count
+    assert current_window.desktop_id == current_desktop.id
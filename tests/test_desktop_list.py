@@ -0,0 +1,54 @@
+import pytest
+
+from pyvda import DesktopList, VirtualDesktop, get_virtual_desktops
+
+
+@pytest.fixture
+def desktops():
+    return 5
+
+
+def test_len_only_counts(shell):
+    desktops = get_virtual_desktops(lazy=True)
+    assert isinstance(desktops, DesktopList)
+    assert len(desktops) == 5
+    assert shell.calls["GetCount"] == 1
+    assert shell.calls["GetAt"] == 0
+
+
+def test_getitem(shell):
+    desktops = get_virtual_desktops(lazy=True)
+    assert desktops[0].id == shell.desktops[0].id
+    assert desktops[-1].id == shell.desktops[-1].id
+    assert desktops[-1] is desktops[4]
+    assert shell.calls["GetAt"] == 2
+    with pytest.raises(IndexError):
+        desktops[5]
+
+
+def test_slices_are_lazy(shell):
+    desktops = get_virtual_desktops(lazy=True)
+    last_two = desktops[-2:]
+    assert len(last_two) == 2
+    assert shell.calls["GetAt"] == 0
+    assert [d.id for d in last_two] == [d.id for d in shell.desktops[-2:]]
+    assert [d.id for d in desktops[::-2]] == [d.id for d in shell.desktops[::-2]]
+    assert shell.calls["GetAt"] == 5
+
+
+def test_reversed(shell):
+    desktops = get_virtual_desktops(lazy=True)
+    first = next(reversed(desktops))
+    assert first.id == shell.desktops[-1].id
+    assert shell.calls["GetAt"] == 1
+
+
+def test_matches_eager_list(shell):
+    assert [d.id for d in get_virtual_desktops(lazy=True)] == [d.id for d in get_virtual_desktops()]
+
+
+def test_desktop_by_number(shell):
+    assert VirtualDesktop(3).id == shell.desktops[2].id
+    assert shell.calls["GetCount"] == 0
+    with pytest.raises(ValueError):
+        VirtualDesktop(6)
@@ -0,0 +1,75 @@
+import pytest
+
+from pyvda import VirtualDesktop
+from pyvda.fastswitch import FastSwitcher
+
+
+@pytest.fixture
+def switcher(shell):
+    switcher = FastSwitcher()
+    yield switcher
+    switcher.close()
+
+
+def test_swaps_window_sets(shell, switcher):
+    one = [shell.add_view("a", shell.desktops[0]) for _ in range(2)]
+    two = [shell.add_view("b", shell.desktops[1]) for _ in range(3)]
+    pinned = shell.add_view("c", shell.desktops[2])
+    shell.pinned_views.append(pinned)
+
+    assert switcher.go(VirtualDesktop(2)) == 5
+    assert [v.cloaked for v in one] == [True, True]
+    assert [v.cloaked for v in two] == [False, False, False]
+    assert not pinned.cloaked
+    assert shell.current is shell.desktops[1]
+    # The windows were enumerated once, up front
+    assert shell.calls["GetViewsByZOrder"] == 1
+
+    assert switcher.go(VirtualDesktop(2)) == 0
+    switcher.go(VirtualDesktop(1))
+    assert [v.cloaked for v in one + two] == [False] * 2 + [True] * 3
+    assert shell.calls["GetViewsByZOrder"] == 1
+
+
+def test_deferred_reconcile(shell, switcher):
+    shell.add_view("b", shell.desktops[1])
+    switcher.reconcile = False
+    switcher.go(VirtualDesktop(2))
+    assert shell.current is shell.desktops[0]
+    switcher.sync()
+    assert shell.current is shell.desktops[1]
+    switches = shell.calls["SwitchDesktop"]
+    switcher.sync()
+    assert shell.calls["SwitchDesktop"] == switches
+
+
+def test_closed_windows_are_dropped(shell, switcher):
+    a = shell.add_view("a", shell.desktops[0])
+    b = shell.add_view("b", shell.desktops[1])
+    switcher.refresh()
+    shell.views.remove(b)
+    assert switcher.go(VirtualDesktop(2)) == 1
+    assert a.cloaked
+
+
+def test_follows_normal_switches(shell, switcher):
+    a = shell.add_view("a", shell.desktops[0])
+    c = shell.add_view("c", shell.desktops[2])
+    switcher.refresh()
+    VirtualDesktop(3).go()
+    switcher.go(VirtualDesktop(1))
+    # The windows on desktop 3 are the ones hidden
+    assert c.cloaked and not a.cloaked
+
+
+def test_follows_switches_made_without_pyvda(shell, switcher):
+    a = shell.add_view("a", shell.desktops[0])
+    b = shell.add_view("b", shell.desktops[1])
+    switcher.go(VirtualDesktop(2))
+    # e.g. the user switching back with the keyboard
+    shell.switch(shell.desktops[0])
+    a.cloaked = False
+    b.cloaked = True
+    assert switcher.go(VirtualDesktop(2)) == 2
+    assert shell.current is shell.desktops[1]
+    assert a.cloaked and not b.cloaked
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pyvda import geometry
+from pyvda.geometry import Rect, WindowBatch, apply_layout, read_geometry
+
+
+# Invisible resize borders, as on Windows 10 and later
+BORDER = 7
+
+
+@pytest.fixture
+def desktops():
+    return 2
+
+
+@pytest.fixture
+def user32(shell, monkeypatch):
+    """Records DeferWindowPos batches instead of moving real windows."""
+    calls = []
+    state = SimpleNamespace(calls=calls, zoomed=set(), restored=[])
+
+    def frame(hwnd):
+        return next(v.frame for v in shell.views if v.hwnd == hwnd)
+
+    def window_rect(hwnd):
+        left, top, right, bottom = frame(hwnd)
+        return Rect(left - BORDER, top, right + BORDER, bottom + BORDER)
+
+    def show_window(hwnd, cmd):
+        state.zoomed.discard(hwnd)
+        state.restored.append(hwnd)
+
+    monkeypatch.setattr(geometry, "window_rect", window_rect)
+    monkeypatch.setattr(geometry, "_BeginDeferWindowPos", lambda n: calls.append(("begin", n)) or 1)
+    monkeypatch.setattr(geometry, "_DeferWindowPos", lambda hdwp, *args: calls.append(args) or hdwp + 1)
+    monkeypatch.setattr(geometry, "_EndDeferWindowPos", lambda hdwp: calls.append(("end", hdwp)) or True)
+    monkeypatch.setattr(geometry, "windll", SimpleNamespace(user32=SimpleNamespace(
+        IsZoomed=lambda hwnd: hwnd in state.zoomed,
+        IsIconic=lambda hwnd: False,
+        ShowWindow=show_window,
+    )))
+    return state
+
+
+def test_read_geometry(shell, user32):
+    a = shell.add_view("a")
+    a.frame = (10, 20, 110, 220)
+    shell.add_view("b", shell.desktops[1])
+    pinned = shell.add_view("c", shell.desktops[1])
+    shell.pinned_views.append(pinned)
+    shell.add_view("tool", switcher=False)
+
+    windows = read_geometry()
+    assert [w.hwnd for w in windows] == [pinned.hwnd, a.hwnd]
+    assert windows[1].frame == Rect(10, 20, 110, 220)
+    assert windows[1].window == Rect(3, 20, 117, 227)
+    assert [w.hwnd for w in read_geometry(include_pinned=False)] == [a.hwnd]
+    assert shell.calls["GetViewsByZOrder"] == 2
+
+
+def test_apply_layout_is_one_batch(shell, user32):
+    a = shell.add_view("a")
+    b = shell.add_view("b")
+    user32.zoomed.add(b.hwnd)
+    moved = apply_layout({
+        a.hwnd: Rect(0, 0, 1280, 1440),
+        b.hwnd: Rect(1280, 0, 2560, 1440),
+    })
+    assert moved == 2
+    assert user32.restored == [b.hwnd]
+    flags = geometry.SWP_NOZORDER | geometry.SWP_NOACTIVATE | geometry.SWP_NOOWNERZORDER
+    assert user32.calls == [
+        ("begin", 2),
+        # Window rectangles are widened to hide the invisible borders
+        (a.hwnd, None, -BORDER, 0, 1280 + 2 * BORDER, 1440 + BORDER, flags),
+        (b.hwnd, None, 1280 - BORDER, 0, 1280 + 2 * BORDER, 1440 + BORDER, flags),
+        ("end", 3),
+    ]
+
+
+def test_apply_layout_window_rects(shell, user32):
+    a = shell.add_view("a")
+    apply_layout({a.hwnd: Rect(0, 0, 100, 100)}, frames=False)
+    assert user32.calls[1][:6] == (a.hwnd, None, 0, 0, 100, 100)
+    assert shell.calls["GetExtendedFramePosition"] == 0
+
+
+def test_batch_merges_operations(user32):
+    with WindowBatch() as batch:
+        batch.move(1, Rect(0, 0, 10, 10))
+        batch.insert_after(1, 2)
+        batch.insert_after(3, 1)
+    assert user32.calls == [
+        ("begin", 2),
+        (1, 2, 0, 0, 10, 10, geometry.SWP_NOACTIVATE | geometry.SWP_NOOWNERZORDER),
+        (3, 1, 0, 0, 0, 0, geometry.SWP_NOMOVE | geometry.SWP_NOSIZE | geometry.SWP_NOACTIVATE | geometry.SWP_NOOWNERZORDER),
+        ("end", 3),
+    ]
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from pyvda import DesktopHistory, VirtualDesktop
+from pyvda.pyvda import _desktop_listeners
+
+
+@pytest.fixture
+def desktops():
+    return 4
+
+
+@pytest.fixture
+def history(shell):
+    history = DesktopHistory(size=3)
+    yield history
+    history.close()
+
+
+def ids(shell, *numbers):
+    return [shell.desktops[n - 1].id for n in numbers]
+
+
+def test_records_switches(shell, history):
+    VirtualDesktop(2).go()
+    VirtualDesktop(2).go()
+    VirtualDesktop(3).go()
+    assert history.entries() == ids(shell, 1, 2, 3)
+
+
+def test_back_and_forward(shell, history):
+    VirtualDesktop(2).go()
+    VirtualDesktop(3).go()
+    assert history.back().id == shell.desktops[1].id
+    assert shell.current is shell.desktops[1]
+    assert history.back().id == shell.desktops[0].id
+    assert history.back() is None
+    assert history.forward().id == shell.desktops[1].id
+    assert history.entries() == ids(shell, 1, 2, 3)
+
+    # A new visit drops the forward history
+    VirtualDesktop(4).go()
+    assert history.entries() == ids(shell, 1, 2, 4)
+    assert history.forward() is None
+
+
+def test_oldest_visit_is_overwritten(shell, history):
+    for n in (2, 3, 4, 1):
+        VirtualDesktop(n).go()
+    assert history.entries() == ids(shell, 3, 4, 1)
+    assert len(history) == 3
+
+
+def test_sync_picks_up_other_switches(shell, history):
+    shell.switch(shell.desktops[2])
+    history.sync()
+    assert history.current == shell.desktops[2].id
+
+
+def test_back_skips_removed_desktops(shell, history):
+    VirtualDesktop(2).go()
+    VirtualDesktop(3).go()
+    VirtualDesktop(2).remove()
+    assert history.back().id == shell.desktops[0].id
+
+
+def test_back_from_another_thread(shell, history):
+    VirtualDesktop(2).go()
+    VirtualDesktop(3).go()
+    result = []
+    thread = threading.Thread(target=lambda: result.append(history.back().id))
+    thread.start()
+    thread.join()
+    assert result == [shell.desktops[1].id]
+    assert history.current == shell.desktops[1].id
+
+
+def test_lock_is_released_while_switching(shell, history):
+    VirtualDesktop(2).go()
+    seen = []
+
+    def listener(event, desktop):
+        # Another thread using the history during the switch
+        thread = threading.Thread(target=lambda: seen.append(history.entries()))
+        thread.start()
+        thread.join(timeout=5)
+
+    _desktop_listeners.append(listener)
+    try:
+        history.back()
+    finally:
+        _desktop_listeners.remove(listener)
+    assert seen == [ids(shell, 1, 2)]
@@ -0,0 +1,56 @@
+import pytest
+
+from pyvda import VirtualDesktop
+from pyvda.ownership import get_ownership_groups
+
+
+@pytest.fixture
+def desktops():
+    return 2
+
+
+@pytest.fixture
+def editor(shell):
+    root = shell.add_view("editor")
+    tool = shell.add_view("editor", switcher=False, owner=root)
+    dialog = shell.add_view("editor", switcher=False, owner=tool)
+    return root, tool, dialog
+
+
+def test_groups_by_root(shell, editor):
+    root, tool, dialog = editor
+    other = shell.add_view("other")
+    groups = get_ownership_groups()
+    assert [g.hwnd for g in groups] == [other.hwnd, root.hwnd]
+    group = groups[1]
+    assert group.hwnds == [dialog.hwnd, tool.hwnd, root.hwnd]
+    assert [v.hwnd for v in group.owned] == [dialog.hwnd, tool.hwnd]
+    assert group.top.hwnd == dialog.hwnd
+    assert shell.calls["GetViewsByZOrder"] == 1
+
+
+def test_filters_apply_to_roots(shell, editor):
+    root, _, _ = editor
+    shell.add_view("hidden", switcher=False)
+    away = shell.add_view("away", shell.desktops[1])
+    assert len(get_ownership_groups(switcher_windows=False)) == 3
+    assert [g.hwnd for g in get_ownership_groups(current_desktop=True)] == [root.hwnd]
+    shell.pinned_views.append(away)
+    assert [g.hwnd for g in get_ownership_groups(current_desktop=True)] == [away.hwnd, root.hwnd]
+
+
+def test_acts_on_whole_tree(shell, editor):
+    root, tool, dialog = editor
+    group = get_ownership_groups()[0]
+
+    group.move(VirtualDesktop(2))
+    assert {v.desktop for v in editor} == {shell.desktops[1]}
+
+    group.pin()
+    assert set(shell.pinned_views) == set(editor)
+    group.unpin()
+    assert shell.pinned_views == []
+
+    shell.activate(root)
+    group.focus()
+    assert shell.views[0] is dialog
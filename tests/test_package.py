@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_submodules_are_attributes():
+    # In a new process, since this one has imported the submodules already
+    script = textwrap.dedent("""
+        import json, sys
+        import pyvda
+        print(json.dumps({
+            "build": pyvda.build.__name__,
+            "trace": pyvda.trace is sys.modules["pyvda.trace"],
+            "utils_imported": "pyvda.utils" in sys.modules,
+            "listed": [m for m in ("trace", "utils", "pyvda", "__main__") if m in dir(pyvda)],
+            "missing": hasattr(pyvda, "missing"),
+        }))
+    """)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == {
+        "build": "pyvda.build",
+        "trace": True,
+        "utils_imported": False,
+        "listed": ["trace", "utils", "pyvda"],
+        "missing": False,
+    }
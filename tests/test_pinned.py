@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from pyvda import AppView, pinned_app_ids, pinned_hwnds, pinned_views
+from pyvda.pyvda import _pinned_index
+
+
+@pytest.fixture
+def desktops():
+    return 2
+
+
+@pytest.fixture
+def shell(shell):
+    _pinned_index.invalidate()
+    yield shell
+    _pinned_index.invalidate()
+
+
+def test_enumerates_once(shell):
+    a = shell.add_view("a")
+    b = shell.add_view("b")
+    shell.add_view("b")
+    shell.pinned_views.append(a)
+    shell.pinned_apps.add("b")
+
+    assert [v.hwnd for v in pinned_views()] == [a.hwnd]
+    assert pinned_app_ids() == {"b"}
+    assert b.hwnd not in pinned_hwnds()
+    assert shell.calls["IsAppIdPinned"] == 2
+    pinned_views()
+    assert shell.calls["GetViewsByZOrder"] == 1
+
+
+def test_updated_by_pin_and_unpin(shell):
+    a = shell.add_view("a")
+    b = shell.add_view("b")
+    assert pinned_hwnds() == set()
+
+    AppView(view=b).pin()
+    AppView(view=a).pin_app()
+    assert pinned_hwnds() == {b.hwnd}
+    assert pinned_app_ids() == {"a"}
+
+    AppView(view=b).unpin()
+    AppView(view=a).unpin_app()
+    assert pinned_hwnds() == set()
+    assert pinned_app_ids() == set()
+    assert shell.calls["GetViewsByZOrder"] == 1
+
+
+def test_pin_skips_unloaded_index(shell):
+    a = shell.add_view("a")
+    AppView(view=a).pin()
+    AppView(view=a).unpin()
+    assert shell.calls["GetThumbnailWindow"] == 0
+
+
+def test_refresh(shell):
+    a = shell.add_view("a")
+    assert pinned_hwnds() == set()
+    shell.pinned_views.append(a)
+    assert pinned_hwnds() == set()
+    assert pinned_hwnds(refresh=True) == {a.hwnd}
+
+
+def test_views_are_resolved_on_the_calling_thread(shell):
+    a = shell.add_view("a")
+    b = shell.add_view("b")
+    shell.pinned_views.extend([a, b])
+    assert pinned_hwnds() == {a.hwnd, b.hwnd}
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append([v.hwnd for v in pinned_views()]))
+    thread.start()
+    thread.join()
+    assert results == [[b.hwnd, a.hwnd]]
+    assert shell.calls["GetViewForHwnd"] == 2
+    assert shell.calls["GetViewsByZOrder"] == 1
+
+    # Closed windows are skipped until the next refresh
+    shell.views.remove(a)
+    assert [v.hwnd for v in pinned_views()] == [b.hwnd]
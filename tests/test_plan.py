@@ -0,0 +1,166 @@
+import logging
+
+import pytest
+
+import pyvda.build as build
+from pyvda import DesktopSpec, Plan, WindowSpec
+from pyvda.plan import PlanError
+from pyvda.pyvda import managers
+
+
+pytestmark = pytest.mark.skipif(not build.OVER_19041, reason="Desktop names need 19041 or later")
+
+
+def descriptions(operations):
+    return [op.description for op in operations]
+
+
+def test_matches_desktops_by_position(shell):
+    shell.desktops[1].name = "Build"
+    plan = Plan(desktops=[DesktopSpec("Comms"), DesktopSpec("Build"), DesktopSpec("Docs"), DesktopSpec("Extra")])
+    assert descriptions(plan.diff()) == [
+        "create desktop 'Extra'",
+        "rename desktop 1 to 'Comms'",
+        "rename desktop 3 to 'Docs'",
+        "rename desktop 4 to 'Extra'",
+    ]
+    plan.execute()
+    assert [d.name for d in shell.desktops] == ["Comms", "Build", "Docs", "Extra"]
+    assert Plan(desktops=plan.desktops).diff() == []
+
+
+def test_matches_desktops_by_name(shell):
+    # A named desktop is only matched by its name, not by its position
+    shell.desktops[0].name = "Build"
+    plan = Plan(desktops=[DesktopSpec("Comms"), DesktopSpec("Build")])
+    assert descriptions(plan.diff()) == [
+        "create desktop 'Comms'",
+        "rename desktop 1 to 'Comms'",
+    ]
+    plan.execute()
+    assert [d.name for d in shell.desktops] == ["Build", "", "", "Comms"]
+
+
+def test_windows_by_app_id_and_pinning(shell):
+    editors = [shell.add_view("editor"), shell.add_view("editor")]
+    chat = shell.add_view("chat")
+    shell.pinned_apps.add("mail")
+    mail = shell.add_view("mail")
+    plan = Plan(
+        desktops=[DesktopSpec("One"), DesktopSpec("Two")],
+        windows=[WindowSpec(app_id="editor", desktop="Two"), WindowSpec(hwnd=chat.hwnd, pinned=True)],
+        pinned_apps=["chat", "mail"],
+    )
+    operations = descriptions(plan.diff())
+    assert sorted(operations[2:4]) == [f"move window {v.hwnd} to desktop 2" for v in editors]
+    assert operations[4:] == [f"pin window {chat.hwnd}", "pin app chat"]
+
+    plan.execute()
+    assert [v.desktop for v in editors] == [shell.desktops[1]] * 2
+    assert shell.pinned_views == [chat]
+    assert shell.pinned_apps == {"chat", "mail"}
+    assert mail.desktop is shell.desktops[0]
+
+
+def test_later_window_specs_win(shell):
+    view = shell.add_view("editor")
+    plan = Plan(
+        desktops=[DesktopSpec("One"), DesktopSpec("Two"), DesktopSpec("Three")],
+        windows=[WindowSpec(app_id="editor", desktop=2), WindowSpec(hwnd=view.hwnd, desktop=3)],
+    )
+    assert f"move window {view.hwnd} to desktop 3" in descriptions(plan.diff())
+    assert f"move window {view.hwnd} to desktop 2" not in descriptions(plan.operations)
+
+
+def test_operation_order(shell):
+    pinned = shell.add_view("pinned")
+    shell.pinned_views.append(pinned)
+    other = shell.add_view("other")
+    plan = Plan(
+        desktops=[DesktopSpec("One"), DesktopSpec("Two"), DesktopSpec("Three"), DesktopSpec("New")],
+        windows=[
+            WindowSpec(hwnd=other.hwnd, desktop="New", pinned=True),
+            WindowSpec(hwnd=pinned.hwnd, desktop="Two", pinned=False),
+        ],
+    )
+    # Created desktops exist before they are renamed or moved to, and pinned
+    # windows are unpinned before they are moved
+    assert descriptions(plan.diff()) == [
+        "create desktop 'New'",
+        "rename desktop 1 to 'One'",
+        "rename desktop 2 to 'Two'",
+        "rename desktop 3 to 'Three'",
+        "rename desktop 4 to 'New'",
+        f"unpin window {pinned.hwnd}",
+        f"move window {pinned.hwnd} to desktop 2",
+        f"pin window {other.hwnd}",
+    ]
+    plan.execute()
+    assert shell.desktops[3].name == "New"
+    assert pinned.desktop is shell.desktops[1]
+    assert shell.pinned_views == [other]
+
+
+def test_rollback_after_failure(shell, monkeypatch, caplog):
+    view = shell.add_view("editor")
+    chat = shell.add_view("chat")
+    plan = Plan(
+        desktops=[DesktopSpec(""), DesktopSpec(""), DesktopSpec(""), DesktopSpec("New")],
+        windows=[WindowSpec(hwnd=view.hwnd, desktop="New"), WindowSpec(hwnd=chat.hwnd, pinned=True)],
+    )
+    plan.diff()
+
+    def broken(view):
+        raise RuntimeError("pin failed")
+    monkeypatch.setattr(managers.pinned_apps, "PinView", broken)
+
+    with caplog.at_level(logging.ERROR, logger="pyvda.plan"):
+        with pytest.raises(RuntimeError):
+            plan.execute()
+    assert "Failed to pin window" in caplog.text
+    assert len(shell.desktops) == 3
+    assert view.desktop is shell.desktops[0]
+    assert shell.pinned_views == []
+    assert plan.undo_log == []
+
+
+def test_failure_without_rollback(shell, monkeypatch):
+    view = shell.add_view("editor")
+    chat = shell.add_view("chat")
+    plan = Plan(
+        desktops=[DesktopSpec(""), DesktopSpec(""), DesktopSpec(""), DesktopSpec("New")],
+        windows=[WindowSpec(hwnd=view.hwnd, desktop="New"), WindowSpec(hwnd=chat.hwnd, pinned=True)],
+    )
+    plan.diff()
+
+    def broken(view):
+        raise RuntimeError("pin failed")
+    monkeypatch.setattr(managers.pinned_apps, "PinView", broken)
+
+    with pytest.raises(RuntimeError):
+        plan.execute(rollback_on_error=False)
+    assert descriptions(plan.undo_log) == [
+        "create desktop 'New'",
+        "rename desktop 4 to 'New'",
+        f"move window {view.hwnd} to desktop 4",
+    ]
+    assert view.desktop is shell.desktops[3]
+    plan.rollback()
+    assert len(shell.desktops) == 3
+    assert view.desktop is shell.desktops[0]
+
+
+def test_unknown_desktops_are_plan_errors(shell):
+    view = shell.add_view("editor")
+    with pytest.raises(PlanError, match="'Missing' is not in the plan"):
+        Plan(desktops=[DesktopSpec("One")], windows=[WindowSpec(hwnd=view.hwnd, desktop="Missing")]).diff()
+    with pytest.raises(PlanError, match="number 2 is not in the plan"):
+        Plan(desktops=[DesktopSpec("One")], windows=[WindowSpec(app_id="editor", desktop=2)]).diff()
+    assert shell.calls["SetName"] == 0
+
+
+def test_pinned_app_without_a_window_is_skipped(shell, caplog):
+    plan = Plan(pinned_apps=["absent"])
+    with caplog.at_level(logging.WARNING, logger="pyvda.plan"):
+        assert plan.diff() == []
+    assert "No window found for app absent" in caplog.text
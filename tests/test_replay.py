@@ -0,0 +1,116 @@
+import inspect
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from ctypes import byref
+from ctypes.wintypes import RECT
+
+import pytest
+
+import pyvda.build as build
+from pyvda import AppView, VirtualDesktop, get_virtual_desktops, trace, utils
+from pyvda.pyvda import managers
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def workload():
+    view = AppView.current()
+    rect = RECT()
+    view._view.GetExtendedFramePosition(byref(rect))
+    return [
+        VirtualDesktop.current().number,
+        len(get_virtual_desktops()),
+        view.hwnd,
+        [str(d.id) for d in get_virtual_desktops()],
+        [rect.left, rect.top, rect.right, rect.bottom],
+    ]
+
+
+def unavailable(managers):
+    raise AssertionError("The shell was used during replay")
+
+
+@pytest.fixture
+def recorded(shell, tmp_path):
+    for _ in range(3):
+        shell.add_view()
+    shell.views[0].frame = (10, 20, 300, 400)
+    shell.switch(shell.desktops[1])
+    path = str(tmp_path / "session.trace")
+    with trace.record(path):
+        expected = workload()
+    utils.set_backend(unavailable)
+    managers.clear()
+    return path, expected
+
+
+def test_replays_without_the_shell(recorded):
+    path, expected = recorded
+    with trace.replay(path) as player:
+        assert workload() == expected
+        assert player.remaining() == 0
+
+
+def test_records_python_backends_as_interfaces(recorded):
+    path, _ = recorded
+    with open(path) as f:
+        records = [json.loads(line) for line in f][1:]
+    interfaces = {r["i"] for r in records if r.get("i")}
+    assert {"IVirtualDesktopManagerInternal", "IApplicationView", "IObjectArray", "IVirtualDesktop"} <= interfaces
+    assert not any("FakeView" in line for line in map(json.dumps, records))
+    frame = [r for r in records if r.get("m") == "GetExtendedFramePosition"]
+    assert frame[0]["a"] == [{"ref": "RECT"}] and "out" in frame[0]
+
+
+def test_replay_restores_the_backend(recorded):
+    path, _ = recorded
+    with trace.replay(path):
+        workload()
+    with pytest.raises(AssertionError):
+        VirtualDesktop.current()
+
+
+def test_rejects_other_detected_flags(recorded, monkeypatch):
+    path, _ = recorded
+    with open(path) as f:
+        header, *records = f.readlines()
+    header = json.loads(header)
+    header["build"]["OVER_19041"] = not build.OVER_19041
+    with open(path, "w") as f:
+        f.write(json.dumps(header) + "\n")
+        f.writelines(records)
+    flags = {flag: getattr(build, flag) for flag in build.FLAGS}
+    monkeypatch.setattr(build, "_detected", True)
+
+    with pytest.raises(trace.ReplayError, match="OVER_19041"):
+        with trace.replay(path):
+            pass
+    assert {flag: getattr(build, flag) for flag in build.FLAGS} == flags
+    assert utils.get_backend() is unavailable
+
+
+def test_replays_in_a_fresh_process_without_comtypes(recorded):
+    path, expected = recorded
+    script = textwrap.dedent("""
+        import json, sys
+        from ctypes import byref
+        from ctypes.wintypes import RECT
+        # Fail any attempt to import comtypes
+        sys.modules["comtypes"] = None
+        from pyvda import trace
+    """) + inspect.getsource(workload) + textwrap.dedent("""
+        with trace.replay(sys.argv[1]):
+            from pyvda import AppView, VirtualDesktop, get_virtual_desktops
+            print(json.dumps(workload()))
+    """)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("READTHEDOCS", None)
+    result = subprocess.run(
+        [sys.executable, "-c", script, path], env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == expected
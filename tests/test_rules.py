@@ -0,0 +1,111 @@
+import pytest
+
+import pyvda.build as build
+from pyvda import Rule, RulesEngine
+
+
+@pytest.fixture
+def shell(shell):
+    shell.desktops[1].name = "Comms"
+    return shell
+
+
+def test_first_rule_wins():
+    engine = RulesEngine([
+        Rule("Teams", desktop=2),
+        Rule("Microsoft", desktop=3),
+        Rule(r"\\code\.exe$", desktop=1, exe=True),
+    ])
+    assert engine.match("MicrosoftTeams").desktop == 2
+    assert engine.match("Microsoft.Edge").desktop == 3
+    assert engine.match("microsoft.edge").desktop == 3
+    assert engine.match("Microsoft.Edge", "C:\\Code\\code.exe").desktop == 3
+    assert engine.match(None, "C:\\Code\\code.exe").desktop == 1
+    assert engine.match("Notepad") is None
+
+
+def test_decisions_are_cached():
+    engine = RulesEngine([Rule("Teams", desktop=2)])
+    for _ in range(3):
+        engine.match("MSTeams")
+        engine.match("Notepad")
+    assert engine.evaluations == 2
+
+
+names_supported = pytest.mark.skipif(not build.OVER_19041, reason="Desktop names need 19041 or later")
+
+
+@names_supported
+def test_apply_moves_and_pins(shell):
+    teams = shell.add_view("MSTeams")
+    spotify = shell.add_view("Spotify")
+    notepad = shell.add_view("Notepad")
+    code = shell.add_view(None)
+    engine = RulesEngine(
+        [Rule("Teams", desktop="Comms"), Rule("Spotify", pinned=True), Rule("code", desktop=3, exe=True)],
+        exe_lookup=lambda hwnd: "C:\\code.exe" if hwnd == code.hwnd else "C:\\other.exe",
+    )
+    assert engine.scan() == 3
+    assert teams.desktop is shell.desktops[1]
+    assert code.desktop is shell.desktops[2]
+    assert notepad.desktop is shell.desktops[0]
+    assert spotify in shell.pinned_views
+
+    # Windows are only placed once
+    teams.desktop = shell.desktops[0]
+    assert engine.scan() == 0
+    assert teams.desktop is shell.desktops[0]
+
+
+def test_notify_batches_by_target(shell):
+    views = [shell.add_view("MSTeams") for _ in range(4)]
+    engine = RulesEngine([Rule("Teams", desktop=3)])
+    for view in views:
+        engine.notify(view.hwnd)
+    assert engine.apply() == 4
+    assert shell.calls["FindDesktop"] + shell.calls["GetDesktops"] == 1
+    assert all(v.desktop is shell.desktops[2] for v in views)
+    assert engine.evaluations == 1
+
+
+def test_forget(shell):
+    view = shell.add_view("MSTeams")
+    engine = RulesEngine([Rule("Teams", desktop=2)])
+    engine.apply([view.hwnd])
+    view.desktop = shell.desktops[0]
+    engine.forget(view.hwnd)
+    engine.apply([view.hwnd])
+    assert view.desktop is shell.desktops[1]
+
+
+@names_supported
+def test_unknown_desktop_is_skipped(shell):
+    view = shell.add_view("MSTeams")
+    engine = RulesEngine([Rule("Teams", desktop="Nope")])
+    assert engine.apply([view.hwnd]) == 0
+    assert view.desktop is shell.desktops[0]
+
+
+def test_patterns_which_cant_be_combined():
+    engine = RulesEngine([
+        Rule(r"(\w)\1", desktop=1),
+        Rule(r"(?i)edge", desktop=2),
+        Rule("Teams", desktop=3),
+        Rule(r"(?P<a>x)-(?P=a)", desktop=4),
+    ], flags=0)
+    assert engine.match("Book").desktop == 1
+    assert engine.match("MSEDGE").desktop == 2
+    assert engine.match("MicrosoftTeams").desktop == 3
+    # The earlier, separately matched rule still wins
+    assert engine.match("TeamsBook").desktop == 1
+    assert engine.match("x-x").desktop == 4
+    assert engine.match("abc") is None
+
+
+def test_windows_not_yet_in_switchers_are_placed_later(shell):
+    view = shell.add_view("MSTeams", switcher=False)
+    engine = RulesEngine([Rule("Teams", desktop=2)])
+    assert engine.apply([view.hwnd]) == 0
+    view.switcher = True
+    assert engine.apply([view.hwnd]) == 1
+    assert view.desktop is shell.desktops[1]
@@ -0,0 +1,182 @@
+import pytest
+
+from pyvda.scheduler import SwitchScheduler
+
+
+class FakeClock():
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBackend():
+    def __init__(self, current=1, count=5):
+        self._current = current
+        self._count = count
+        self.switched = []
+
+    def current(self):
+        return self._current
+
+    def count(self):
+        return self._count
+
+    def switch(self, number):
+        self.switched.append(number)
+        self._current = number
+
+
+def make_scheduler(**kwargs):
+    clock = FakeClock()
+    backend = FakeBackend(**kwargs)
+    return SwitchScheduler(interval=0.3, backend=backend, clock=clock), clock, backend
+
+def test_burst_collapses_to_latest():
+    scheduler, clock, backend = make_scheduler()
+    for n in (2, 3, 4):
+        scheduler.request(n)
+    assert scheduler.target == 4
+    assert scheduler.pump() == 4
+    assert backend.switched == [4]
+    assert scheduler.resolved == 4
+    assert scheduler.pump() is None
+
+def test_rate_limited_to_interval():
+    scheduler, clock, backend = make_scheduler()
+    scheduler.request(2)
+    assert scheduler.pump() == 2
+
+    scheduler.request(3)
+    clock.now += 0.1
+    assert scheduler.due_in() == pytest.approx(0.2)
+    assert scheduler.pump() is None
+    scheduler.request(4)
+    clock.now += 0.2
+    assert scheduler.pump() == 4
+    assert backend.switched == [2, 4]
+
+def test_offsets_accumulate_and_wrap():
+    scheduler, clock, backend = make_scheduler(current=4, count=5)
+    for _ in range(3):
+        scheduler.request_offset(1)
+    assert scheduler.target == 2
+    scheduler.pump()
+    scheduler.request_offset(-1)
+    clock.now += 1
+    scheduler.pump()
+    assert backend.switched == [2, 1]
+
+def test_offsets_clamp_without_wrap():
+    scheduler, clock, backend = make_scheduler(current=4, count=5)
+    for _ in range(3):
+        scheduler.request_offset(1, wrap=False)
+    assert scheduler.target == 5
+
+def test_returning_to_start_skips_switch():
+    scheduler, clock, backend = make_scheduler()
+    scheduler.request(2)
+    scheduler.pump()
+    clock.now += 1
+    scheduler.request_offset(1)
+    scheduler.request_offset(-1)
+    assert scheduler.pump() is None
+    assert backend.switched == [2]
+    assert scheduler.due_in() is None
+
+def test_background_thread():
+    scheduler, clock, backend = make_scheduler()
+    scheduler.start()
+    try:
+        scheduler.request(3)
+        assert scheduler.wait(timeout=5) == 3
+    finally:
+        scheduler.stop()
+    assert backend.switched == [3]
+
+def test_failed_switch_is_not_resolved():
+    scheduler, clock, backend = make_scheduler()
+    switch = backend.switch
+    def removed(number):
+        raise ValueError("Desktop removed")
+    backend.switch = removed
+    scheduler.request(2)
+    with pytest.raises(ValueError):
+        scheduler.pump()
+    assert scheduler.resolved == 1
+    assert scheduler.switches == 0
+    backend.switch = switch
+    scheduler.request(2)
+    clock.now += 1
+    assert scheduler.pump() == 2
+
+def test_failed_switch_stays_pending():
+    scheduler, clock, backend = make_scheduler()
+    scheduler.request(2)
+    assert scheduler.pump() == 2
+    clock.now += 1
+    switch = backend.switch
+    def busy(number):
+        raise OSError("Shell busy")
+    backend.switch = busy
+    scheduler.request(3)
+    with pytest.raises(OSError):
+        scheduler.pump()
+    # Still pending, and not held back by the interval
+    assert scheduler.target == 3
+    assert scheduler.due_in() == 0.0
+    backend.switch = switch
+    assert scheduler.pump() == 3
+    assert scheduler.switches == 2
+    assert backend.switched == [2, 3]
+
+def test_newer_request_replaces_failed_switch():
+    scheduler, clock, backend = make_scheduler()
+    switch = backend.switch
+    def busy(number):
+        # A request arriving while the switch is in progress
+        scheduler.request(4)
+        raise OSError("Shell busy")
+    backend.switch = busy
+    scheduler.request(2)
+    with pytest.raises(OSError):
+        scheduler.pump()
+    assert scheduler.target == 4
+    backend.switch = switch
+    assert scheduler.pump() == 4
+    assert backend.switched == [4]
+
+def test_switches_made_elsewhere_are_picked_up():
+    scheduler, clock, backend = make_scheduler()
+    scheduler.request(2)
+    scheduler.pump()
+    # e.g. the user switching back from the keyboard
+    backend._current = 1
+    clock.now += 1
+    scheduler.request(2)
+    assert scheduler.pump() == 2
+    backend._current = 4
+    clock.now += 1
+    scheduler.request_offset(1)
+    assert scheduler.pump() == 5
+    assert backend.switched == [2, 2, 5]
+
+def test_background_thread_survives_failures():
+    scheduler, clock, backend = make_scheduler()
+    switch = backend.switch
+    def flaky(number):
+        if number == 2:
+            raise ValueError("Desktop removed")
+        switch(number)
+    backend.switch = flaky
+    scheduler.start()
+    try:
+        scheduler.request(2)
+        assert scheduler.wait(timeout=5) == 1
+        clock.now += 1
+        scheduler.request(3)
+        assert scheduler.wait(timeout=5) == 3
+    finally:
+        scheduler.stop()
+    assert backend.switched == [3]
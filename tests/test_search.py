@@ -0,0 +1,85 @@
+import pytest
+
+from pyvda.search import SUBSEQUENCE, WindowIndex, _score
+
+
+@pytest.fixture
+def desktops():
+    return 2
+
+
+@pytest.fixture
+def titles():
+    return {}
+
+
+def open_window(shell, titles, title, app_id="app", desktop=None):
+    view = shell.add_view(app_id, desktop)
+    titles[view.hwnd] = title
+    return view
+
+
+def search(index, query, **kwargs):
+    return [e.title for e in index.search(query, **kwargs)]
+
+
+def test_ranking(shell, titles):
+    open_window(shell, titles, "Visual Studio Code")
+    open_window(shell, titles, "notes.txt - Notepad")
+    open_window(shell, titles, "Inbox - Outlook", "Microsoft.OutlookForWindows")
+    open_window(shell, titles, "Notepad")
+    index = WindowIndex(title_of=titles.get)
+
+    assert search(index, "note") == ["Notepad", "notes.txt - Notepad"]
+    assert search(index, "out") == ["Inbox - Outlook"]
+    assert search(index, "pad") == ["Notepad", "notes.txt - Notepad"]
+    assert search(index, "vsc") == ["Visual Studio Code"]
+    assert search(index, "microsoft") == ["Inbox - Outlook"]
+    assert search(index, "zzz") == []
+    # Empty queries list everything, foreground first
+    assert search(index, "", limit=2) == ["Notepad", "Inbox - Outlook"]
+
+
+def test_subsequence_prefers_the_tightest_span():
+    assert _score("ac", "a.....abc") == (SUBSEQUENCE, 2)
+    assert _score("abc", "a.b..a.bc") == (SUBSEQUENCE, 3)
+    assert _score("abc", "a.b..a.b") is None
+
+
+def test_refresh_rescans_only_changed_windows(shell, titles):
+    a = open_window(shell, titles, "a")
+    open_window(shell, titles, "b")
+    index = WindowIndex(title_of=titles.get)
+    assert index.rescans == 2
+
+    assert index.refresh() == 0
+    assert index.rescans == 2
+
+    titles[a.hwnd] = "a renamed"
+    c = open_window(shell, titles, "c")
+    assert index.refresh() == 2
+    assert index.rescans == 4
+    assert index.get(a.hwnd).title == "a renamed"
+
+    shell.activate(a)
+    a.desktop = shell.desktops[1]
+    shell.views.remove(c)
+    assert index.refresh() == 2
+    assert c.hwnd not in index
+    assert index.get(a.hwnd).desktop_id == shell.desktops[1].id
+    assert [e.hwnd for e in index.entries()][0] == a.hwnd
+
+
+def test_filter_by_desktop(shell, titles):
+    open_window(shell, titles, "one", desktop=shell.desktops[0])
+    open_window(shell, titles, "two", desktop=shell.desktops[1])
+    index = WindowIndex(title_of=titles.get)
+    assert search(index, "", desktop_id=shell.desktops[1].id) == ["two"]
+
+
+def test_switcher_windows_only(shell, titles):
+    open_window(shell, titles, "shown")
+    hidden = shell.add_view("tool", switcher=False)
+    titles[hidden.hwnd] = "hidden"
+    assert search(WindowIndex(title_of=titles.get), "") == ["shown"]
+    assert len(WindowIndex(title_of=titles.get, switcher_windows=False)) == 2
@@ -0,0 +1,157 @@
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import uuid
+from typing import List, NamedTuple, Optional
+
+import pytest
+
+from pyvda.shared import (
+    PINNED,
+    SHOWN_IN_SWITCHERS,
+    StatePublisher,
+    StateReader,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# The fields the publisher reads from a `pyvda.snapshot.Snapshot`, which
+# isn't imported so that these tests run without COM
+class DesktopState(NamedTuple):
+    id: uuid.UUID
+    number: int
+    name: str
+    wallpaper: Optional[str]
+
+
+class ViewState(NamedTuple):
+    hwnd: int
+    app_id: Optional[str]
+    desktop_id: uuid.UUID
+    pinned: bool
+    app_pinned: bool
+    shown_in_switchers: bool
+
+
+class Snapshot(NamedTuple):
+    desktops: List[DesktopState]
+    views: List[ViewState]
+    current_desktop_id: uuid.UUID
+
+D1 = uuid.UUID("f5e7ca8a-46d4-4c20-8270-c4b3188d236f")
+D2 = uuid.UUID("6fda08db-dd1c-48b4-b7fa-1b828cb20388")
+GONE = uuid.UUID("491b56ab-df3c-473f-8352-52244c9dbbfe")
+
+
+def make_state(windows=3):
+    desktops = [DesktopState(D1, 1, "Comms", None), DesktopState(D2, 2, "", None)]
+    views = [ViewState(0x1000 - i, "app", D1 if i % 2 else D2, i == 0, False, True) for i in range(windows)]
+    views.append(ViewState(0x5000, None, GONE, False, False, False))
+    return Snapshot(desktops, views, D2)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "state")
+
+
+def test_round_trip(path):
+    publisher = StatePublisher(make_state, path=path)
+    reader = StateReader(path=path)
+    try:
+        sequence = publisher.publish()
+        state = reader.read()
+        assert state.sequence == sequence == reader.sequence()
+        assert state.desktops[0] == (D1, "Comms")
+        assert state.desktops[1] == (D2, "")
+        assert [w.hwnd for w in state.windows] == sorted([0x1000, 0xFFF, 0xFFE, 0x5000])
+        assert state.windows[-1].desktop == -1
+        assert state.current_desktop == 1
+        assert not state.truncated
+
+        assert reader.desktop_of(0x1000) == 1
+        assert reader.desktop_of(0xFFF) == 0
+        assert reader.desktop_of(0x1234) is None
+        window = [w for w in state.windows if w.hwnd == 0x1000][0]
+        assert window.flags == PINNED | SHOWN_IN_SWITCHERS
+        assert reader.current_desktop().id == D2
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_truncation(path):
+    publisher = StatePublisher(make_state, max_windows=2, path=path)
+    reader = StateReader(path=path)
+    try:
+        publisher.publish()
+        state = reader.read()
+        assert state.truncated
+        assert len(state.windows) == 2
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_reader_never_sees_a_torn_write(path):
+    states = [make_state(3), make_state(40)]
+    publisher = StatePublisher(path=path)
+    reader = StateReader(path=path)
+    publisher.publish(states[0])
+    done = threading.Event()
+
+    def write():
+        i = 0
+        while not done.is_set():
+            publisher.publish(states[i % 2])
+            i += 1
+            time.sleep(0)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        for _ in range(2000):
+            state = reader.read()
+            # Every window in a consistent state is sorted and has a known desktop
+            assert len(state.windows) in (4, 41)
+            assert [w.hwnd for w in state.windows] == sorted(w.hwnd for w in state.windows)
+    finally:
+        done.set()
+        writer.join()
+        reader.close()
+        publisher.close()
+
+
+def test_rejects_other_files(path):
+    with open(path, "wb") as f:
+        f.write(b"\0" * 128)
+    with pytest.raises(ValueError):
+        StateReader(path=path)
+
+
+def test_reader_needs_no_com(path):
+    publisher = StatePublisher(make_state, path=path)
+    try:
+        publisher.publish()
+        script = textwrap.dedent("""
+            import sys
+            # Fail any attempt to import comtypes
+            sys.modules["comtypes"] = None
+            from pyvda import StateReader
+            reader = StateReader(path=sys.argv[1])
+            print(len(reader.read().windows), reader.desktop_of(0x1000))
+            reader.close()
+            assert not {"pyvda.pyvda", "pyvda.utils", "pyvda.com_defns", "pyvda.build"} & set(sys.modules)
+        """)
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        result = subprocess.run(
+            [sys.executable, "-c", script, path], env=env, capture_output=True, text=True, timeout=60,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ["4", "1"]
+    finally:
+        publisher.close()
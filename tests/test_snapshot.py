@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from pyvda.compat import GUID
+from pyvda.snapshot import DesktopState, Snapshot, ViewState
+
+D1 = GUID("{F5E7CA8A-46D4-4C20-8270-C4B3188D236F}")
+D2 = GUID("{6FDA08DB-DD1C-48B4-B7FA-1B828CB20388}")
+D3 = GUID("{491B56AB-DF3C-473F-8352-52244C9DBBFE}")
+
+
+def make_snapshot():
+    desktops = [
+        DesktopState(D1, 1, "Comms", "C:/wallpapers/comms.jpg"),
+        DesktopState(D2, 2, "Büild", None),
+    ]
+    views = [
+        ViewState(0x1F02A6, "MSTeams_8wekyb3d8bbwe!MSTeams", D1, False, False, True),
+        ViewState(0x20010, None, D2, True, False, True),
+        ViewState(0x3004C, "Microsoft.WindowsTerminal_8wekyb3d8bbwe!App", D2, False, True, False),
+        # A window on a desktop which has since been removed
+        ViewState(0x40022, "notepad", D3, False, False, True),
+    ]
+    return Snapshot(desktops, views, D2)
+
+
+def test_json_round_trip():
+    snapshot = make_snapshot()
+    encoded = snapshot.to_json()
+    assert Snapshot.from_json(encoded) == snapshot
+    assert len(encoded) < len(json.dumps([s._asdict() for s in snapshot.views], default=str))
+
+
+def test_binary_round_trip():
+    snapshot = make_snapshot()
+    encoded = snapshot.to_bytes()
+    assert Snapshot.from_bytes(encoded) == snapshot
+    assert len(encoded) < len(snapshot.to_json())
+
+
+def test_binary_rejects_other_data():
+    with pytest.raises(ValueError):
+        Snapshot.from_bytes(b"\0" * 16)
+
+
+def test_delta_round_trip():
+    previous = make_snapshot()
+    desktops = [previous.desktops[1]._replace(number=1), DesktopState(D3, 2, "", None)]
+    views = [
+        ViewState(0x50001, "new", D3, False, False, True),
+        previous.views[2]._replace(desktop_id=D3),
+        previous.views[0],
+        previous.views[3],
+    ]
+    current = Snapshot(desktops, views, D3)
+
+    delta = current.delta(previous)
+    assert previous.apply_delta(json.loads(json.dumps(delta))) == current
+    assert [r[0] for r in delta["w"]] == [0x50001, 0x3004C]
+    assert delta["x"] == [0x20010]
+
+
+def test_delta_unchanged():
+    snapshot = make_snapshot()
+    delta = snapshot.delta(snapshot)
+    assert set(delta) == {"v", "b"}
+    assert snapshot.apply_delta(delta) == snapshot
+
+
+def test_delta_reorder_only():
+    previous = make_snapshot()
+    current = previous._replace(views=list(reversed(previous.views)))
+    delta = current.delta(previous)
+    assert "w" not in delta
+    assert previous.apply_delta(delta) == current
+
+
+def test_delta_against_wrong_base():
+    previous = make_snapshot()
+    current = previous._replace(current_desktop_id=D1)
+    other = previous._replace(views=previous.views[1:])
+    with pytest.raises(ValueError):
+        other.apply_delta(current.delta(previous))
@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+
+from pyvda import utils
+from pyvda import startup
+from pyvda.pyvda import managers
+from pyvda.state_cache import default_cache
+
+from fakes import FakeGlobalInterfaceTable
+
+
+@pytest.fixture
+def desktops():
+    return 2
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeGlobalInterfaceTable()
+    monkeypatch.setattr(utils, "_global_interface_table", lambda: table)
+    return table
+
+
+@pytest.fixture
+def shell(shell, table):
+    startup._future = None
+    default_cache.invalidate()
+    yield shell
+    startup._future = None
+    utils.unshare_managers()
+
+
+@pytest.fixture
+def populated(shell):
+    # The threads which populated their managers from the backend
+    threads = []
+    def backend(managers):
+        threads.append(threading.current_thread().name)
+        shell.backend(managers)
+    utils.set_backend(backend)
+    return threads
+
+
+def test_background_warmup(shell):
+    view = shell.add_view("a")
+    ready = startup.warmup()
+    warm = ready.result(timeout=5)
+    assert warm.focused_hwnd == view.hwnd
+    assert warm.state.desktop_ids == [d.id for d in shell.desktops]
+    # The primed state is shared with this thread
+    refreshes = default_cache.refreshes
+    assert default_cache.get() is warm.state
+    assert default_cache.refreshes == refreshes
+    assert startup.warmup() is ready
+
+
+def test_foreground_warmup(shell):
+    ready = startup.warmup(background=False)
+    assert ready.done()
+    assert ready.result().focused_hwnd is None
+    assert startup.warmup(background=False) is ready
+
+
+def test_failed_warmup_is_retried(shell):
+    def broken(managers):
+        raise NotImplementedError("no shell")
+
+    utils.set_backend(broken)
+    ready = startup.warmup()
+    with pytest.raises(NotImplementedError):
+        ready.result(timeout=5)
+    utils.set_backend(shell.backend)
+    retry = startup.warmup()
+    assert retry is not ready
+    retry.result(timeout=5)
+
+
+def test_warm_managers_are_shared(shell, table, populated):
+    startup.warmup().result(timeout=5)
+    assert populated == ["pyvda-warmup"]
+    assert managers.view_collection is table.entries[2]
+    assert managers.adapter.get_current_desktop().GetID() == shell.current.id
+    assert populated == ["pyvda-warmup"]
+
+
+def test_foreground_reuse_unmarshals_managers(shell, populated):
+    ready = startup.warmup()
+    ready.result(timeout=5)
+    assert startup.warmup(background=False) is ready
+    assert "manager_internal" in managers.__dict__
+    assert populated == ["pyvda-warmup"]
+
+
+def test_revoked_managers_are_acquired_again(shell, table, populated):
+    startup.warmup().result(timeout=5)
+    table.entries.clear()
+    managers.view_collection
+    assert populated == ["pyvda-warmup", threading.current_thread().name]
+
+
+def test_new_backend_stops_sharing(shell, table, populated):
+    startup.warmup().result(timeout=5)
+    utils.set_backend(shell.backend)
+    assert table.entries == {}
+    managers.view_collection
+    assert populated == ["pyvda-warmup"]
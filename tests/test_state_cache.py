@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from pyvda import AppView, VirtualDesktop
+from pyvda.state_cache import StateCache
+
+
+@pytest.fixture
+def cache(shell):
+    cache = StateCache(ttl=60)
+    yield cache
+    cache.close()
+
+
+def test_state(shell, cache):
+    view = shell.add_view("a", shell.desktops[2])
+    state = cache.get()
+    assert state.desktop_ids == [d.id for d in shell.desktops]
+    assert state.current_desktop_id == shell.desktops[0].id
+    assert cache.desktop_of(view.hwnd) == shell.desktops[2].id
+    assert state.desktop_number(shell.desktops[2].id) == 3
+    assert cache.desktop_of(1) is None
+    assert cache.refreshes == 1
+
+
+def test_threads_share_one_refresh(shell, cache):
+    barrier = threading.Barrier(8)
+    results = []
+
+    def read():
+        barrier.wait()
+        results.append(cache.current_desktop_id())
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [shell.desktops[0].id] * 8
+    assert cache.refreshes == 1
+    assert shell.calls["GetCurrentDesktop"] == 1
+
+
+def test_invalidated_by_pyvda_changes(shell, cache):
+    view = shell.add_view("a")
+    cache.get()
+    generation = cache.generation
+
+    VirtualDesktop(2).go()
+    assert cache.generation != generation
+    assert cache.current_desktop_id() == shell.desktops[1].id
+
+    VirtualDesktop(3).go()
+    AppView(hwnd=view.hwnd).move(VirtualDesktop(2))
+    assert cache.desktop_of(view.hwnd) == shell.desktops[1].id
+
+    VirtualDesktop.create()
+    assert len(cache.desktop_ids()) == 4
+    assert cache.refreshes == 4
+
+
+def test_ttl(shell):
+    cache = StateCache(ttl=0)
+    try:
+        cache.get()
+        cache.get()
+        assert cache.refreshes == 2
+    finally:
+        cache.close()
@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+
+from pyvda import AppView, VirtualDesktop, get_virtual_desktops, trace, utils
+from pyvda.compat import GUID, COMError
+from pyvda.pyvda import managers
+
+
+def workload():
+    return (
+        VirtualDesktop.current().number,
+        len(get_virtual_desktops()),
+        AppView.current().hwnd,
+    )
+
+
+def unavailable(managers):
+    raise AssertionError("The shell was used during replay")
+
+
+@pytest.fixture
+def shell(shell):
+    shell.add_view()
+    shell.switch(shell.desktops[2])
+    return shell
+
+
+def replay_without():
+    # Make sure nothing is served by the fake shell from here on
+    utils.set_backend(unavailable)
+    managers.clear()
+
+
+def test_record_and_replay(shell, tmp_path):
+    path = str(tmp_path / "session.trace")
+    with trace.record(path) as recorder:
+        expected = workload()
+    assert recorder.calls > 0
+    assert expected == (3, 3, shell.views[0].hwnd)
+
+    replay_without()
+    with trace.replay(path) as player:
+        assert workload() == expected
+        assert player.remaining() == 0
+
+
+def test_replay_mismatch(shell, tmp_path):
+    path = str(tmp_path / "session.trace")
+    with trace.record(path):
+        VirtualDesktop.current()
+
+    replay_without()
+    with trace.replay(path):
+        with pytest.raises(trace.ReplayError):
+            AppView.current()
+
+
+def test_failed_calls_are_replayed(shell, tmp_path):
+    path = str(tmp_path / "session.trace")
+    missing = GUID("{%s}" % uuid.uuid4())
+    with trace.record(path):
+        with pytest.raises(COMError) as recorded:
+            managers.adapter.find_desktop(missing)
+
+    replay_without()
+    with trace.replay(path) as player:
+        with pytest.raises(COMError) as replayed:
+            managers.adapter.find_desktop(missing)
+        assert player.remaining() == 0
+    assert replayed.value.hresult == recorded.value.hresult
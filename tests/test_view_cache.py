@@ -0,0 +1,115 @@
+import pytest
+
+from pyvda import AppView, set_view_cache_size
+from pyvda.pyvda import managers
+from pyvda.view_cache import ViewCache
+
+
+@pytest.fixture
+def desktops():
+    return 1
+
+
+class FakeWindows():
+    def __init__(self):
+        self.threads = {}
+        self.lookups = []
+
+    def lookup(self, hwnd):
+        self.lookups.append(hwnd)
+        return object()
+
+    def window_thread(self, hwnd):
+        return self.threads.get(hwnd, 0)
+
+
+def make_cache(maxsize=2):
+    windows = FakeWindows()
+    windows.threads = {1: 10, 2: 10, 3: 20}
+    return windows, ViewCache(windows.lookup, maxsize, windows.window_thread)
+
+
+def test_hits_and_misses():
+    windows, cache = make_cache()
+    view = cache.get(1)
+    assert cache.get(1) is view
+    assert windows.lookups == [1]
+    info = cache.info()
+    assert (info.hits, info.misses, info.size) == (1, 1, 1)
+
+
+def test_lru_eviction():
+    windows, cache = make_cache()
+    cache.get(1)
+    cache.get(2)
+    cache.get(1)
+    cache.get(3)
+    assert cache.info().evictions == 1
+    cache.get(1)
+    cache.get(2)
+    assert windows.lookups == [1, 2, 3, 2]
+
+
+def test_destroyed_or_reused_handle():
+    windows, cache = make_cache()
+    first = cache.get(1)
+    windows.threads[1] = 30
+    assert cache.get(1) is not first
+    del windows.threads[1]
+    cache.get(1)
+    assert len(cache) == 0
+    assert cache.info().invalidations == 2
+
+
+def test_invalidate():
+    windows, cache = make_cache()
+    cache.get(1)
+    cache.get(2)
+    cache.invalidate(1)
+    cache.invalidate(1)
+    assert len(cache) == 1
+    cache.invalidate()
+    assert len(cache) == 0
+    assert cache.info().invalidations == 2
+
+
+def test_disabled():
+    windows, cache = make_cache(maxsize=0)
+    cache.get(1)
+    cache.get(1)
+    assert windows.lookups == [1, 1]
+
+
+def test_disabled_skips_window_check():
+    def window_thread(hwnd):
+        raise AssertionError("The window's thread was looked up")
+
+    windows = FakeWindows()
+    cache = ViewCache(windows.lookup, 0, window_thread)
+    cache.get(1)
+    assert windows.lookups == [1]
+
+
+def test_resize():
+    windows, cache = make_cache(maxsize=3)
+    for hwnd in (1, 2, 3):
+        cache.get(hwnd)
+    cache.resize(1)
+    assert len(cache) == 1
+    assert cache.get(3) is not None
+    assert windows.lookups == [1, 2, 3]
+
+
+def test_off_by_default(shell, monkeypatch):
+    view = shell.add_view("app")
+    AppView(view.hwnd)
+    AppView(view.hwnd)
+    assert shell.calls["GetViewForHwnd"] == 2
+    set_view_cache_size(8)
+    monkeypatch.setattr(managers.view_cache, "_window_thread", lambda hwnd: 1)
+    try:
+        AppView(view.hwnd)
+        AppView(view.hwnd)
+        assert shell.calls["GetViewForHwnd"] == 3
+    finally:
+        set_view_cache_size(0)
@@ -0,0 +1,48 @@
+import pytest
+
+import pyvda.build as build
+from pyvda import VirtualDesktop, apply_wallpapers
+
+
+pytestmark = pytest.mark.skipif(not build.OVER_21313, reason="Wallpapers need 21313 or later")
+
+
+@pytest.fixture
+def shell(shell):
+    for d in shell.desktops:
+        d.wallpaper = r"C:\old.jpg"
+    return shell
+
+
+def test_skips_unchanged(shell):
+    shell.desktops[1].wallpaper = r"C:\b.jpg"
+    wallpapers = {
+        VirtualDesktop(1): r"C:\a.jpg",
+        VirtualDesktop(2): r"C:\b.jpg",
+        shell.desktops[2].id: r"C:\a.jpg",
+    }
+    shell.calls.clear()
+    changed = apply_wallpapers(wallpapers)
+    assert changed == 2
+    assert [d.wallpaper for d in shell.desktops] == [r"C:\a.jpg", r"C:\b.jpg", r"C:\a.jpg"]
+    assert shell.calls["SetWallpaper"] == 2
+    assert shell.calls["GetDesktops"] == 1
+
+    assert apply_wallpapers({VirtualDesktop(1): r"C:\a.jpg"}) == 0
+    assert apply_wallpapers({VirtualDesktop(1): r"C:\a.jpg"}, force=True) == 1
+
+
+def test_same_wallpaper_everywhere(shell):
+    shell.desktops[0].wallpaper = r"C:\new.jpg"
+    changed = apply_wallpapers({d.id: r"C:\new.jpg" for d in shell.desktops})
+    assert changed == 2
+    assert shell.calls["SetWallpaperForAllDesktops"] == 1
+    assert shell.calls["SetWallpaper"] == 0
+
+
+def test_unknown_desktop(shell):
+    desktop = VirtualDesktop(1)
+    shell.desktops.pop(0)
+    with pytest.raises(ValueError):
+        apply_wallpapers({desktop: r"C:\a.jpg"})
+    assert shell.calls["SetWallpaper"] == 0
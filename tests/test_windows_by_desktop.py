@@ -0,0 +1,33 @@
+import pytest
+
+from pyvda import desktop_window_counts, windows_by_desktop
+
+
+def test_groups_in_one_pass(shell):
+    d1, d2, d3 = shell.desktops
+    a = shell.add_view("a", d1)
+    b = shell.add_view("b", d2)
+    c = shell.add_view("c", d1)
+    pinned = shell.add_view("pinned", d3)
+    shell.pinned_views.append(pinned)
+    shell.add_view("hidden", d2, switcher=False)
+
+    groups = windows_by_desktop()
+    assert list(groups.desktops) == [d.id for d in shell.desktops]
+    assert [v.hwnd for v in groups.desktops[d1.id]] == [c.hwnd, a.hwnd]
+    assert [v.hwnd for v in groups.desktops[d2.id]] == [b.hwnd]
+    assert groups.desktops[d3.id] == []
+    assert [v.hwnd for v in groups.pinned] == [pinned.hwnd]
+    assert shell.calls["GetViewsByZOrder"] == 1
+
+
+def test_counts(shell):
+    d1, d2, d3 = shell.desktops
+    shell.add_view("a", d1)
+    shell.add_view("b", d1)
+    shell.add_view("hidden", d2, switcher=False)
+    shell.pinned_views.append(shell.add_view("pinned", d3))
+
+    assert list(desktop_window_counts().values()) == [2, 0, 0]
+    assert list(desktop_window_counts(include_pinned=True).values()) == [3, 1, 1]
+    assert list(desktop_window_counts(switcher_windows=False).values()) == [2, 1, 0]
@@ -0,0 +1,70 @@
+import itertools
+import random
+
+import pytest
+
+from pyvda import geometry
+from pyvda.zorder import HWND_TOP, capture_z_order, restore_z_order, z_order_moves
+
+
+def apply_moves(order, moves):
+    order = list(order)
+    for hwnd, after in moves:
+        order.remove(hwnd)
+        order.insert(0 if after == HWND_TOP else order.index(after) + 1, hwnd)
+    return order
+
+
+# Handles start at 1, as 0 is HWND_TOP
+@pytest.mark.parametrize("target", list(itertools.permutations(range(1, 6))))
+def test_moves_restore_every_permutation(target):
+    current = list(range(1, 6))
+    moves = z_order_moves(current, target)
+    assert apply_moves(current, moves) == list(target)
+
+
+def test_moves_are_minimal():
+    assert z_order_moves([1, 2, 3, 4], [1, 2, 3, 4]) == []
+    # Only the one window which is out of place moves
+    assert z_order_moves([2, 3, 4, 1], [1, 2, 3, 4]) == [(1, HWND_TOP)]
+    assert z_order_moves([1, 3, 2, 4], [1, 2, 3, 4]) in ([(2, 1)], [(3, 2)])
+    rng = random.Random(0)
+    for _ in range(50):
+        target = list(range(1, 31))
+        current = target[:]
+        # Displace a few windows
+        for _ in range(3):
+            current.insert(rng.randrange(30), current.pop(rng.randrange(30)))
+        moves = z_order_moves(current, target)
+        assert len(moves) <= 3
+        assert apply_moves(current, moves) == target
+
+
+def test_ignores_windows_missing_from_either_side():
+    # 9 was closed, 7 is new and keeps its place
+    moves = z_order_moves([7, 3, 1, 2], [1, 9, 2, 3])
+    assert apply_moves([7, 3, 1, 2], moves) == [7, 1, 2, 3]
+
+
+@pytest.fixture
+def desktops():
+    return 2
+
+
+def test_capture_and_restore(shell, monkeypatch):
+    views = [shell.add_view(str(i)) for i in range(4)]
+    shell.add_view("other", shell.desktops[1])
+    order = capture_z_order()
+    assert order == [v.hwnd for v in reversed(views)]
+
+    # Scramble them, as moving between desktops does
+    shell.activate(views[0])
+    shell.activate(views[1])
+
+    deferred = []
+    monkeypatch.setattr(geometry, "_BeginDeferWindowPos", lambda n: 1)
+    monkeypatch.setattr(geometry, "_DeferWindowPos", lambda hdwp, *args: deferred.append(args[:2]) or hdwp)
+    monkeypatch.setattr(geometry, "_EndDeferWindowPos", lambda hdwp: True)
+    assert restore_z_order(order) == 2
+    assert apply_moves(capture_z_order(), deferred) == order
+    assert shell.calls["SetFocus"] == shell.calls["SwitchTo"] == 0